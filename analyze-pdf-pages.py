@@ -2,6 +2,16 @@ import fitz  # PyMuPDF
 from pathlib import Path
 import json
 
+from page_features import load_features
+from page_source import PageSource
+
+# Heurística: páginas com texto específico técnico
+KEYWORDS_SPECS = [
+    'CAPACITY', 'PERSON', 'CO2', 'CYLINDER',
+    'PRESSURE', 'PSI', 'VALVE', 'WEAK LINK',
+    'DAVIT', 'TORQUE', 'SPECIFICATION', 'WEIGHT'
+]
+
 def analyze_pdf_structure(pdf_path):
     """Analisa estrutura do PDF para identificar páginas com potenciais tabelas"""
     
@@ -9,8 +19,9 @@ def analyze_pdf_structure(pdf_path):
     print(f"Analisando estrutura: {pdf_path.name}")
     print(f"{'='*80}\n")
     
-    doc = fitz.open(pdf_path)
-    total_pages = len(doc)
+    # Características por página (page_features.py), calculadas uma vez por manual
+    features = load_features(pdf_path)
+    total_pages = len(features)
     
     analysis = {
         "arquivo": pdf_path.name,
@@ -21,8 +32,9 @@ def analyze_pdf_structure(pdf_path):
         "metadados": {}
     }
     
-    # Metadados
-    metadata = doc.metadata
+    # Metadados (só o trailer do PDF, sem ler o conteúdo das páginas)
+    with fitz.open(pdf_path) as doc:
+        metadata = doc.metadata
     if metadata:
         analysis["metadados"] = metadata
         print("METADADOS DO PDF:")
@@ -35,54 +47,46 @@ def analyze_pdf_structure(pdf_path):
     print("Analisando páginas...")
     print("(Procurando por páginas com mais elementos gráficos = possíveis tabelas)\n")
     
-    for page_num in range(total_pages):
-        page = doc[page_num]
-        
-        # Contar elementos
-        num_images = len(page.get_images())
-        text = page.get_text()
-        text_length = len(text.strip())
-        
-        # Contar linhas/retângulos (indicativo de tabelas)
-        drawings = page.get_drawings()
-        num_lines = len(drawings) if drawings else 0
+    keywords_found = features.keyword_hits(KEYWORDS_SPECS)
+    com_texto = features.caracteres > 50
+    muitas_linhas = features.desenhos > 20   # Possíveis tabelas
+    promissoras = keywords_found >= 3        # Se encontrar 3+ palavras-chave
+    
+    # Texto (para pré-visualização) só das páginas selecionadas, via cache partilhado
+    with PageSource(pdf_path) as source:
+        previews = {
+            p["pagina"]: p["texto"]
+            for p in source.pages(features.pages(com_texto | promissoras))
+        }
+    
+    for i in range(total_pages):
+        page_num = int(features.pagina[i])
+        text = previews.get(page_num, "")
         
         # Páginas com texto
-        if text_length > 50:
+        if com_texto[i]:
             analysis["paginas_com_texto"].append({
-                "pagina": page_num + 1,
-                "caracteres": text_length,
+                "pagina": page_num,
+                "caracteres": int(features.caracteres[i]),
                 "preview": text[:200].replace('\n', ' ')
             })
         
         # Páginas com muitas linhas (possíveis tabelas)
-        if num_lines > 20:
+        if muitas_linhas[i]:
             analysis["paginas_com_muitas_linhas"].append({
-                "pagina": page_num + 1,
-                "linhas": num_lines,
-                "imagens": num_images
+                "pagina": page_num,
+                "linhas": int(features.desenhos[i]),
+                "imagens": int(features.imagens[i])
             })
         
-        # Heurística: páginas com texto específico técnico
-        text_upper = text.upper()
-        keywords_specs = [
-            'CAPACITY', 'PERSON', 'CO2', 'CYLINDER',
-            'PRESSURE', 'PSI', 'VALVE', 'WEAK LINK',
-            'DAVIT', 'TORQUE', 'SPECIFICATION', 'WEIGHT'
-        ]
-        
-        keywords_found = sum(1 for kw in keywords_specs if kw in text_upper)
-        
-        if keywords_found >= 3:  # Se encontrar 3+ palavras-chave
+        if promissoras[i]:
             analysis["paginas_com_tabelas_potenciais"].append({
-                "pagina": page_num + 1,
-                "keywords_encontradas": keywords_found,
-                "linhas_graficas": num_lines,
+                "pagina": page_num,
+                "keywords_encontradas": int(keywords_found[i]),
+                "linhas_graficas": int(features.desenhos[i]),
                 "preview": text[:150].replace('\n', ' ') if text else "(escaneada)"
             })
     
-    doc.close()
-    
     # Relatório
     print(f"\n{'─'*80}")
     print("RESUMO DA ANÁLISE")
@@ -1,54 +1,31 @@
-import fitz  # PyMuPDF
-import json
 from pathlib import Path
-from PIL import Image
-import pytesseract
-import io
-import re
+
+from ocr_processor import ProcessadorOCR
+from page_features import load_features
 
 # Configurar Tesseract (ajustar caminho se necessário)
 # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
 def extract_with_ocr(pdf_path, max_pages=50):
-    """Extrai texto de PDF usando OCR"""
+    """Extrai texto de PDF usando OCR (ocr_processor.py: só páginas sem texto, em paralelo e com cache)"""
     
     print(f"\n{'='*80}")
     print(f"Processando com OCR: {pdf_path.name}")
     
+    total = len(load_features(pdf_path))
+    total_pages = min(total, max_pages)
+    print(f"Total de páginas a processar: {total_pages} (de {total})")
+    
+    paginas = ProcessadorOCR().process_pdf(pdf_path, range(1, total_pages + 1))
+    
     all_text = ""
-    doc = fitz.open(pdf_path)
-    
-    total_pages = min(len(doc), max_pages)
-    print(f"Total de páginas a processar: {total_pages} (de {len(doc)})")
-    
-    for page_num in range(total_pages):
-        print(f"Processando página {page_num + 1}/{total_pages}...", end=" ")
-        
-        page = doc[page_num]
-        
-        # Tentar texto normal primeiro
-        text = page.get_text()
-        
-        # Se não houver texto, usar OCR
-        if len(text.strip()) < 50:
-            try:
-                # Converter página em imagem
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom para melhor OCR
-                img_data = pix.tobytes("png")
-                image = Image.open(io.BytesIO(img_data))
-                
-                # OCR
-                text = pytesseract.image_to_string(image, lang='eng')
-                print(f"[OCR] {len(text)} caracteres")
-            except Exception as e:
-                print(f"[ERRO OCR: {e}]")
-                text = ""
+    for pagina in paginas:
+        if pagina['origem'] == 'texto':
+            print(f"Página {pagina['pagina']}: [TEXTO] {len(pagina['texto'])} caracteres")
         else:
-            print(f"[TEXTO] {len(text)} caracteres")
-        
-        all_text += f"\n--- PÁGINA {page_num + 1} ---\n{text}\n"
-    
-    doc.close()
+            print(f"Página {pagina['pagina']}: [OCR] {len(pagina['texto'])} caracteres "
+                  f"(confiança {pagina['confianca']})")
+        all_text += f"\n--- PÁGINA {pagina['pagina']} ---\n{pagina['texto']}\n"
     
     # Salvar texto
     output_txt = pdf_path.stem + "-ocr.txt"
@@ -64,17 +41,11 @@ def extract_with_ocr(pdf_path, max_pages=50):
 def extract_simple_check(pdf_path):
     """Verificar se PDF tem texto ou é apenas imagem"""
     
-    doc = fitz.open(pdf_path)
-    total_text_chars = 0
-    total_pages = len(doc)
+    features = load_features(pdf_path)
+    total_pages = len(features)
     
     # Verificar primeiras 10 páginas
-    for i in range(min(10, total_pages)):
-        page = doc[i]
-        text = page.get_text()
-        total_text_chars += len(text.strip())
-    
-    doc.close()
+    total_text_chars = int(features.caracteres[:10].sum())
     
     has_text = total_text_chars > 500
     
@@ -110,12 +81,10 @@ def main():
                 print("    Analisando manualmente primeiras páginas...\n")
                 
                 # Ver se consegue extrair algo das primeiras páginas
-                doc = fitz.open(pdf_path)
-                for i in range(min(5, len(doc))):
-                    page = doc[i]
+                features = load_features(pdf_path)
+                for i in range(min(5, len(features))):
                     # Tentar extrair tabelas ou imagens
-                    print(f"  Página {i+1}: {len(page.get_images())} imagens, {len(page.get_text())} caracteres de texto")
-                doc.close()
+                    print(f"  Página {i+1}: {features.imagens[i]} imagens, {features.caracteres_brutos[i]} caracteres de texto")
         else:
             print(f"❌ Arquivo não encontrado: {pdf_path}")
     
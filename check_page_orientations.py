@@ -2,13 +2,9 @@
 import json
 from pathlib import Path
 
-try:
-    import pdfplumber
-except ImportError:
-    import subprocess
-    import sys
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "pdfplumber"])
-    import pdfplumber
+import numpy as np
+
+from page_features import load_features
 
 pdf_dir = Path("MARCAS")
 output_file = Path("page_orientations.json")
@@ -21,32 +17,27 @@ for pdf_file in sorted(pdf_dir.rglob("*.pdf")):
     base_name = pdf_file.stem
     print(f"📄 {base_name}...")
     
-    pages_info = []
-    landscape_count = 0
-    portrait_count = 0
-    
     try:
-        with pdfplumber.open(str(pdf_file)) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                width = page.width
-                height = page.height
-                
-                # Determinar orientação
-                is_landscape = width > height
-                orientation = "LANDSCAPE" if is_landscape else "PORTRAIT"
-                
-                if is_landscape:
-                    landscape_count += 1
-                else:
-                    portrait_count += 1
-                
-                pages_info.append({
-                    "página": page_num,
-                    "orientação": orientation,
-                    "largura": width,
-                    "altura": height,
-                    "proporção": round(width / height, 2)
-                })
+        # Largura/altura vêm da tabela de características (page_features.py)
+        features = load_features(pdf_file)
+        is_landscape = features.landscape
+        landscape_count = int(is_landscape.sum())
+        portrait_count = len(features) - landscape_count
+        
+        # Determinar orientação
+        orientation = np.where(is_landscape, "LANDSCAPE", "PORTRAIT")
+        pages_info = [
+            {
+                "página": int(page_num),
+                "orientação": str(orient),
+                "largura": float(width),
+                "altura": float(height),
+                "proporção": float(ratio)
+            }
+            for page_num, orient, width, height, ratio in zip(
+                features.pagina, orientation, features.largura,
+                features.altura, features.aspect)
+        ]
         
         orientations[base_name] = {
             "arquivo": str(pdf_file),
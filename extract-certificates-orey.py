@@ -12,6 +12,8 @@ from datetime import datetime
 import re
 from typing import Dict, List, Any, Optional
 
+from keyword_matcher import KeywordMatcher
+
 def extract_certificate_number(ws) -> Optional[str]:
     """Extrai número do certificado da linha 3"""
     try:
@@ -238,24 +240,23 @@ def extract_inspection_dates(ws) -> Dict[str, Optional[str]]:
     
     return dates
 
+# Palavras-chave de testes (sem acentos/maiúsculas: "PRESSAO" também conta)
+TEST_KEYWORDS = KeywordMatcher([
+    'TESTE', 'TEST', 'PRESSURE', 'LEAK', 'INFLATION',
+    'INSUFLA', 'PRESSÃO', 'FUGA', 'VÁLVULA'
+])
+
 def extract_tests(ws_quadro) -> List[str]:
     """Extrai testes realizados da jangada"""
     tests = []
     
     try:
         # Procurar palavras-chave de testes nas últimas linhas
-        keywords = [
-            'TESTE', 'TEST', 'PRESSURE', 'LEAK', 'INFLATION', 
-            'INSUFLA', 'PRESSÃO', 'FUGA', 'VÁLVULA'
-        ]
-        
         for row in ws_quadro.iter_rows(min_row=40, max_row=84, values_only=True):
             row_str = ' '.join([str(cell) for cell in row if cell])
             
-            for keyword in keywords:
-                if keyword in row_str.upper():
-                    tests.append(row_str.strip())
-                    break
+            if TEST_KEYWORDS.search(row_str) is not None:
+                tests.append(row_str.strip())
     
     except Exception as e:
         print(f"Erro ao extrair testes: {e}")
@@ -1,4 +1,4 @@
-import pdfplumber
+from page_source import PageSource
 import json
 import re
 
@@ -8,8 +8,8 @@ print("="*80)
 print("ANALISANDO PDF: EUROVINIL & CREWSAVER")
 print("="*80)
 
-pdf = pdfplumber.open(pdf_path)
-print(f'\n📄 Total de páginas: {len(pdf.pages)}')
+pdf = PageSource(pdf_path)  # texto PyMuPDF, tabelas pdfplumber (via cache)
+print(f'\n📄 Total de páginas: {len(pdf)}')
 print('='*80)
 
 # Estrutura para armazenar dados
@@ -29,19 +29,19 @@ crewsaver_data = {
 
 # Extrair texto de todas as páginas
 all_text = ""
-for i, page in enumerate(pdf.pages[:150]):  # Primeiras 150 páginas
+for i in range(min(150, len(pdf))):  # Primeiras 150 páginas
     print(f'\n{"="*80}')
     print(f'PÁGINA {i+1}')
     print(f'{"="*80}')
     
-    text = page.extract_text()
+    text = pdf.text(i+1)
     
     if text:
         all_text += f"\n\n=== PÁGINA {i+1} ===\n{text}"
         print(text)
         
         # Tentar extrair tabelas também
-        tables = page.extract_tables()
+        tables = pdf.tables(i+1)
         if tables:
             print(f"\n📊 TABELAS ENCONTRADAS: {len(tables)}")
             for idx, table in enumerate(tables):
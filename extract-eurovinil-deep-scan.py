@@ -1,4 +1,6 @@
-import pdfplumber
+from keyword_matcher import KeywordMatcher
+from manual_index import find_pages, literal
+from page_source import PageSource
 import json
 import re
 
@@ -8,42 +10,51 @@ print("="*80)
 print("BUSCA COMPLETA POR TABELAS DE ESPECIFICAÇÕES")
 print("="*80)
 
-pdf = pdfplumber.open(pdf_path)
-total_pages = len(pdf.pages)
+pdf = PageSource(pdf_path)  # texto PyMuPDF, tabelas pdfplumber (via cache)
+total_pages = len(pdf)
 print(f'\n📄 Total de páginas: {total_pages}')
 
 # Procurar páginas com keywords críticas
-print("\n🔍 ESCANEANDO TODO O PDF POR PÁGINAS COM ESPECIFICAÇÕES...")
+print("\n🔍 PROCURANDO NO ÍNDICE FTS5 PÁGINAS COM ESPECIFICAÇÕES...")
 print("="*80)
 
+# Procurar por keywords que indicam tabelas de specs
+keywords_criticas = [
+    'CYLINDER SIZE', 'CYLINDER TYPE', 'CO2 CAPACITY',
+    'PERSONS', 'CAPACITY', 'WEAK LINK',
+    'BREAKING LOAD', 'LASHING', 'STRAP',
+    'CONTAINER WEIGHT', 'CONTAINER DIMENSION',
+    'WORKING PRESSURE', 'INFLATION PRESSURE'
+]
+matcher_criticas = KeywordMatcher(keywords_criticas)
+matcher_tabela = KeywordMatcher(['TABLE', 'CO2', 'CYLINDER'])
+
+# Pré-filtro no índice de substrings (manual_index.py): as mesmas condições
+# dos KeywordMatcher abaixo, que as verificam exatamente
+query = ' OR '.join(literal(kw) for kw in keywords_criticas)
+query += f" OR ({literal('TABLE')} AND ({literal('CO2')} OR {literal('CYLINDER')}))"
+candidatas = sorted(r['pagina'] for r in find_pages(pdf_path, query, substring=True))
+
 paginas_relevantes = []
 
-for i in range(total_pages):
-    page = pdf.pages[i]
-    text = page.extract_text()
+for page_num in candidatas:
+    i = page_num - 1
+    text = pdf.normalized_text(i+1)
     
     if text:
-        text_upper = text.upper()
-        
-        # Procurar por keywords que indicam tabelas de specs
-        keywords_criticas = [
-            'CYLINDER SIZE', 'CYLINDER TYPE', 'CO2 CAPACITY',
-            'PERSONS', 'CAPACITY', 'WEAK LINK',
-            'BREAKING LOAD', 'LASHING', 'STRAP',
-            'CONTAINER WEIGHT', 'CONTAINER DIMENSION',
-            'WORKING PRESSURE', 'INFLATION PRESSURE'
-        ]
+        # Uma passagem por lista de keywords sobre o texto normalizado (em cache)
+        found = matcher_criticas.hits(text, normalized=True)
+        tabela = set(matcher_tabela.hits(text, normalized=True))
         
-        found = [kw for kw in keywords_criticas if kw in text_upper]
-        
-        if found or ('TABLE' in text_upper and ('CO2' in text_upper or 'CYLINDER' in text_upper)):
+        if found or ('TABLE' in tabela and tabela & {'CO2', 'CYLINDER'}):
+            num_tabelas = len(pdf.tables(i+1))
             paginas_relevantes.append({
                 'pagina': i+1,
                 'keywords': found,
-                'tem_tabela': len(page.extract_tables()) > 0,
-                'num_tabelas': len(page.extract_tables())
+                'tem_tabela': num_tabelas > 0,
+                'num_tabelas': num_tabelas
             })
-            print(f"\n✅ PÁGINA {i+1}: {', '.join(found)} | Tabelas: {len(page.extract_tables())}")
+            print(f"\n✅ PÁGINA {i+1}: {', '.join(found)} | Tabelas: {num_tabelas}")
 
 print(f"\n\n📊 TOTAL DE PÁGINAS RELEVANTES: {len(paginas_relevantes)}")
 print("="*80)
@@ -52,6 +63,11 @@ print("="*80)
 print("\n\n🔍 ANALISANDO PÁGINAS RELEVANTES EM DETALHE...")
 print("="*80)
 
+matcher_linhas = KeywordMatcher([
+    'CO2', 'CYLINDER', 'WEAK', 'LASHING', 'STRAP', 'PRESSURE', 'PSI', 'BAR',
+    'CONTAINER', 'WEIGHT', 'DIMENSION'
+])
+
 especificacoes_encontradas = {
     'capacidades_co2': [],
     'weak_link': [],
@@ -62,18 +78,17 @@ especificacoes_encontradas = {
 
 for info in paginas_relevantes[:30]:  # Primeiras 30 páginas relevantes
     i = info['pagina'] - 1
-    page = pdf.pages[i]
     
     print(f"\n{'='*80}")
     print(f"PÁGINA {info['pagina']} - Keywords: {', '.join(info['keywords'])}")
     print(f"{'='*80}")
     
-    text = page.extract_text()
+    text = pdf.text(i+1)
     if text:
         print(text)
         
         # Extrair tabelas
-        tables = page.extract_tables()
+        tables = pdf.tables(i+1)
         if tables:
             print(f"\n📊 {len(tables)} TABELA(S):")
             for idx, table in enumerate(tables):
@@ -83,29 +98,29 @@ for info in paginas_relevantes[:30]:  # Primeiras 30 páginas relevantes
                         print(row)
                         
                         # Detectar linhas com dados de CO2
-                        row_str = str(row).upper()
-                        if 'CO2' in row_str or 'CYLINDER' in row_str:
+                        row_hits = set(matcher_linhas.hits(str(row)))
+                        if row_hits & {'CO2', 'CYLINDER'}:
                             especificacoes_encontradas['capacidades_co2'].append({
                                 'pagina': info['pagina'],
                                 'dados': row
                             })
                         
                         # Detectar weak link
-                        if 'WEAK' in row_str or 'LASHING' in row_str or 'STRAP' in row_str:
+                        if row_hits & {'WEAK', 'LASHING', 'STRAP'}:
                             especificacoes_encontradas['weak_link'].append({
                                 'pagina': info['pagina'],
                                 'dados': row
                             })
                         
                         # Detectar pressão
-                        if 'PRESSURE' in row_str or 'PSI' in row_str or 'BAR' in row_str:
+                        if row_hits & {'PRESSURE', 'PSI', 'BAR'}:
                             especificacoes_encontradas['pressoes'].append({
                                 'pagina': info['pagina'],
                                 'dados': row
                             })
                         
                         # Detectar container
-                        if 'CONTAINER' in row_str or 'WEIGHT' in row_str or 'DIMENSION' in row_str:
+                        if row_hits & {'CONTAINER', 'WEIGHT', 'DIMENSION'}:
                             especificacoes_encontradas['container_specs'].append({
                                 'pagina': info['pagina'],
                                 'dados': row
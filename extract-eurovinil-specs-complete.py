@@ -1,4 +1,4 @@
-import pdfplumber
+from page_source import PageSource
 import json
 import re
 
@@ -8,8 +8,8 @@ print("="*80)
 print("EXTRAÇÃO COMPLETA: EUROVINIL & CREWSAVER - ESPECIFICAÇÕES TÉCNICAS")
 print("="*80)
 
-pdf = pdfplumber.open(pdf_path)
-print(f'\n📄 Total de páginas no PDF: {len(pdf.pages)}')
+pdf = PageSource(pdf_path)  # texto PyMuPDF, tabelas pdfplumber (via cache)
+print(f'\n📄 Total de páginas no PDF: {len(pdf)}')
 print('='*80)
 
 # Extrair primeiras 50 páginas (onde geralmente estão as specs)
@@ -19,13 +19,12 @@ tabelas_importantes = []
 print("\n🔍 ANALISANDO PRIMEIRAS 50 PÁGINAS (ESPECIFICAÇÕES)...")
 print("="*80)
 
-for i in range(min(50, len(pdf.pages))):
-    page = pdf.pages[i]
+for i in range(min(50, len(pdf))):
     print(f'\n{"="*80}')
     print(f'PÁGINA {i+1}')
     print(f'{"="*80}')
     
-    text = page.extract_text()
+    text = pdf.text(i+1)
     
     if text:
         all_text += f"\n\n=== PÁGINA {i+1} ===\n{text}"
@@ -40,7 +39,7 @@ for i in range(min(50, len(pdf.pages))):
             print(f"\n🔑 KEYWORDS: {', '.join(found_keywords)}")
         
         # Extrair tabelas
-        tables = page.extract_tables()
+        tables = pdf.tables(i+1)
         if tables:
             print(f"\n📊 {len(tables)} TABELA(S) ENCONTRADA(S)")
             for idx, table in enumerate(tables):
@@ -6,17 +6,14 @@ Foco: pressão de trabalho, pesos, cargas de davit launch
 """
 
 import json
-import re
 import sys
 from pathlib import Path
 
-try:
-    import pdfplumber
-except ImportError:
-    print("Instalando pdfplumber...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "pdfplumber", "-q"])
-    import pdfplumber
+from page_source import PageSource
+from spec_rules import DEFAULT_RULES, select
+
+# Só as regras de pressão e davit launch
+SPEC_RULES = DEFAULT_RULES.select('weak_link', 'bridle_peso', 'pressao')
 
 MARCAS_PATH = Path(r"c:\Users\julio\Desktop\APLICACAO MASTER\LIFERAFT1.0\gestor-naval-pro\MARCAS")
 
@@ -27,38 +24,24 @@ PDFS = {
     "DSB LR97": MARCAS_PATH / "LR97.pdf",
 }
 
-def extract_pressure_from_text(text):
-    """Extrai valores de pressão em diferentes unidades"""
+# Chave de saída por unidade canónica (spec_rules.py)
+PRESSURE_KEYS = {
+    'psi': 'psi', 'mmWG': 'mmWG', 'inH2O': 'inH2O',
+    'mbar': 'milibares', 'hPa': 'milibares', 'bar': 'bar',
+}
+
+def extract_pressure_from_text(findings):
+    """Valores de pressão em diferentes unidades (primeiro plausível de cada)"""
     pressure = {}
     
-    # PSI
-    match = re.search(r'(\d+\.?\d*)\s*(?:PSI|psi|PSI)', text)
-    if match:
-        pressure['psi'] = float(match.group(1))
-    
-    # mm WG (milímetros coluna de água)
-    match = re.search(r'(\d+\.?\d*)\s*(?:mm\s*WG|mmWG|mm\s*H2O|mm\s*H2O)', text)
-    if match:
-        pressure['mmWG'] = float(match.group(1))
-    
-    # inH2O (polegadas coluna de água)
-    match = re.search(r'(\d+\.?\d*)\s*(?:in\s*H2O|inH2O|in\.?\s*H2O|inches\s*H2O)', text)
-    if match:
-        pressure['inH2O'] = float(match.group(1))
-    
-    # milibares ou hPa
-    match = re.search(r'(\d+\.?\d*)\s*(?:mb|mbar|hPa)', text)
-    if match:
-        pressure['milibares'] = float(match.group(1))
-    
-    # bar
-    match = re.search(r'(\d+\.?\d*)\s*(?:\s*bar(?:\s|,|\.)|bar(?:\s|,|\.))', text)
-    if match:
-        pressure['bar'] = float(match.group(1))
+    for finding in select(findings, regra='pressao'):
+        key = PRESSURE_KEYS[finding['unidade']]
+        if key not in pressure:
+            pressure[key] = finding['valor']
     
     return pressure
 
-def extract_davit_specs(text):
+def extract_davit_specs(findings):
     """Extrai especificações de davit launch"""
     davit = {
         "bridle_weight": None,
@@ -66,15 +49,15 @@ def extract_davit_specs(text):
         "capacity_specs": {}
     }
     
-    # Procura por "weak link" ou "chain" com valores em kN ou lbf
-    weak_link_match = re.search(r'(?:weak\s*link|safety\s*chain|breaking\s*strength)[\s:=]*(\d+\.?\d*)\s*(?:kN|lbf|kgf|N)', text, re.IGNORECASE)
-    if weak_link_match:
-        davit['weak_link'] = weak_link_match.group(1)
+    # "weak link" / "safety chain" / "breaking strength" com valores em kN, lbf, kgf ou N
+    weak_link = select(findings, regra='weak_link')
+    if weak_link:
+        davit['weak_link'] = str(weak_link[0]['valor'])
     
-    # Procura por peso máximo da bridle
-    bridle_match = re.search(r'(?:bridle|bridle.*weight|bridle.*max)[\s:=]*(\d+\.?\d*)\s*(?:kg|lb|lbs)', text, re.IGNORECASE)
-    if bridle_match:
-        davit['bridle_weight'] = bridle_match.group(1)
+    # Peso máximo da bridle
+    bridle = select(findings, regra='bridle_peso')
+    if bridle:
+        davit['bridle_weight'] = str(bridle[0]['valor'])
     
     return davit
 
@@ -99,40 +82,43 @@ def extract_from_pdf(modelo_name, pdf_path, max_pages=50):
             },
             "total_paginas": 0,
             "paginas_processadas": 0,
-            "paginas_com_pressao": 0
+            "paginas_com_pressao": 0,
+            "paginas_pressao": {}
         }
         
-        with pdfplumber.open(pdf_path) as pdf:
-            total = len(pdf.pages)
+        with PageSource(pdf_path) as source:
+            total = len(source)
             result['total_paginas'] = total
             pages_to_process = min(max_pages, total)
             
             print(f"   📊 Total de páginas: {total} (processando primeiras {pages_to_process})")
             
-            for page_num in range(pages_to_process):
-                try:
-                    page = pdf.pages[page_num]
-                    text = page.extract_text()
+            for pagina in source.pages(range(1, pages_to_process + 1)):
+                page_num = pagina['pagina']
+                text = pagina['texto']
+                
+                if text:
+                    result['paginas_processadas'] += 1
+                    
+                    # Uma passagem das regras partilhadas pela página
+                    findings = SPEC_RULES.scan(text, page_num)
+                    
+                    # Extrai pressão
+                    pressure = extract_pressure_from_text(findings)
+                    if pressure:
+                        result['paginas_com_pressao'] += 1
+                        result['pressaoTrabalho'].update(pressure)
+                        for key in pressure:
+                            result['paginas_pressao'][key] = page_num
                     
-                    if text:
-                        result['paginas_processadas'] += 1
-                        
-                        # Extrai pressão
-                        pressure = extract_pressure_from_text(text)
-                        if pressure:
-                            result['paginas_com_pressao'] += 1
-                            result['pressaoTrabalho'].update(pressure)
-                        
-                        # Extrai especificações de davit
-                        davit = extract_davit_specs(text)
-                        if davit['weak_link']:
-                            result['davit']['weak_link'] = davit['weak_link']
-                        if davit['bridle_weight']:
-                            result['davit']['bridle_weight'] = davit['bridle_weight']
-                            
-                except Exception as e:
-                    print(f"   ⚠️  Erro na página {page_num + 1}: {type(e).__name__}")
-                    continue
+                    # Extrai especificações de davit
+                    davit = extract_davit_specs(findings)
+                    if davit['weak_link']:
+                        result['davit']['weak_link'] = davit['weak_link']
+                        result['davit']['pagina_weak_link'] = page_num
+                    if davit['bridle_weight']:
+                        result['davit']['bridle_weight'] = davit['bridle_weight']
+                        result['davit']['pagina_bridle_weight'] = page_num
         
         print(f"   ✅ Extraído com sucesso!")
         if result['pressaoTrabalho']:
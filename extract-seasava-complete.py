@@ -1,26 +1,26 @@
-import fitz  # PyMuPDF
 import re
 import json
 from pathlib import Path
 from collections import defaultdict
 
+import numpy as np
+
+import units
+from page_source import PageSource
+from spec_rules import DEFAULT_RULES, by_unit, select, split_pages, values
+
 def extract_with_pymupdf(pdf_path):
-    """Extrai texto usando PyMuPDF (mais robusto)"""
+    """Extrai texto usando PyMuPDF (mais robusto), via page_source.py"""
     
     print(f"\n{'='*80}")
     print(f"Processando: {pdf_path.name}")
     
     all_text = ""
-    doc = fitz.open(pdf_path)
-    
-    print(f"Total de páginas: {len(doc)}")
-    
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        text = page.get_text()
-        all_text += f"\n--- PÁGINA {page_num + 1} ---\n{text}\n"
-    
-    doc.close()
+    with PageSource(pdf_path) as source:
+        print(f"Total de páginas: {len(source)}")
+        
+        for pagina in source.pages():
+            all_text += f"\n--- PÁGINA {pagina['pagina']} ---\n{pagina['texto']}\n"
     
     # Salvar texto extraído
     output_txt = pdf_path.stem + "-pymupdf.txt"
@@ -60,157 +60,105 @@ def analyze_specifications(text, model_name):
         else:
             specs["sistema_insuflacao"] = "Leafield"
     
-    # 2. Válvulas - padrões comuns em jangadas
-    valvulas_encontradas = set()
-    
-    # Padrões de válvulas
-    valve_patterns = [
-        r'\bOTS\s*-?\s*(\d+)\b',  # OTS-65, OTS 65
-        r'\b([ABCD])\s*-?\s*(\d+)\b',  # A-10, B10, C-8
-        r'\bVALVE\s+([A-Z0-9\-]+)\b',  # VALVE A10
-    ]
+    # Uma passagem das regras partilhadas (spec_rules.py) por página
+    pages = split_pages(text)
+    findings = DEFAULT_RULES.scan_pages(pages)
     
-    for pattern in valve_patterns:
-        matches = re.finditer(pattern, text_upper)
-        for match in matches:
-            if 'OTS' in pattern:
-                valvulas_encontradas.add(f"OTS{match.group(1)}")
-            elif 'VALVE' in pattern:
-                valvulas_encontradas.add(match.group(1))
-            else:
-                # A10, B10, etc
-                letter = match.group(1)
-                num = match.group(2)
-                if letter in ['A', 'B', 'C', 'D'] and num.isdigit():
-                    valvulas_encontradas.add(f"{letter}{num}")
+    # 2. Válvulas - padrões comuns em jangadas (OTS-65, A10, VALVE X)
+    valvulas_encontradas = set()
+    for finding in select(findings, grandeza='valvula'):
+        if finding['regra'] == 'valvula_ots':
+            valvulas_encontradas.add(f"OTS{finding['valor']}")
+        elif finding['regra'] == 'valvula_letra':
+            valvulas_encontradas.add(f"{finding['letra']}{finding['numero']}")
+        else:
+            valvulas_encontradas.add(str(finding['valor']))
     
     specs["valvulas_padrao"] = sorted(list(valvulas_encontradas))
     
-    # 3. Pressões
-    # PSI
-    psi_matches = re.findall(r'(\d+\.?\d*)\s*PSI', text_upper)
-    if psi_matches:
-        psi_vals = [float(x) for x in psi_matches if 0.5 <= float(x) <= 10]
-        if psi_vals:
-            specs["pressao_trabalho"]["PSI"] = psi_vals[0]
-    
-    # mmWG (milímetros de coluna d'água)
-    mmwg_matches = re.findall(r'(\d+\.?\d*)\s*MM\s*W\.?G', text_upper)
-    if mmwg_matches:
-        specs["pressao_trabalho"]["mmWG"] = float(mmwg_matches[0])
-    
-    # inH2O (polegadas de coluna d'água)
-    inh2o_matches = re.findall(r'(\d+\.?\d*)\s*IN\s*H2O', text_upper)
-    if inh2o_matches:
-        specs["pressao_trabalho"]["inH2O"] = float(inh2o_matches[0])
-    
-    # mbar (milibares)
-    mbar_matches = re.findall(r'(\d+\.?\d*)\s*MBAR', text_upper)
-    if mbar_matches:
-        specs["pressao_trabalho"]["mbar"] = float(mbar_matches[0])
+    # 3. Pressões (primeiro valor plausível de cada unidade)
+    for unit, key in [('psi', 'PSI'), ('mmWG', 'mmWG'), ('inH2O', 'inH2O'), ('mbar', 'mbar')]:
+        found = select(findings, regra='pressao', unidade=unit)
+        if found:
+            specs["pressao_trabalho"][key] = found[0]['valor']
     
     # 4. Capacidades e cilindros CO2
-    # Procurar padrões como:
-    # "6 PERSON" ou "6 MAN" seguido de informações de cilindro
-    
-    lines = text.split('\n')
-    
-    for i, line in enumerate(lines):
-        # Buscar capacidade
-        cap_matches = re.finditer(r'(\d+)\s*(?:PERSON|MAN|PERS|P\b)', line, re.I)
+    # Capacidade ("6 PERSON", "6 MAN") seguida de informações de cilindro
+    # nas linhas próximas (3 antes, 10 depois, na mesma página)
+    for cap in select(findings, regra=('capacidade', 'capacidade_davit')):
+        capacidade = cap['valor']
+        cap_key = f"{capacidade}P"
         
-        for cap_match in cap_matches:
-            capacidade = int(cap_match.group(1))
-            
-            # Limitar a capacidades razoáveis
-            if capacidade < 4 or capacidade > 100:
-                continue
-            
-            # Buscar informações nas linhas próximas
-            context_start = max(0, i - 3)
-            context_end = min(len(lines), i + 10)
-            context = '\n'.join(lines[context_start:context_end])
-            context_upper = context.upper()
-            
-            cap_key = f"{capacidade}P"
+        if cap_key in specs["capacidades"]:
+            continue
+        
+        context = [
+            f for f in findings
+            if f['pagina'] == cap['pagina'] and cap['linha'] - 3 <= f['linha'] < cap['linha'] + 10
+        ]
+        cap_info = {
+            "capacidade_pessoas": capacidade,
+            "cilindros_co2": {},
+            "cilindros_n2": {},
+            "peso_total_kg": None,
+            "referencia_cilindro": "",
+            "pagina": cap['pagina']
+        }
+        
+        # Padrão de CO2: "2 x 160g" ou "1 x 350g"
+        co2 = select(context, regra='cilindro_co2', unidade='g')
+        if co2:
+            qtd = co2[0]['quantidade']
+            peso_g = co2[0]['valor']
             
-            if cap_key not in specs["capacidades"]:
-                cap_info = {
-                    "capacidade_pessoas": capacidade,
-                    "cilindros_co2": {},
-                    "cilindros_n2": {},
-                    "peso_total_kg": None,
-                    "referencia_cilindro": ""
-                }
-                
-                # Buscar padrão de CO2: "2 x 160g" ou "1 x 350g"
-                co2_pattern = re.search(r'(\d+)\s*[xX×]\s*(\d+)\s*G', context_upper)
-                if co2_pattern:
-                    qtd = int(co2_pattern.group(1))
-                    peso_g = int(co2_pattern.group(2))
-                    
-                    cap_info["cilindros_co2"]["quantidade"] = qtd
-                    cap_info["cilindros_co2"]["peso_individual_g"] = peso_g
-                    cap_info["cilindros_co2"]["peso_total_kg"] = round((qtd * peso_g) / 1000, 3)
-                
-                # Buscar N2 (se aplicável)
-                n2_pattern = re.search(r'N2.*?(\d+)\s*G', context_upper)
-                if n2_pattern:
-                    cap_info["cilindros_n2"]["peso_g"] = int(n2_pattern.group(1))
-                
-                # Buscar peso total
-                peso_pattern = re.search(r'WEIGHT.*?(\d+\.?\d*)\s*KG', context_upper)
-                if not peso_pattern:
-                    peso_pattern = re.search(r'(\d+\.?\d*)\s*KG', context_upper)
-                
-                if peso_pattern:
-                    peso = float(peso_pattern.group(1))
-                    # Filtrar pesos razoáveis para jangadas
-                    if 20 <= peso <= 500:
-                        cap_info["peso_total_kg"] = peso
-                
-                # Buscar referência do cilindro
-                ref_pattern = re.search(r'REF[:\s]+([A-Z0-9\-]+)', context_upper)
-                if ref_pattern:
-                    cap_info["referencia_cilindro"] = ref_pattern.group(1)
-                
-                specs["capacidades"][cap_key] = cap_info
-    
-    # 5. Weak Link
-    weak_kn = re.findall(r'(\d+\.?\d*)\s*KN', text_upper)
-    weak_lbf = re.findall(r'(\d+)\s*LBF', text_upper)
-    
-    if weak_kn:
-        kn_vals = [float(x) for x in weak_kn if 1 <= float(x) <= 15]
-        if kn_vals:
-            specs["weak_link"]["kN"] = sorted(list(set(kn_vals)))
-    
-    if weak_lbf:
-        lbf_vals = [int(x) for x in weak_lbf if 200 <= int(x) <= 3500]
-        if lbf_vals:
-            specs["weak_link"]["lbf"] = sorted(list(set(lbf_vals)))
-    
-    # 6. Torques
-    torque_matches = re.findall(r'(\d+\.?\d*)\s*NM', text_upper)
-    if torque_matches:
-        torque_vals = [float(x) for x in torque_matches if 0.5 <= float(x) <= 200]
-        if torque_vals:
-            specs["torques"]["valores_nm"] = sorted(list(set(torque_vals)))
+            cap_info["cilindros_co2"]["quantidade"] = qtd
+            cap_info["cilindros_co2"]["peso_individual_g"] = peso_g
+            cap_info["cilindros_co2"]["peso_total_kg"] = round(units.convert(qtd * peso_g, 'g', 'kg'), 3)
+        
+        # N2 (se aplicável)
+        n2 = select(context, regra='cilindro_n2')
+        if n2:
+            cap_info["cilindros_n2"]["peso_g"] = n2[0]['valor']
+        
+        # Peso total: "WEIGHT ... KG" ou, na falta, qualquer valor em KG
+        pesos = select(context, regra='peso') or select(context, regra='massa', unidade='kg')
+        # Filtrar pesos razoáveis para jangadas
+        pesos = [f['valor'] for f in pesos if 20 <= f['valor'] <= 500]
+        if pesos:
+            cap_info["peso_total_kg"] = pesos[0]
+        
+        # Referência do cilindro
+        ref = select(context, regra='referencia')
+        if ref:
+            cap_info["referencia_cilindro"] = ref[0]['valor']
+        
+        specs["capacidades"][cap_key] = cap_info
+    
+    # 5. Weak Link (valores em kN e lbf, e todos convertidos para kN)
+    forcas = select(findings, grandeza='forca')
+    weak = by_unit(forcas)
+    if weak.get('kN'):
+        specs["weak_link"]["kN"] = sorted(set(weak['kN']))
+    if weak.get('lbf'):
+        specs["weak_link"]["lbf"] = sorted(set(weak['lbf']))
+    if forcas:
+        specs["weak_link"]["kN_equivalente"] = sorted(set(
+            np.round(units.convert_findings(forcas, 'kN'), 2).tolist()))
+    
+    # 6. Torques (Nm, incluindo valores em in-lb convertidos)
+    binarios = select(findings, regra='binario')
+    if binarios:
+        specs["torques"]["valores_nm"] = sorted(set(
+            np.round(units.convert_findings(binarios, 'Nm'), 1).tolist()))
     
     # 7. Davit Launch
     if re.search(r'DAVIT\s+LAUNCH', text_upper):
         specs["davit_launch"]["disponivel"] = True
         
-        # Procurar capacidades DL
-        dl_pattern = re.finditer(r'(\d+)\s*(?:PERSON|MAN).*?DAVIT', text_upper)
-        dl_caps = set()
-        for match in dl_pattern:
-            cap = int(match.group(1))
-            if 4 <= cap <= 100:
-                dl_caps.add(cap)
-        
+        # Capacidades DL
+        dl_caps = values(findings, regra='capacidade_davit')
         if dl_caps:
-            specs["davit_launch"]["capacidades_pessoas"] = sorted(list(dl_caps))
+            specs["davit_launch"]["capacidades_pessoas"] = sorted(dl_caps)
     
     return specs
 
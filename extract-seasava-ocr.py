@@ -25,12 +25,12 @@ def check_pytesseract():
     try:
         import pytesseract
         from PIL import Image
-        import pdf2image
+        import fitz  # PyMuPDF (renderização das páginas em ocr_processor.py)
         print("✅ Bibliotecas OCR disponíveis")
         return True
     except ImportError as e:
         print(f"⚠️  Faltam bibliotecas: {e}")
-        print("Instale com: pip install pytesseract pillow pdf2image")
+        print("Instale com: pip install pytesseract pillow pymupdf")
         return False
 
 def main():
@@ -16,13 +16,9 @@ if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-try:
-    import pdfplumber
-except ImportError:
-    print("Instalando pdfplumber...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "pdfplumber", "-q"])
-    import pdfplumber
+from page_source import PageSource
+from spec_rules import DEFAULT_RULES, select
+import units
 
 MARCAS_PATH = Path(r"c:\Users\julio\Desktop\APLICACAO MASTER\LIFERAFT1.0\gestor-naval-pro\MARCAS")
 
@@ -33,48 +29,6 @@ PDFS = {
     "DSB LR97": MARCAS_PATH / "LR97.pdf",
 }
 
-class PressureConverter:
-    """Converte unidades de pressão"""
-    
-    # Constantes de conversão
-    PSI_TO_MMWG = 703.06957964  # 1 PSI = 703.07 mm WG
-    PSI_TO_INHWO = 27.68064  # 1 PSI = 27.68 inH2O
-    PSI_TO_MB = 68.948  # 1 PSI = 68.948 mbar
-    
-    @classmethod
-    def convert(cls, value, from_unit, to_unit):
-        """Converte valor de uma unidade para outra"""
-        if from_unit == to_unit:
-            return value
-        
-        # Converte tudo para PSI primeiro
-        if from_unit == 'psi':
-            psi_val = value
-        elif from_unit == 'mmWG':
-            psi_val = value / cls.PSI_TO_MMWG
-        elif from_unit == 'inH2O':
-            psi_val = value / cls.PSI_TO_INHWO
-        elif from_unit in ['mb', 'mbar', 'hPa']:
-            psi_val = value / cls.PSI_TO_MB
-        elif from_unit == 'bar':
-            psi_val = value * 14.5038
-        else:
-            return None
-        
-        # Converte de PSI para unidade destino
-        if to_unit == 'psi':
-            return psi_val
-        elif to_unit == 'mmWG':
-            return psi_val * cls.PSI_TO_MMWG
-        elif to_unit == 'inH2O':
-            return psi_val * cls.PSI_TO_INHWO
-        elif to_unit in ['mb', 'mbar', 'hPa']:
-            return psi_val * cls.PSI_TO_MB
-        elif to_unit == 'bar':
-            return psi_val / 14.5038
-        
-        return None
-
 def extract_all_numbers(text, context_lines=3):
     """Extrai todos os números de um texto com contexto"""
     lines = text.split('\n')
@@ -95,31 +49,28 @@ def extract_all_numbers(text, context_lines=3):
     
     return numbers
 
-def find_capacity_specs(text):
+def find_capacity_specs(pages, findings):
     """Procura especificações por capacidade (10p, 12p, etc)"""
     specs = {}
+    lines_by_page = {p['pagina']: p['texto'].split('\n') for p in pages}
     
-    # Padrão para encontrar capacidade
-    capacity_pattern = r'(\d+)\s*(?:person|p|people|persons)(?:\s|,|\.)'
-    
-    lines = text.split('\n')
-    for line in lines:
-        cap_match = re.search(capacity_pattern, line, re.IGNORECASE)
-        if cap_match:
-            capacity = f"{cap_match.group(1)}p"
-            
-            # Extrai números da linha
-            numbers = re.findall(r'(\d+\.?\d*)', line)
-            
-            if numbers and capacity not in specs:
-                specs[capacity] = {
-                    'linha': line.strip(),
-                    'numeros': [float(n) for n in numbers]
-                }
+    for finding in select(findings, regra=('capacidade', 'capacidade_davit'), plausible=False):
+        capacity = f"{finding['valor']}p"
+        line = lines_by_page[finding['pagina']][finding['linha']]
+        
+        # Extrai números da linha
+        numbers = re.findall(r'(\d+\.?\d*)', line)
+        
+        if numbers and capacity not in specs:
+            specs[capacity] = {
+                'linha': line.strip(),
+                'numeros': [float(n) for n in numbers],
+                'pagina': finding['pagina']
+            }
     
     return specs
 
-def find_davit_launch_data(text):
+def find_davit_launch_data(text, findings):
     """Procura dados específicos de davit launch"""
     davit_data = {
         "weak_link": [],
@@ -160,14 +111,16 @@ def find_davit_launch_data(text):
                     'linha': line.strip(),
                     'contexto': ' | '.join(context)
                 })
-                
-                # Procura por números próximos
-                numbers = re.findall(r'(\d+\.?\d*)\s*(?:kN|lbf|lbs|kg|N|mm)', line)
-                if numbers:
-                    if 'weak' in keyword.lower() or 'chain' in keyword.lower():
-                        davit_data['weak_link'].extend(numbers)
-                    if 'bridle' in keyword.lower():
-                        davit_data['bridle'].extend(numbers)
+    
+    # Valores com unidade vêm das regras partilhadas (spec_rules.py), com página
+    for finding in select(findings, regra='weak_link'):
+        davit_data['weak_link'].append({
+            'valor': finding['valor'], 'unidade': finding['unidade'], 'pagina': finding['pagina']
+        })
+    for finding in select(findings, regra='bridle_peso'):
+        davit_data['bridle'].append({
+            'valor': finding['valor'], 'unidade': finding['unidade'], 'pagina': finding['pagina']
+        })
     
     return davit_data
 
@@ -185,6 +138,7 @@ def extract_from_pdf_advanced(modelo_name, pdf_path, debug=False):
             "modelo": modelo_name,
             "arquivo": pdf_path.name,
             "pressaoTrabalho": {},
+            "pressaoTrabalho_paginas": {},
             "pressaoTrabalho_convertida": {},
             "davitLaunch": {},
             "especificacoesPorCapacidade": {},
@@ -193,79 +147,59 @@ def extract_from_pdf_advanced(modelo_name, pdf_path, debug=False):
             "status": "sucesso"
         }
         
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
+        with PageSource(pdf_path) as source:
+            total_pages = len(source)
             result['total_paginas'] = total_pages
             
             print(f"   Páginas: {total_pages}")
             
-            # Coleta texto completo (estratégia: primeiras páginas + últimas páginas)
-            text_parts = []
-            
-            # Primeiras 50 páginas
-            for page_num in range(min(50, total_pages)):
-                try:
-                    page = pdf.pages[page_num]
-                    text = page.extract_text()
-                    if text:
-                        text_parts.append(text)
-                except:
-                    pass
-            
-            # Últimas 20 páginas
-            for page_num in range(max(0, total_pages - 20), total_pages):
-                try:
-                    page = pdf.pages[page_num]
-                    text = page.extract_text()
-                    if text:
-                        text_parts.append(text)
-                except:
-                    pass
-            
-            full_text = '\n'.join(text_parts)
-            
-            if debug:
-                result['texto_amostrado'] = full_text[:1000]
-            
-            # Extrai pressão
-            pressure_patterns = [
-                (r'(\d+\.?\d*)\s*(?:PSI|psi)', 'psi'),
-                (r'(\d+\.?\d*)\s*mm\s*WG', 'mmWG'),
-                (r'(\d+\.?\d*)\s*(?:mm\s*)?H2O|in\s*H2O', 'inH2O'),
-                (r'(\d+\.?\d*)\s*(?:mb|mbar|hPa)', 'milibares'),
-                (r'(\d+\.?\d*)\s*bar', 'bar'),
-            ]
-            
-            for pattern, unit in pressure_patterns:
-                match = re.search(pattern, full_text, re.IGNORECASE)
-                if match:
-                    value = float(match.group(1))
-                    result['pressaoTrabalho'][unit] = value
-            
-            # Converte para todas as unidades
-            if result['pressaoTrabalho']:
-                source_unit = list(result['pressaoTrabalho'].keys())[0]
-                source_value = result['pressaoTrabalho'][source_unit]
-                
-                for target_unit in ['psi', 'mmWG', 'inH2O', 'milibares']:
-                    converted = PressureConverter.convert(source_value, source_unit, target_unit)
-                    if converted:
-                        result['pressaoTrabalho_convertida'][target_unit] = round(converted, 2)
-            
-            # Extrai especificações por capacidade
-            capacity_specs = find_capacity_specs(full_text)
-            if capacity_specs:
-                result['especificacoesPorCapacidade'] = capacity_specs
-            
-            # Extrai dados de davit launch
-            davit_data = find_davit_launch_data(full_text)
-            if davit_data['raw_findings']:
-                result['davitLaunch'] = davit_data
-            
-            # Extrai amostra de números encontrados
-            all_numbers = extract_all_numbers(full_text)
-            result['numeros_encontrados'] = all_numbers[:20]  # Primeiros 20
+            # Coleta texto (estratégia: primeiras 50 páginas + últimas 20)
+            pages = sorted(set(range(1, min(50, total_pages) + 1)) |
+                           set(range(max(1, total_pages - 19), total_pages + 1)))
+            records = [p for p in source.pages(pages) if p['texto']]
+        
+        full_text = '\n'.join(p['texto'] for p in records)
+        
+        if debug:
+            result['texto_amostrado'] = full_text[:1000]
+        
+        # Uma passagem das regras partilhadas por página (spec_rules.py)
+        findings = DEFAULT_RULES.scan_pages(records)
+        
+        # Extrai pressão (primeiro valor plausível por unidade)
+        pressure_units = [
+            ('psi', 'psi'), ('mmWG', 'mmWG'), ('inH2O', 'inH2O'),
+            ('mbar', 'milibares'), ('hPa', 'milibares'), ('bar', 'bar'),
+        ]
+        for unit, key in pressure_units:
+            found = select(findings, regra='pressao', unidade=unit)
+            if found and key not in result['pressaoTrabalho']:
+                result['pressaoTrabalho'][key] = found[0]['valor']
+                result['pressaoTrabalho_paginas'][key] = found[0]['pagina']
+        
+        # Converte para todas as unidades (units.py)
+        if result['pressaoTrabalho']:
+            source_unit = list(result['pressaoTrabalho'].keys())[0]
+            source_value = result['pressaoTrabalho'][source_unit]
             
+            converted = units.to_all(source_value, source_unit, units.PRESSURE_REPORT_UNITS, decimals=2)
+            converted['milibares'] = converted.pop('mbar')
+            result['pressaoTrabalho_convertida'] = converted
+        
+        # Extrai especificações por capacidade
+        capacity_specs = find_capacity_specs(records, findings)
+        if capacity_specs:
+            result['especificacoesPorCapacidade'] = capacity_specs
+        
+        # Extrai dados de davit launch
+        davit_data = find_davit_launch_data(full_text, findings)
+        if davit_data['raw_findings']:
+            result['davitLaunch'] = davit_data
+        
+        # Extrai amostra de números encontrados
+        all_numbers = extract_all_numbers(full_text)
+        result['numeros_encontrados'] = all_numbers[:20]  # Primeiros 20
+        
         return result
         
     except Exception as e:
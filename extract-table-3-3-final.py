@@ -1,4 +1,4 @@
-import pdfplumber
+from page_source import PageSource
 import json
 
 pdf_path = r'MARCAS\Eurovinil Leisure Syntesy Liferafts & Crewsaver ISO Type1(2) Mk 2 Mariner Mk 2_1.pdf'
@@ -7,15 +7,14 @@ print("="*80)
 print("EXTRAÇÃO TABELA 3.3 - PÁGINAS 44-60")
 print("="*80)
 
-pdf = pdfplumber.open(pdf_path)
+pdf = PageSource(pdf_path)  # texto PyMuPDF, tabelas pdfplumber (via cache)
 
 # Páginas 44-60 (índices 43-59)
 for i in range(43, 60):
-    if i >= len(pdf.pages):
+    if i >= len(pdf):
         break
         
-    page = pdf.pages[i]
-    text = page.extract_text()
+    text = pdf.text(i+1)
     
     print(f"\n{'='*80}")
     print(f"PAGINA {i+1}")
@@ -24,7 +23,7 @@ for i in range(43, 60):
     if text:
         print(text)
         
-        tables = page.extract_tables()
+        tables = pdf.tables(i+1)
         if tables:
             print(f"\n[{len(tables)} TABELAS]:")
             for idx, table in enumerate(tables):
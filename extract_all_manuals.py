@@ -1,115 +1,191 @@
 #!/usr/bin/env python3
+"""
+Extrai texto, tabelas e resumo de keywords de todos os manuais em MARCAS/,
+MARCAS/boletins/ e legislaçao/
+
+Uso: python extract_all_manuals.py [--workers N] [--full]
+  --workers N  reparte as páginas de cada manual por N processos
+  --full       ignora o manifesto e reprocessa todos os documentos
+
+Por omissão só são reprocessados documentos novos ou modificados desde a
+última execução (ver manifest.py); saídas de documentos apagados são removidas.
+"""
+
+import argparse
 import os
 import json
 import re
 from pathlib import Path
 
-try:
-    import pdfplumber
-except ImportError:
-    import subprocess
-    import sys
-    print("📥 Instalando pdfplumber...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "pdfplumber"])
-    import pdfplumber
-
-# Diretório com PDFs
-pdf_dir = Path("MARCAS")
+from manifest import Manifest, print_changes, scan_inputs
+from page_source import PageSource
+
 output_dir = Path("extracted_manuals")
-output_dir.mkdir(exist_ok=True)
 
-# Procurar todos os PDFs
-pdf_files = list(pdf_dir.rglob("*.pdf"))
-print(f"\n📚 Encontrados {len(pdf_files)} manuais para processar:\n")
 
-for pdf_file in sorted(pdf_files):
+def output_files(pdf_file):
+    """Ficheiros gerados para um documento"""
+    prefix = output_dir / Path(pdf_file).stem
+    return [Path(f"{prefix}{suffix}") for suffix in ("_extracted.txt", "_tables.json", "_summary.json")]
+
+
+def duplicate_stems(pdf_files):
+    """
+    Nomes (sem extensão) partilhados por mais de um documento -> caminhos
+
+    As saídas são nomeadas só pelo nome do PDF (MkIII_tables.json, lido pelos
+    outros scripts), pelo que dois documentos com o mesmo nome em pastas
+    diferentes escreveriam nos mesmos ficheiros.
+    """
+    by_stem = {}
+    for pdf_file in pdf_files:
+        by_stem.setdefault(Path(pdf_file).stem, []).append(pdf_file)
+    return {stem: paths for stem, paths in by_stem.items() if len(paths) > 1}
+
+
+def process_manual(pdf_file, workers=1):
+    """Extrai um manual e grava *_extracted.txt, *_tables.json e *_summary.json"""
     print(f"📄 Processando: {pdf_file.name}...")
-    relative_path = pdf_file.relative_to(pdf_dir)
-    
-    try:
-        with pdfplumber.open(str(pdf_file)) as pdf:
-            pages_count = len(pdf.pages)
-            print(f"   📑 Total de páginas: {pages_count}")
-            
-            # Extrair texto
-            full_text = ""
-            for page_num, page in enumerate(pdf.pages, 1):
-                text = page.extract_text()
-                if text:
-                    full_text += f"\n{'='*60}\nPÁGINA {page_num}\n{'='*60}\n{text}\n"
-            
-            # Extrair tabelas
-            all_tables = []
-            table_count = 0
-            for page_num, page in enumerate(pdf.pages, 1):
-                tables = page.extract_tables()
-                if tables:
-                    table_count += len(tables)
-                    for table_idx, table in enumerate(tables):
-                        all_tables.append({
-                            "página": page_num,
-                            "índice": table_idx,
-                            "dados": table
-                        })
-            
-            # Procurar keywords importantes
-            keywords_found = {
-                "especificação": 0,
-                "composição": 0,
-                "spare": 0,
-                "component": 0,
-                "material": 0,
-                "capacity": 0,
-                "weight": 0,
-                "dimension": 0
-            }
-            
-            text_lower = full_text.lower()
-            for keyword in keywords_found:
-                keywords_found[keyword] = len(re.findall(keyword, text_lower))
-            
-            # Salvar resultados
-            base_name = pdf_file.stem
-            output_prefix = output_dir / base_name
-            
-            # Salvar texto
-            text_file = f"{output_prefix}_extracted.txt"
-            with open(text_file, "w", encoding="utf-8") as f:
-                f.write(full_text)
-            
-            # Salvar tabelas
-            tables_file = f"{output_prefix}_tables.json"
-            with open(tables_file, "w", encoding="utf-8") as f:
-                json.dump({
-                    "arquivo": str(pdf_file),
-                    "páginas": pages_count,
-                    "tabelas_total": table_count,
-                    "data": all_tables
-                }, f, indent=2, ensure_ascii=False)
-            
-            # Salvar resumo
-            summary_file = f"{output_prefix}_summary.json"
-            with open(summary_file, "w", encoding="utf-8") as f:
-                json.dump({
-                    "arquivo": str(pdf_file),
-                    "páginas": pages_count,
-                    "tabelas": table_count,
-                    "keywords": keywords_found
-                }, f, indent=2, ensure_ascii=False)
-            
-            print(f"   ✅ Texto → {text_file}")
-            print(f"   ✅ Tabelas ({table_count}) → {tables_file}")
-            print(f"   ✅ Resumo → {summary_file}")
-            
-    except Exception as e:
-        print(f"   ❌ Erro ao processar {pdf_file.name}: {str(e)}")
-
-print(f"\n{'='*60}")
-print(f"✅ Extração completa!")
-print(f"📁 Arquivos salvos em: {output_dir}/")
-print(f"{'='*60}\n")
-
-# Listar arquivos gerados
-print("📋 Arquivos gerados:")
-for file in sorted(output_dir.glob("*")):
-    print(f"   • {file.name}")
+
+    # Texto via PyMuPDF; tabelas (pdfplumber) só em páginas com réguas de tabela
+    with PageSource(pdf_file) as source:
+        paginas = source.pages(tables=True, workers=workers)
+    pages_count = len(paginas)
+    print(f"   📑 Total de páginas: {pages_count}")
+
+    full_text = ""
+    all_tables = []
+    table_count = 0
+    for pagina in paginas:
+        # Texto
+        text = pagina["texto"]
+        if text:
+            full_text += f"\n{'='*60}\nPÁGINA {pagina['pagina']}\n{'='*60}\n{text}\n"
+
+        # Tabelas
+        tables = pagina["tabelas"]
+        if tables:
+            table_count += len(tables)
+            for table_idx, table in enumerate(tables):
+                all_tables.append({
+                    "página": pagina["pagina"],
+                    "índice": table_idx,
+                    "dados": table
+                })
+
+    # Procurar keywords importantes
+    keywords_found = {
+        "especificação": 0,
+        "composição": 0,
+        "spare": 0,
+        "component": 0,
+        "material": 0,
+        "capacity": 0,
+        "weight": 0,
+        "dimension": 0
+    }
+
+    text_lower = full_text.lower()
+    for keyword in keywords_found:
+        keywords_found[keyword] = len(re.findall(keyword, text_lower))
+
+    # Salvar resultados
+    base_name = pdf_file.stem
+    output_prefix = output_dir / base_name
+
+    # Salvar texto
+    text_file = f"{output_prefix}_extracted.txt"
+    with open(text_file, "w", encoding="utf-8") as f:
+        f.write(full_text)
+
+    # Salvar tabelas
+    tables_file = f"{output_prefix}_tables.json"
+    with open(tables_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "arquivo": str(pdf_file),
+            "páginas": pages_count,
+            "tabelas_total": table_count,
+            "data": all_tables
+        }, f, indent=2, ensure_ascii=False)
+
+    # Salvar resumo
+    summary_file = f"{output_prefix}_summary.json"
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "arquivo": str(pdf_file),
+            "páginas": pages_count,
+            "tabelas": table_count,
+            "keywords": keywords_found
+        }, f, indent=2, ensure_ascii=False)
+
+    print(f"   ✅ Texto → {text_file}")
+    print(f"   ✅ Tabelas ({table_count}) → {tables_file}")
+    print(f"   ✅ Resumo → {summary_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrai texto e tabelas dos manuais, boletins e legislação")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"processos para extração paralela de páginas (ex: {os.cpu_count()})")
+    parser.add_argument("--full", action="store_true",
+                        help="ignora o manifesto e reprocessa todos os documentos")
+    args = parser.parse_args()
+
+    output_dir.mkdir(exist_ok=True)
+
+    # Comparar documentos atuais com o manifesto da última execução
+    pdf_files = scan_inputs()
+    duplicates = duplicate_stems(pdf_files)
+    if duplicates:
+        print("\n❌ Documentos com o mesmo nome em pastas diferentes (as saídas colidiriam):")
+        for stem, paths in sorted(duplicates.items()):
+            print(f"   • {stem}: " + ", ".join(str(p) for p in paths))
+        print("   Renomeie um deles e volte a executar.\n")
+        raise SystemExit(1)
+    manifest = Manifest("extract_all_manuals")
+    changes = manifest.changes(pdf_files)
+    print(f"\n📚 Encontrados {len(pdf_files)} documentos:\n")
+    print_changes(changes)
+
+    if args.full:
+        to_process = pdf_files
+    else:
+        # Inalterados cujas saídas desapareceram também são refeitos
+        to_process = changes["novos"] + changes["modificados"] + [
+            p for p in changes["inalterados"] if not all(f.exists() for f in output_files(p))
+        ]
+    print(f"\n🔄 A processar: {len(to_process)}\n")
+    if args.workers > 1:
+        print(f"⚡ Modo paralelo: {args.workers} processos\n")
+
+    # Um documento movido para outra pasta mantém o nome: as saídas são dele
+    current_stems = {p.stem for p in pdf_files}
+    for removed in changes["removidos"]:
+        for output in output_files(removed):
+            if Path(removed).stem not in current_stems and output.exists():
+                output.unlink()
+                print(f"   🗑️  Removido: {output}")
+        manifest.forget(removed)
+
+    for pdf_file in sorted(to_process):
+        try:
+            process_manual(pdf_file, args.workers)
+            manifest.mark(pdf_file)
+        except Exception as e:
+            print(f"   ❌ Erro ao processar {pdf_file.name}: {str(e)}")
+
+    manifest.save()
+
+    print(f"\n{'='*60}")
+    print(f"✅ Extração completa!")
+    print(f"📁 Arquivos salvos em: {output_dir}/")
+    print(f"{'='*60}\n")
+
+    # Listar arquivos gerados
+    print("📋 Arquivos gerados:")
+    for file in sorted(output_dir.glob("*")):
+        print(f"   • {file.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,26 @@
-import subprocess
-import sys
-
-# Instalar pdfplumber
-print("📥 Instalando pdfplumber...")
-subprocess.check_call([sys.executable, "-m", "pip", "install", "pdfplumber", "-q"])
-
-import pdfplumber
 import json
 from pathlib import Path
 
+from page_source import PageSource
+
 pdf_path = "MARCAS/LR97.pdf"
 
 try:
-    with pdfplumber.open(pdf_path) as pdf:
-        print(f"\n📄 LR97.pdf - Total de páginas: {len(pdf.pages)}\n")
+    with PageSource(pdf_path) as source:
+        print(f"\n📄 LR97.pdf - Total de páginas: {len(source)}\n")
         
-        # Extrair texto de todas as páginas
+        # Extrair texto de todas as páginas (PyMuPDF) e tabelas onde há réguas (pdfplumber)
         full_text = ""
         all_tables = []
         
-        for i, page in enumerate(pdf.pages):
-            text = page.extract_text()
+        for pagina in source.pages(tables=True):
+            i = pagina['pagina'] - 1
+            text = pagina['texto']
             full_text += f"\n{'='*60}\nPÁGINA {i+1}\n{'='*60}\n"
             full_text += text
             
             # Extrair tabelas
-            tables = page.extract_tables()
+            tables = pagina['tabelas']
             if tables:
                 print(f"✅ Encontradas {len(tables)} tabela(s) na página {i+1}")
                 for j, table in enumerate(tables):
@@ -1,22 +1,43 @@
 #!/usr/bin/env python3
+"""
+Extrai as imagens embutidas dos manuais em MARCAS/ (por xref, sem renderizar)
+
+Cada imagem é lida diretamente do seu stream no PDF (PyMuPDF
+Document.extract_image): JPEG/JPX ficam com os bytes originais, os
+restantes formatos são gravados em PNG sem perdas. Não há recorte nem
+renderização da página. Uma imagem referenciada em várias páginas
+(logótipos, cabeçalhos, a mesma figura repetida) tem um só xref e é
+gravada uma vez; o índice regista todas as páginas onde aparece. O texto
+de cada página é lido uma só vez (e só em páginas com imagens) para marcar
+as imagens próximas de spares.
+
+Os manuais são repartidos por um conjunto de processos (um manual por
+tarefa).
+
+Uso: python extract_manual_images.py [--workers 4]
+  Grava extracted_images/<manual>/page_NNN_image_II.<ext> e imagens.json.
+"""
+
+import argparse
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 try:
-    import pdfplumber
-    from PIL import Image
+    import fitz  # PyMuPDF
 except ImportError:
     import subprocess
     import sys
-    print("📥 Instalando pdfplumber e Pillow...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "pdfplumber", "pillow"])
-    import pdfplumber
-    from PIL import Image
+    print("📥 Instalando PyMuPDF...")
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "PyMuPDF"])
+    import fitz
+
+from keyword_matcher import KeywordMatcher
 
 # Diretório com PDFs e output
 pdf_dir = Path("MARCAS")
 output_dir = Path("extracted_images")
-output_dir.mkdir(exist_ok=True)
 
 # Procurar espares keywords
 spare_keywords = [
@@ -24,70 +45,123 @@ spare_keywords = [
     "glue", "tape", "seal", "patch", "light", "mirror", "pack", "knife",
     "seasickness", "seasick", "first aid", "aid kit", "repair", "reparação"
 ]
+spare_matcher = KeywordMatcher(spare_keywords)
+
+# Imagens com lado <= isto (px) são ícones/marcadores
+MIN_SIZE = 50
+
+
+def extract_manual(pdf_file, out_root=output_dir):
+    """Extrai as imagens de um manual; devolve o resumo (também gravado em imagens.json)"""
+    pdf_file = Path(pdf_file)
+    manual_dir = Path(out_root) / pdf_file.stem
+    manual_dir.mkdir(parents=True, exist_ok=True)
+
+    images = {}
+    references = 0
+    with fitz.open(str(pdf_file)) as doc:
+        for page_num, page in enumerate(doc, 1):
+            # (xref, smask, largura, altura, ...) vêm do dicionário da imagem, sem a descodificar
+            page_images = [info for info in page.get_images(full=True)
+                           if info[2] > MIN_SIZE and info[3] > MIN_SIZE]
+            if not page_images:
+                continue
+            # Texto uma vez por página
+            is_spare = spare_matcher.search(page.get_text()) is not None
+
+            for image_index, info in enumerate(page_images):
+                xref = info[0]
+                references += 1
+                if xref in images:
+                    entry = images[xref]
+                    if page_num not in entry["paginas"]:
+                        entry["paginas"].append(page_num)
+                    entry["spare"] = entry["spare"] or is_spare
+                    continue
+                try:
+                    data = doc.extract_image(xref)
+                except Exception:
+                    data = None
+                if not data or not data.get("image"):
+                    continue
+                filename = f"page_{page_num:03d}_image_{image_index:02d}.{data['ext']}"
+                (manual_dir / filename).write_bytes(data["image"])
+                images[xref] = {
+                    "xref": xref,
+                    "arquivo": filename,
+                    "largura": data["width"],
+                    "altura": data["height"],
+                    "formato": data["ext"],
+                    "bytes": len(data["image"]),
+                    "paginas": [page_num],
+                    "spare": is_spare,
+                }
+        page_count = doc.page_count
+
+    summary = {
+        "arquivo": str(pdf_file),
+        "paginas": page_count,
+        "imagens": len(images),
+        "referencias": references,
+        "spare": sum(1 for entry in images.values() if entry["spare"]),
+        "bytes": sum(entry["bytes"] for entry in images.values()),
+    }
+    with open(manual_dir / "imagens.json", "w", encoding="utf-8") as f:
+        json.dump({**summary, "data": list(images.values())}, f, indent=2, ensure_ascii=False)
+    return summary
+
+
+def extract_all(pdf_files, workers=1):
+    """Gera (pdf, resumo ou exceção) por ordem de conclusão"""
+    if workers > 1 and len(pdf_files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(extract_manual, pdf_file): pdf_file for pdf_file in pdf_files}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+    else:
+        for pdf_file in pdf_files:
+            try:
+                yield pdf_file, extract_manual(pdf_file)
+            except Exception as e:
+                yield pdf_file, e
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrai as imagens embutidas dos manuais")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="manuais em paralelo")
+    args = parser.parse_args()
+
+    output_dir.mkdir(exist_ok=True)
+    pdf_files = sorted(pdf_dir.rglob("*.pdf"))
+    print(f"\n🖼️  Extraindo imagens de {len(pdf_files)} manuais ({args.workers} processo(s))...\n")
+
+    for pdf_file, summary in extract_all(pdf_files, args.workers):
+        if isinstance(summary, Exception):
+            print(f"📄 {pdf_file.stem}: ❌ Erro: {summary}")
+            continue
+        shared = summary["referencias"] - summary["imagens"]
+        print(f"📄 {pdf_file.stem}: ✅ {summary['imagens']} imagens extraídas "
+              f"({summary['spare']} próximas a spares, {shared} referência(s) repetida(s), "
+              f"{summary['bytes'] / 1e6:.1f} MB)")
+
+    print(f"\n{'='*60}")
+    print(f"✅ Extração de imagens completa!")
+    print(f"📁 Imagens salvas em: {output_dir}/")
+    print(f"{'='*60}\n")
+
+    # Listar estrutura de pastas
+    print("📋 Estrutura de imagens:")
+    for manual_folder in sorted(output_dir.iterdir()):
+        if manual_folder.is_dir():
+            img_count = sum(1 for f in manual_folder.iterdir() if f.name.startswith("page_"))
+            if img_count > 0:
+                print(f"   📦 {manual_folder.name}/")
+                print(f"      └─ {img_count} imagens")
+
 
-pdf_files = list(pdf_dir.rglob("*.pdf"))
-print(f"\n🖼️  Extraindo imagens de {len(pdf_files)} manuais...\n")
-
-for pdf_file in sorted(pdf_files):
-    base_name = pdf_file.stem
-    manual_dir = output_dir / base_name
-    manual_dir.mkdir(exist_ok=True)
-    
-    print(f"📄 {base_name}...")
-    
-    image_count = 0
-    spare_images = 0
-    
-    try:
-        with pdfplumber.open(str(pdf_file)) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                # Extrair imagens
-                for image_index, image in enumerate(page.images):
-                    try:
-                        # Pegar o objeto da imagem
-                        x0 = image["x0"]
-                        y0 = image["y0"]
-                        x1 = image["x1"]
-                        y1 = image["y1"]
-                        
-                        # Extrair usando crop
-                        cropped = page.crop((x0, y0, x1, y1))
-                        img_array = cropped.to_image()
-                        
-                        # Verificar se é próximo a keywords de spares
-                        page_text = (page.extract_text() or "").lower()
-                        is_spare = any(keyword in page_text for keyword in spare_keywords)
-                        
-                        # Salvar imagem
-                        if img_array.size[0] > 50 and img_array.size[1] > 50:  # Filtrar muito pequenas
-                            filename = f"page_{page_num:03d}_image_{image_index:02d}.png"
-                            filepath = manual_dir / filename
-                            img_array.save(filepath)
-                            
-                            image_count += 1
-                            if is_spare:
-                                spare_images += 1
-                            
-                            if image_count % 10 == 0:
-                                print(f"   ... {image_count} imagens", end="\r")
-                    except Exception as e:
-                        pass
-        
-        print(f"   ✅ {image_count} imagens extraídas ({spare_images} próximas a spares)    ")
-        
-    except Exception as e:
-        print(f"   ❌ Erro: {str(e)}")
-
-print(f"\n{'='*60}")
-print(f"✅ Extração de imagens completa!")
-print(f"📁 Imagens salvas em: {output_dir}/")
-print(f"{'='*60}\n")
-
-# Listar estrutura de pastas
-print("📋 Estrutura de imagens:")
-for manual_folder in sorted(output_dir.iterdir()):
-    if manual_folder.is_dir():
-        img_count = len(list(manual_folder.glob("*.png")))
-        if img_count > 0:
-            print(f"   📦 {manual_folder.name}/")
-            print(f"      └─ {img_count} imagens")
+if __name__ == "__main__":
+    main()
@@ -1,118 +1,195 @@
 #!/usr/bin/env python3
+"""
+Exporta as páginas do MK IV (e os quadrantes com conteúdo) para o armazém de imagens
+
+As páginas são repartidas em blocos contíguos por um conjunto de processos;
+cada processo abre o PDF uma vez e renderiza uma página de cada vez
+(PyMuPDF), pelo que a memória não depende do número de páginas. O brilho de
+cada quadrante é a média NumPy de uma vista sobre os samples do Pixmap (sem
+cópia) e só os quadrantes com conteúdo (brilho < `BLANK_BRIGHTNESS`) são
+recortados dessa mesma vista e realçados.
+
+Páginas e quadrantes vão para o armazém endereçado por conteúdo
+(image_store.py): cada imagem única é gravada uma vez em
+spare_parts_images/blobs/ e MK_IV_index.json mapeia os nomes antigos
+(page_001.png, page_001_Q1_tl.png) para os blobs.
+
+Uso: python extract_mk4_images.py [--workers 4] [--pages 1-680] [--dpi 150] [--formato webp|png]
+"""
+
+import argparse
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 try:
-    from pdf2image import convert_from_path
-    from PIL import Image
+    from PIL import Image, ImageEnhance
 except ImportError:
     import subprocess
     import sys
     print("📥 Instalando dependências...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "pdf2image", "pillow"])
-    from pdf2image import convert_from_path
-    from PIL import Image
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "pillow"])
+    from PIL import Image, ImageEnhance
+
+from image_store import DEFAULT_FORMAT, FORMATS, PAGE_REGION, ImageStore, write_blob
+from page_renderer import pixmap_array
+from pdf_cache import _shard
 
 pdf_dir = Path("MARCAS")
 output_dir = Path("spare_parts_images")
-output_dir.mkdir(exist_ok=True)
 
-# Processar MK IV
 mk4_file = pdf_dir / "SURVIVA MKIV" / "MK IV.pdf"
-mk4_spares_dir = output_dir / "MK_IV"
-mk4_spares_dir.mkdir(exist_ok=True)
-
-print(f"\n🖼️  Extraindo imagens do MK IV...\n")
-
-if not mk4_file.exists():
-    print(f"❌ Arquivo não encontrado: {mk4_file}")
-else:
-    print(f"📄 Convertendo MK IV.pdf para imagens...")
-    
-    try:
-        # Converter PDF para imagens (pode levar tempo)
-        images = convert_from_path(str(mk4_file), dpi=150)
-        
-        print(f"✅ {len(images)} páginas convertidas")
-        
-        # Salvar todas as páginas como imagem
-        for idx, image in enumerate(images, 1):
-            # Salvar página completa
-            filename = f"page_{idx:03d}.png"
-            filepath = mk4_spares_dir / filename
-            image.save(filepath, 'PNG')
-            
-            # Procurar por regiões de interesse (presumindo que spares estão em áreas específicas)
-            width, height = image.size
-            
-            # Dividir página em 4 quadrantes para processar
-            quadrants = [
-                ((0, 0, width//2, height//2), f"page_{idx:03d}_Q1_tl.png"),
-                ((width//2, 0, width, height//2), f"page_{idx:03d}_Q2_tr.png"),
-                ((0, height//2, width//2, height), f"page_{idx:03d}_Q3_bl.png"),
-                ((width//2, height//2, width, height), f"page_{idx:03d}_Q4_br.png"),
-            ]
-            
-            # Salvar quadrantes com contraste aumentado (para encontrar diagramas)
-            for box, qname in quadrants:
-                quad_img = image.crop(box)
-                
-                # Detectar se tem conteúdo (não é só branco)
-                # Calcular média de pixels
-                pixels = list(quad_img.getdata())
-                avg_brightness = sum(p if isinstance(p, int) else sum(p[:3])//3 for p in pixels) / len(pixels)
-                
-                # Se tem conteúdo (não é branco puro ~255)
-                if avg_brightness < 240:
-                    # Aumentar contraste para realçar diagramas
-                    from PIL import ImageEnhance
-                    enhancer = ImageEnhance.Contrast(quad_img)
-                    quad_img = enhancer.enhance(1.5)
-                    
-                    quad_img.save(mk4_spares_dir / qname, 'PNG')
-            
-            if idx % 50 == 0:
-                print(f"   ... {idx} páginas processadas")
-
-        print(f"\n{'='*60}")
-        print(f"✅ Extração completa!")
-        print(f"📁 Imagens salvas em: {mk4_spares_dir}/\n")
-        
-        # Contar arquivos
-        png_files = list(mk4_spares_dir.glob("*.png"))
-        print(f"📊 Arquivos gerados: {len(png_files)}\n")
-        
-        # Criar índice JSON
-        index = {
-            "manual": "MK IV",
-            "total_paginas": len(images),
-            "total_imagens": len(png_files),
-            "diretorio": str(mk4_spares_dir),
-            "paginas": []
-        }
-        
-        for idx in range(1, len(images) + 1):
-            index["paginas"].append({
-                "numero": idx,
-                "arquivo_completo": f"page_{idx:03d}.png",
-                "quadrantes": [
-                    f"page_{idx:03d}_Q1_tl.png",
-                    f"page_{idx:03d}_Q2_tr.png",
-                    f"page_{idx:03d}_Q3_bl.png",
-                    f"page_{idx:03d}_Q4_br.png"
-                ]
-            })
-        
-        # Salvar índice
-        index_file = output_dir / "MK_IV_index.json"
-        with open(index_file, 'w', encoding='utf-8') as f:
-            json.dump(index, f, indent=2, ensure_ascii=False)
-        
-        print(f"📋 Índice salvo em: {index_file}\n")
-        
-    except Exception as e:
-        print(f"❌ Erro ao processar: {e}")
-        print(f"\n💡 Dica: Se receber erro de 'poppler', instale:")
-        print(f"   Windows: https://github.com/oschwartz10612/poppler-windows/releases/")
-        print(f"   Mac: brew install poppler")
-        print(f"   Linux: sudo apt-get install poppler-utils")
+MANUAL = "MK IV"
+
+EXPORT_DPI = 150
+# Quadrantes com brilho médio acima disto são página em branco (~255)
+BLANK_BRIGHTNESS = 240
+# Realce de contraste dos quadrantes (para encontrar diagramas)
+CONTRAST = 1.5
+
+QUADRANTS = ("Q1_tl", "Q2_tr", "Q3_bl", "Q4_br")
+
+
+def quadrant_boxes(width, height):
+    """(esquerda, topo, direita, fundo) dos 4 quadrantes, pela ordem de QUADRANTS"""
+    return [
+        (0, 0, width // 2, height // 2),
+        (width // 2, 0, width, height // 2),
+        (0, height // 2, width // 2, height),
+        (width // 2, height // 2, width, height),
+    ]
+
+
+def export_page(page, page_num, root, fmt=DEFAULT_FORMAT, dpi=EXPORT_DPI):
+    """Grava a página e os quadrantes com conteúdo no armazém; devolve o registo do índice"""
+    import fitz  # PyMuPDF
+
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csRGB, alpha=False)
+    pixels = pixmap_array(pix)
+    blobs = [(PAGE_REGION, write_blob(pixels, root, fmt))]
+
+    quadrants = []
+    for (left, top, right, bottom), name in zip(quadrant_boxes(pix.width, pix.height), QUADRANTS):
+        # Média sobre a vista do array, sem copiar o quadrante
+        if float(pixels[top:bottom, left:right].mean()) >= BLANK_BRIGHTNESS:
+            continue
+        quad_img = ImageEnhance.Contrast(Image.fromarray(pixels[top:bottom, left:right]))
+        blobs.append((name, write_blob(quad_img.enhance(CONTRAST), root, fmt)))
+        quadrants.append(f"page_{page_num:03d}_{name}.png")
+
+    return {"numero": page_num, "arquivo_completo": f"page_{page_num:03d}.png",
+            "quadrantes": quadrants, "_blobs": blobs}
+
+
+def _export_range(pdf_path, pages, root, fmt, dpi):
+    """Worker: exporta um bloco de páginas com o PDF aberto uma só vez"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(str(pdf_path)) as doc:
+        return [export_page(doc[page_num - 1], page_num, root, fmt, dpi) for page_num in pages]
+
+
+def export_pages(pdf_path, root, pages=None, workers=1, fmt=DEFAULT_FORMAT, dpi=EXPORT_DPI):
+    """Gera os registos das páginas exportadas, bloco a bloco, por ordem"""
+    import fitz  # PyMuPDF
+
+    if pages is None:
+        with fitz.open(str(pdf_path)) as doc:
+            pages = list(range(1, doc.page_count + 1))
+    chunks = _shard(pages, workers)
+    options = [(pdf_path, chunk, root, fmt, dpi) for chunk in chunks]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for records in pool.map(_export_range, *zip(*options)):
+                yield from records
+    else:
+        for args in options:
+            yield from _export_range(*args)
+
+
+def main():
+    import fitz  # PyMuPDF
+
+    from page_source import parse_page_range
+
+    parser = argparse.ArgumentParser(description="Exporta as páginas do MK IV para PNG")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pages", help="intervalo de páginas, ex: 1-50")
+    parser.add_argument("--dpi", type=int, default=EXPORT_DPI)
+    parser.add_argument("--formato", choices=sorted(FORMATS), default=DEFAULT_FORMAT,
+                        help="formato dos blobs (sem perdas)")
+    args = parser.parse_args()
+
+    print(f"\n🖼️  Extraindo imagens do MK IV...\n")
+
+    if not mk4_file.exists():
+        print(f"❌ Arquivo não encontrado: {mk4_file}")
+        return
+
+    store = ImageStore(output_dir, args.formato)
+    with fitz.open(str(mk4_file)) as doc:
+        page_count = doc.page_count
+    pages = parse_page_range(args.pages, page_count)
+    full_export = set(pages) == set(range(1, page_count + 1))
+    # Reexportação: só as entradas das páginas reexportadas são substituídas
+    store.forget(MANUAL, None if full_export else pages)
+    print(f"📄 Renderizando {len(pages)} página(s) do MK IV.pdf ({args.workers} processo(s))...")
+
+    start = time.perf_counter()
+    records = []
+    for record in export_pages(mk4_file, output_dir, pages, args.workers, args.formato, args.dpi):
+        for region, blob in record.pop("_blobs"):
+            store.add(MANUAL, record["numero"], region, blob)
+        records.append(record)
+        if len(records) % 50 == 0:
+            print(f"   ... {len(records)} páginas processadas")
+    elapsed = time.perf_counter() - start
+
+    quadrant_total = sum(len(record["quadrantes"]) for record in records)
+    print(f"✅ {len(records)} páginas e {quadrant_total} quadrantes em {elapsed:.1f}s")
+
+    # Os blobs das outras páginas continuam referenciados; só uma exportação completa limpa
+    removed = store.prune() if full_export else 0
+    store.save()
+    blobs = store.legacy_map(MANUAL)
+    unique = len(set(blobs.values()))
+
+    print(f"\n{'='*60}")
+    print(f"✅ Extração completa!")
+    print(f"📁 {len(blobs)} imagens em {unique} blob(s) únicos em: {output_dir}/blobs/"
+          + (f" ({removed} blob(s) antigos removidos)" if removed else "") + "\n")
+
+    # Criar índice JSON; numa exportação parcial as outras páginas do índice anterior mantêm-se
+    index_file = output_dir / "MK_IV_index.json"
+    pages_by_number = {}
+    if not full_export and index_file.exists():
+        with open(index_file, encoding='utf-8') as f:
+            previous = json.load(f)
+        pages_by_number = {record["numero"]: record for record in previous.get("paginas", [])
+                           if record["numero"] <= page_count}
+    pages_by_number.update((record["numero"], record) for record in records)
+    records = [pages_by_number[number] for number in sorted(pages_by_number)]
+
+    index = {
+        "manual": "MK IV",
+        "arquivo": str(mk4_file),
+        "total_paginas": len(records),
+        "total_imagens": len(records) + sum(len(record["quadrantes"]) for record in records),
+        "blobs_unicos": unique,
+        # Os caminhos em "blobs" são relativos a esta pasta
+        "diretorio": str(output_dir),
+        "dpi": args.dpi,
+        "paginas": records,
+        "blobs": blobs,
+    }
+
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+
+    print(f"📋 Índice salvo em: {index_file}\n")
+
+
+if __name__ == "__main__":
+    main()
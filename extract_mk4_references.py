@@ -3,6 +3,11 @@ import json
 from pathlib import Path
 import re
 
+from geometry_store import GeometryStore
+from page_source import PageSource
+from part_locator import PartLocator, image_url
+
+pdf_path = Path("MARCAS/SURVIVA MKIV/MK IV.pdf")
 extracted_dir = Path("extracted_manuals")
 spares_dir = Path("spare_parts_images")
 output_file = Path("MK_IV_spare_parts_complete.json")
@@ -25,21 +30,30 @@ spare_parts = {
 
 print("📄 Processando texto extraído...")
 
-if text_file.exists():
+# Texto por página (para saber em que página está cada componente); sem o
+# PDF, o texto extraído de uma só vez, sem páginas
+page_texts = []
+if pdf_path.exists():
+    with PageSource(pdf_path) as source:
+        page_texts = [(page["pagina"], page["texto"]) for page in source.pages()]
+elif text_file.exists():
     with open(text_file, 'r', encoding='utf-8') as f:
-        full_text = f.read()
-    
+        page_texts = [(None, f.read())]
+full_text = "\n".join(text for _, text in page_texts)
+
+if page_texts:
     # Procurar padrões de spares e referencias
     # Padrão: números + pontos + nomes
-    numbered_items = re.findall(r'^(\d+)\.\s+([A-Z].+?)(?=\n|$)', full_text, re.MULTILINE)
-    
-    for num, item_name in numbered_items:
-        if len(item_name.strip()) > 3 and len(item_name.strip()) < 200:
-            spare_parts["componentes_numerados"].append({
-                "numero": int(num),
-                "nome": item_name.strip(),
-                "tipo": "componente"
-            })
+    for page_num, page_text in page_texts:
+        numbered_items = re.findall(r'^(\d+)\.\s+([A-Z].+?)(?=\n|$)', page_text, re.MULTILINE)
+        for num, item_name in numbered_items:
+            if len(item_name.strip()) > 3 and len(item_name.strip()) < 200:
+                spare_parts["componentes_numerados"].append({
+                    "numero": int(num),
+                    "nome": item_name.strip(),
+                    "tipo": "componente",
+                    "pagina": page_num,
+                })
     
     # Procurar por "Spare Parts" ou "Spares" sections
     spare_sections = re.split(r'(?:SPARE\s+PARTS?|SPARES|REPLACEMENT\s+PARTS?)', full_text, flags=re.IGNORECASE)
@@ -80,16 +94,17 @@ if index_file.exists():
         index_data = json.load(f)
     
     spare_parts["imagens_total"] = index_data.get("total_imagens", 0)
-    
-    # Associar imagens aos componentes baseado em posição
-    # Assumindo que componentes aparecem em ordem nas páginas
-    for comp_idx, comp in enumerate(spare_parts["componentes_numerados"]):
-        # Mapear número do componente para página aproximada
-        # Assumindo ~5-10 componentes por página
-        page_num = min((comp_idx // 5) + 1, 680)
-        
-        comp["imagem"] = f"page_{page_num:03d}.png"
-        comp["pagina"] = page_num
+
+# Imagem de cada componente: a página onde aparece e, com a geometria das
+# páginas, o recorte da figura ligada à linha "N. Nome" (part_locator.py)
+if pdf_path.exists():
+    locator = PartLocator(GeometryStore.open(pdf_path))
+    for comp in spare_parts["componentes_numerados"]:
+        query = " ".join([f"{comp['numero']}."] + comp["nome"].split()[:3])
+        location = locator.locate(query, [comp["pagina"]], comp["numero"])
+        if location:
+            comp["recorte"] = location["recorte"]
+        comp["imagem"] = location["imagem"] if location else image_url(comp["pagina"])
 
 # Salvar resultado completo
 with open(output_file, 'w', encoding='utf-8') as f:
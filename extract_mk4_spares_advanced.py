@@ -1,186 +1,230 @@
 #!/usr/bin/env python3
 """
-Extrai spares MK IV com busca mais precisa em seções específicas
+Extrai spares MK IV numa só passagem pelas páginas
+
+Cada página é visitada uma vez: deteção de secção de spares, listas de
+peças reconstruídas pela posição das palavras (parts_list.py: item,
+descrição, referência, quantidade, com descrições partidas juntas),
+padrões de linha de spare para o texto que a geometria não cobre (lista
+numerada, colunas, tabulação, marcador '–'/'•' com referência na linha
+seguinte) e a pesquisa global de referências (P/N rotulados, códigos tipo
+BT17, códigos numéricos longos) numa única expressão. Spares e referências
+são deduplicados por índices (dicionários) e todas as referências são
+mantidas, com as páginas onde aparecem.
+
+Grava MK_IV_spares_detailed.json no formato lido por import_mk4_spares.py
+(spares, imagens_por_pagina, referencias_encontradas) e acrescenta
+"referencias" com a proveniência de cada uma.
+
+Uso: python extract_mk4_spares_advanced.py [--full]
 """
 
 import json
 import re
+import sys
 from pathlib import Path
 
-try:
-    import fitz  # PyMuPDF
-except ImportError:
-    import subprocess
-    import sys
-    print("📥 Instalando PyMuPDF...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "PyMuPDF"])
-    import fitz
+from manifest import Manifest
+from page_source import PageSource
+from part_numbers import MAX_REFERENCE_LENGTH, REFERENCE_PATTERN
+from parts_list import parse_words
 
 pdf_path = Path("MARCAS/SURVIVA MKIV/MK IV.pdf")
 output_file = Path("MK_IV_spares_detailed.json")
-
-print(f"\n🔧 Extração avançada de spares do MK IV...\n")
-
-if not pdf_path.exists():
-    print(f"❌ PDF não encontrado: {pdf_path}")
-    exit(1)
-
-doc = fitz.open(str(pdf_path))
-total_pages = doc.page_count
-
-print(f"📄 PDF aberto: {total_pages} páginas")
-
-spares_data = {
-    "manual": "MK IV",
-    "total_paginas": total_pages,
-    "spares": [],
-    "secoes_spares": [],
-    "imagens_por_pagina": {}
-}
-
-print(f"🔍 Procurando seções de spares...\n")
-
-# Primeiro passo: encontrar páginas com seções de "Spare Parts"
-spare_pages = []
-
-for page_num in range(total_pages):
-    page = doc[page_num]
-    text = page.get_text()
-    
-    # Detectar headers/títulos de seções
-    if re.search(r'(?:SPARE\s+PARTS?|SPARES|SERVICE\s+PARTS|REPLACEMENT|EQUIPMENT\s+LIST|PARTS?\s+LIST)', text, re.IGNORECASE):
-        spare_pages.append({
-            "pagina": page_num + 1,
-            "titulo_encontrado": True
-        })
-        print(f"  ✓ Página {page_num + 1}: Seção de spares detectada")
-
-print(f"\n📄 {len(spare_pages)} páginas com seções de spares encontradas\n")
-print(f"📊 Processando conteúdo...\n")
-
-# Segundo passo: extrair dados das páginas com spares
-for page_info in spare_pages:
-    page_num = page_info["pagina"] - 1
-    page = doc[page_num]
-    text = page.get_text()
-    
-    # Salvar página completa como imagem potencial
-    spares_data["imagens_por_pagina"][page_num + 1] = f"page_{page_num + 1:03d}.png"
-    
-    # Dividir em linhas
-    lines = text.split('\n')
-    
-    # Procurar padrões estruturados
-    for i, line in enumerate(lines):
-        line_clean = line.strip()
-        
-        # PADRÃO 1: Listas numeradas "1. Item name - Reference"
-        match1 = re.match(r'^(\d+)\s*[.)\-–]\s+([^0-9\-]{3,}?)(?:\s{2,}|\s*[-–]\s*)([A-Z0-9]+[\-.]?[A-Z0-9]*)$', line_clean)
-        
-        # PADRÃO 2: Listas com separação clara de colunas
-        match2 = re.match(r'^(\d+)\s+(.+?)\s{2,}([A-Z0-9]+.*)$', line_clean)
-        
-        # PADRÃO 3: Formato com tabulação
-        match3 = None
-        if '\t' in line_clean:
-            parts = line_clean.split('\t')
-            if len(parts) >= 2:
-                match3 = (parts[0].strip(), ' '.join(parts[1:-1]).strip(), parts[-1].strip())
-        
-        spare_entry = None
-        
-        if match1:
-            num, desc, ref = match1.groups()
-            spare_entry = {
-                "numero": int(num),
-                "descricao": desc.strip(),
-                "refFabricante": ref.strip(),
-                "pagina": page_num + 1,
-                "source": "pattern1"
-            }
-        elif match2:
-            num, desc, ref = match2.groups()
-            if len(ref) > 2 and (ref[0].isalpha() or ref[0].isdigit()):
-                spare_entry = {
-                    "numero": int(num),
-                    "descricao": desc.strip(),
-                    "refFabricante": ref.strip(),
-                    "pagina": page_num + 1,
-                    "source": "pattern2"
-                }
-        elif match3:
-            num, desc, ref = match3
-            if num.isdigit() and len(ref) > 2:
-                spare_entry = {
-                    "numero": int(num),
-                    "descricao": desc.strip(),
-                    "refFabricante": ref.strip(),
-                    "pagina": page_num + 1,
-                    "source": "pattern3"
-                }
-        
-        if spare_entry:
-            # Verificar se não é duplicado
-            is_dup = any(
-                s["descricao"] == spare_entry["descricao"] and 
-                s["refFabricante"] == spare_entry["refFabricante"]
-                for s in spares_data["spares"]
-            )
-            if not is_dup:
-                spares_data["spares"].append(spare_entry)
-                print(f"  ✓ #{spare_entry['numero']}: {spare_entry['descricao'][:50]}... → {spare_entry['refFabricante']}")
-
-# Terceiro passo: busca global de referências (mesmo fora das seções marcadas)
-print(f"\n🔍 Fazendo busca global por referências...\n")
-
-# Padrões de referência mais específicos
-ref_only_patterns = [
-    r'\b([A-Z]{2}\d{2,})\b',  # BT17, LR07, etc
-    r'\b(\d{8,})\b',  # Códigos numéricos longos
-    r'(?:P/N|Part ?N[o]?)[:\s]*([A-Z0-9\-\.]+)',  # Part numbers formatados
+# Versão da saída no manifesto (2: uma passagem, listas de peças pela geometria e "qtd";
+# 3: listas de peças só nas secções de spares)
+EXTRACTOR_VERSION = 3
+
+# Títulos de secções de spares
+SECTION_PATTERN = re.compile(
+    r'(?:SPARE\s+PARTS?|SPARES|SERVICE\s+PARTS|REPLACEMENT|EQUIPMENT\s+LIST|PARTS?\s+LIST)',
+    re.IGNORECASE,
+)
+# Páginas onde se procuram linhas com marcador ("3 – Valve")
+BULLET_KEYWORDS = ('SPARE', 'PART', 'COMPONENT', 'EQUIPMENT', 'KIT')
+
+# Linhas de spare (por ordem de preferência)
+LINE_PATTERNS = [
+    # "1. Item name - Reference"
+    ("pattern1", re.compile(
+        r'^(\d+)\s*[.)\-–]\s+([^0-9\-]{3,}?)(?:\s{2,}|\s*[-–]\s*)([A-Z0-9]+[\-.]?[A-Z0-9]*)$')),
+    # Colunas separadas por 2+ espaços
+    ("pattern2", re.compile(r'^(\d+)\s+(.+?)\s{2,}([A-Z0-9]+.*)$')),
 ]
-
-all_refs = set()
-for page_num in range(total_pages):
-    page = doc[page_num]
-    text = page.get_text()
-    
-    for pattern in ref_only_patterns:
-        matches = re.findall(pattern, text)
-        for match in matches:
-            if len(match) <= 20:  # Evitar extrações muito longas
-                all_refs.add(match)
-
-print(f"  Encontradas {len(all_refs)} referências únicas")
-
-spares_data["referencias_encontradas"] = sorted(list(all_refs))[:50]  # Top 50
-
-# Salvar
-with open(output_file, 'w', encoding='utf-8') as f:
-    json.dump(spares_data, f, indent=2, ensure_ascii=False)
-
-# Resumo
-print(f"\n{'='*60}")
-print(f"✅ Extração avançada completa!")
-print(f"\n📊 RESUMO DO MK IV:\n")
-print(f"  Total páginas: {spares_data['total_paginas']}")
-print(f"  Páginas com spares: {len(spare_pages)}")
-print(f"  Total spares extraído: {len(spares_data['spares'])}")
-print(f"  Referências encontradas: {len(spares_data['referencias_encontradas'])}")
-print(f"  Arquivo: {output_file}\n")
-
-if spares_data['spares']:
-    print(f"📋 SPARES EXTRAÍDOS:\n")
-    for spare in spares_data['spares'][:15]:
-        print(f"  #{spare['numero']}: {spare['descricao']}")
-        print(f"     ├─ Ref: {spare['refFabricante']}")
-        print(f"     ├─ Pág: {spare['pagina']}")
-        print(f"     └─ Src: {spare['source']}\n")
-
-if spares_data['referencias_encontradas']:
-    print(f"🔖 REFERÊNCIAS ENCONTRADAS:\n")
-    for ref in spares_data['referencias_encontradas'][:20]:
-        print(f"   • {ref}")
-
-print()
-doc.close()
+BULLET_LINE = re.compile(r'^(\d+)\s+[–\-•]\s+(.+?)(?:\s{2,}|$)')
+
+
+class SparesIndex:
+    """Spares e referências únicos, com as páginas onde aparecem"""
+
+    def __init__(self):
+        self.spares = {}
+        self.references = {}
+        self.sections = []
+        self.section_pages = []
+
+    def add_spare(self, number, description, reference, page_num, source, quantity=None):
+        key = (description, reference)
+        entry = self.spares.get(key)
+        if entry is None:
+            self.spares[key] = entry = {
+                "numero": number,
+                "descricao": description,
+                "refFabricante": reference,
+                "pagina": page_num,
+                "paginas": [],
+                "source": source,
+            }
+        if quantity and "qtd" not in entry:
+            # Quantidade por conjunto (coluna QTY), não stock
+            entry["qtd"] = quantity
+        if page_num not in entry["paginas"]:
+            entry["paginas"].append(page_num)
+        if any(c.isdigit() for c in reference):
+            self.add_reference(reference, "spare", page_num)
+        return entry
+
+    def add_reference(self, reference, kind, page_num):
+        entry = self.references.get(reference)
+        if entry is None:
+            self.references[reference] = entry = {"referencia": reference, "tipo": kind, "paginas": []}
+        if not entry["paginas"] or entry["paginas"][-1] != page_num:
+            entry["paginas"].append(page_num)
+
+
+def first_reference(text):
+    """Primeira referência de um texto (ou None)"""
+    for match in REFERENCE_PATTERN.finditer(text):
+        value = (match.group(match.lastgroup) or "").rstrip(".-/")
+        if value and len(value) <= MAX_REFERENCE_LENGTH:
+            return value
+    return None
+
+
+def parse_spare_line(lines, i):
+    """(numero, descricao, referencia, source) da linha i, ou None"""
+    line = lines[i].strip()
+    for source, pattern in LINE_PATTERNS:
+        match = pattern.match(line)
+        if match:
+            num, desc, ref = match.groups()
+            if source == "pattern2" and len(ref) <= 2:
+                continue
+            return int(num), desc.strip(), ref.strip(), source
+    if '\t' in line:
+        # Colunas separadas por tabulação
+        parts = [part.strip() for part in line.split('\t')]
+        num, desc, ref = parts[0], ' '.join(parts[1:-1]), parts[-1]
+        if num.isdigit() and len(ref) > 2:
+            return int(num), desc, ref, "pattern3"
+    return None
+
+
+def scan_page(index, page_num, text, words=()):
+    """Visita única de uma página: secção, lista de peças, linhas de spare e referências"""
+    section = SECTION_PATTERN.search(text)
+    if section:
+        index.section_pages.append(page_num)
+        index.sections.append({"pagina": page_num, "titulo": section.group(0)})
+    bullets = any(keyword in text.upper() for keyword in BULLET_KEYWORDS)
+
+    # Lista de peças pela geometria das palavras (colunas sem espaços no texto), só nas
+    # secções de spares: noutras páginas as tabelas de revisões e o texto corrido dão falsos spares
+    for row in parse_words(words, page_num) if section else ():
+        item = row["item"] or ""
+        number = int(item) if item.isdigit() else item or None
+        index.add_spare(number, row["descricao"], row["referencia"], page_num, "layout", row["qtd"])
+
+    if section or bullets:
+        lines = text.split('\n')
+        for i, line in enumerate(lines):
+            parsed = parse_spare_line(lines, i) if section else None
+            if parsed:
+                index.add_spare(*parsed[:3], page_num, parsed[3])
+                continue
+            match = BULLET_LINE.match(line.strip()) if bullets else None
+            if match:
+                # Marcador: referência na própria linha ou na seguinte
+                num, desc = match.groups()
+                following = lines[i + 1] if i + 1 < len(lines) else ""
+                reference = first_reference(line) or first_reference(following)
+                if reference:
+                    index.add_spare(int(num), desc.strip(), reference, page_num, "pattern4")
+
+    for match in REFERENCE_PATTERN.finditer(text):
+        value = match.group(match.lastgroup).rstrip(".-/")
+        if value and len(value) <= MAX_REFERENCE_LENGTH:
+            index.add_reference(value, match.lastgroup, page_num)
+
+
+def main():
+    print(f"\n🔧 Extração de spares do MK IV (uma passagem)...\n")
+
+    if not pdf_path.exists():
+        print(f"❌ PDF não encontrado: {pdf_path}")
+        exit(1)
+
+    # Reindexação incremental: nada a fazer se o PDF não mudou desde a última extração
+    manifest = Manifest("extract_mk4_spares", EXTRACTOR_VERSION)
+    if (manifest.changes([pdf_path])["inalterados"] and output_file.exists()
+            and "--full" not in sys.argv):
+        print(f"✅ {pdf_path.name} inalterado desde a última extração — {output_file} está atualizado")
+        print(f"   (use --full para forçar)\n")
+        exit(0)
+
+    # Texto e palavras de todas as páginas (PyMuPDF via page_source.py, com cache)
+    index = SparesIndex()
+    with PageSource(pdf_path) as source:
+        for page in source.pages(words=True):
+            scan_page(index, page["pagina"], page["texto"], page["palavras"])
+        total_pages = len(source)
+
+    print(f"📄 {total_pages} páginas, {len(index.section_pages)} com seções de spares")
+
+    spares = list(index.spares.values())
+    references = sorted(index.references.values(), key=lambda r: r["referencia"])
+    spares_data = {
+        "manual": "MK IV",
+        "total_paginas": total_pages,
+        "spares": spares,
+        "secoes_spares": index.sections,
+        "imagens_por_pagina": {page: f"page_{page:03d}.png" for page in index.section_pages},
+        "referencias_encontradas": [r["referencia"] for r in references],
+        "referencias": references,
+    }
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(spares_data, f, indent=2, ensure_ascii=False)
+
+    manifest.mark(pdf_path)
+    manifest.save()
+
+    # Resumo
+    print(f"\n{'='*60}")
+    print(f"✅ Extração completa!")
+    print(f"\n📊 RESUMO DO MK IV:\n")
+    print(f"  Total páginas: {total_pages}")
+    print(f"  Páginas com spares: {len(index.section_pages)}")
+    print(f"  Total spares extraído: {len(spares)}")
+    print(f"  Referências encontradas: {len(references)}")
+    print(f"  Arquivo: {output_file}\n")
+
+    if spares:
+        print(f"📋 SPARES EXTRAÍDOS (primeiros 15):\n")
+        for spare in spares[:15]:
+            print(f"  #{spare['numero']}: {spare['descricao']}")
+            print(f"     ├─ Ref: {spare['refFabricante']}")
+            print(f"     ├─ Pág: {', '.join(map(str, spare['paginas']))}")
+            print(f"     └─ Src: {spare['source']}\n")
+
+    if references:
+        print(f"🔖 REFERÊNCIAS ENCONTRADAS (primeiras 20):\n")
+        for ref in references[:20]:
+            pages = ', '.join(map(str, ref['paginas'][:8])) + (" ..." if len(ref['paginas']) > 8 else "")
+            print(f"   • {ref['referencia']:<20} pág. {pages}")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
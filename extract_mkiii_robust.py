@@ -1,28 +1,23 @@
-import pdfplumber
 import sys
 import traceback
 
-def extract_page_safe(page, page_num):
-    """Extrai texto de uma página com tratamento de erros"""
+from page_source import PageSource
+
+def extract_page_safe(source, page_num):
+    """Extrai texto de uma página (PyMuPDF) com tratamento de erros"""
     try:
-        # Tentar extrair de forma simples primeiro
-        text = page.extract_text(layout=False, x_tolerance=2, y_tolerance=2)
+        text = source.text(page_num)
         return text if text else ""
     except Exception as e:
         print(f"  [Aviso] Erro ao extrair página {page_num}: {str(e)[:100]}")
-        try:
-            # Tentar método alternativo
-            text = page.extract_text(layout=True)
-            return text if text else ""
-        except:
-            return f"[Página {page_num} - Erro na extração]"
+        return f"[Página {page_num} - Erro na extração]"
 
 try:
     print("Abrindo PDF do SURVIVA MKIII...")
     pdf_path = r'MARCAS\SURVIVA MKIII\MkIII.pdf'
     
-    pdf = pdfplumber.open(pdf_path)
-    total_pages = len(pdf.pages)
+    source = PageSource(pdf_path)
+    total_pages = len(source)
     print(f'Total de páginas no PDF: {total_pages}')
     print('='*80)
     
@@ -37,8 +32,7 @@ try:
         print(f'Processando página {page_num}/{max_pages}...', end='')
         
         try:
-            page = pdf.pages[i]
-            text = extract_page_safe(page, page_num)
+            text = extract_page_safe(source, page_num)
             
             if text and text.strip() and not text.startswith("[Página"):
                 all_text += f"\n\n{'='*80}\n=== PÁGINA {page_num} ===\n{'='*80}\n{text}"
@@ -58,7 +52,7 @@ try:
             print(f" ✗ Erro: {str(e)[:50]}")
             all_text += f"\n\n[Página {page_num} - Erro: {str(e)[:100]}]"
     
-    pdf.close()
+    source.close()
     
     # Salvar em arquivo
     output_file = 'mkiii-extracted.txt'
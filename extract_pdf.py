@@ -1,14 +1,16 @@
-import pdfplumber
+from page_source import PageSource
 
-pdf = pdfplumber.open('MARCAS/SURVIVA MKIV/MK IV.pdf')
-print(f'Total de páginas: {len(pdf.pages)}')
+with PageSource('MARCAS/SURVIVA MKIV/MK IV.pdf') as source:
+    paginas = source.pages()
+print(f'Total de páginas: {len(paginas)}')
 print('='*80)
 
-# Extrair texto de todas as páginas
+# Extrair texto de todas as páginas (PyMuPDF via cache partilhado)
 all_text = ""
-for i, page in enumerate(pdf.pages):
+for pagina in paginas:
+    i = pagina['pagina'] - 1
     print(f'\n=== PÁGINA {i+1} ===')
-    text = page.extract_text()
+    text = pagina['texto']
     if text:
         all_text += f"\n\n=== PÁGINA {i+1} ===\n{text}"
         print(text)
@@ -18,4 +20,3 @@ with open('mkiv-extracted.txt', 'w', encoding='utf-8') as f:
     f.write(all_text)
 
 print("\n\n✅ Texto extraído salvo em mkiv-extracted.txt")
-pdf.close()
@@ -1,4 +1,5 @@
-import pdfplumber
+from manual_index import find_pages, literal
+from page_source import PageSource
 import json
 import re
 
@@ -8,15 +9,17 @@ print("="*80)
 print("BUSCA ESPECÍFICA: TABELA 3.3 - ESPECIFICAÇÕES DE CILINDROS")
 print("="*80)
 
-pdf = pdfplumber.open(pdf_path)
-total_pages = len(pdf.pages)
+pdf = PageSource(pdf_path)  # texto PyMuPDF, tabelas pdfplumber (via cache)
+total_pages = len(pdf)
 
-# Procurar por "TABLE 3.3" ou "table 3.3"
+# Procurar por "TABLE 3.3" ou "table 3.3" (índice de substrings, sem reler o PDF)
 print("\nProcurando Tabela 3.3...")
 
-for i in range(total_pages):
-    page = pdf.pages[i]
-    text = page.extract_text()
+paginas_tabela = sorted(r['pagina'] - 1
+                        for r in find_pages(pdf_path, literal('TABLE 3'), substring=True))
+
+for i in paginas_tabela:
+    text = pdf.text(i+1)
     
     if text and ('TABLE 3.3' in text.upper() or 'TABLE 3' in text.upper()):
         print(f"\n{'='*80}")
@@ -24,7 +27,7 @@ for i in range(total_pages):
         print(f"{'='*80}")
         print(text)
         
-        tables = page.extract_tables()
+        tables = pdf.tables(i+1)
         if tables:
             print(f"\n[{len(tables)} TABELA(S) ENCONTRADA(S)]:")
             for idx, table in enumerate(tables):
@@ -38,9 +41,11 @@ print("\n\n" + "="*80)
 print("BUSCANDO PÁGINAS COM DADOS DE CILINDROS E CAPACIDADES")
 print("="*80)
 
-for i in range(total_pages):
-    page = pdf.pages[i]
-    text = page.extract_text()
+# Índice como pré-filtro (páginas com a substring CYLINDER); as condições exatas são verificadas abaixo
+candidatas = find_pages(pdf_path, literal('CYLINDER'), substring=True)
+
+for i in sorted(r['pagina'] - 1 for r in candidatas):
+    text = pdf.text(i+1)
     
     if text:
         text_upper = text.upper()
@@ -54,7 +59,7 @@ for i in range(total_pages):
                 print(f"{'='*80}")
                 print(text[:2000])  # Primeiros 2000 caracteres
                 
-                tables = page.extract_tables()
+                tables = pdf.tables(i+1)
                 if tables:
                     print(f"\n[{len(tables)} TABELA(S)]:")
                     for idx, table in enumerate(tables):
@@ -1,32 +1,31 @@
-import pdfplumber
-import re
+from keyword_matcher import KeywordMatcher
+from manual_index import find_pages, literal
 
 # Procurar páginas que mencionam "pack", "equipment", "SOLAS A", "SOLAS B"
-keywords = ['pack', 'equipment', 'SOLAS A', 'SOLAS B', 'emergency', 'ration', 
+keywords = ['pack', 'equipment', 'SOLAS A', 'SOLAS B', 'emergency', 'ration',
             'water', 'first aid', 'flare', 'rocket', 'torch', 'battery', 'anchor']
+matcher = KeywordMatcher(keywords)
 
-pdf = pdfplumber.open('MARCAS/LR05.pdf')
-print(f'Total de páginas: {len(pdf.pages)}\n')
+pdf_path = 'MARCAS/LR05.pdf'
 
 matches = []
 
-# Procurar em todas as páginas (pode demorar)
+# Páginas candidatas via índice de substrings (manual_index.py) em vez de reler o PDF inteiro:
+# todas as páginas onde o KeywordMatcher encontraria pelo menos uma keyword
 print('Procurando páginas com informação sobre equipamento...\n')
 
-for i in range(len(pdf.pages)):
-    try:
-        page = pdf.pages[i]
-        text = page.extract_text()
-        if text:
-            text_lower = text.lower()
-            # Verificar se página contém keywords relevantes
-            keyword_count = sum(1 for kw in keywords if kw.lower() in text_lower)
-            if keyword_count >= 3:  # Pelo menos 3 keywords
-                matches.append((i+1, keyword_count, text[:200]))  # Guardar número da página
-                print(f'Pagina {i+1}: {keyword_count} keywords encontrados')
-    except Exception as e:
-        print(f'Erro na pagina {i+1}: {str(e)[:50]}')
-        continue
+query = ' OR '.join(literal(kw) for kw in keywords)
+candidatas = find_pages(pdf_path, query, with_text=True, substring=True)
+print(f'Páginas candidatas no índice: {len(candidatas)}\n')
+
+for pagina in sorted(candidatas, key=lambda r: r['pagina']):
+    text = pagina['texto']
+    if text:
+        # Verificar se página contém keywords relevantes (uma só passagem)
+        keyword_count = len(matcher.hits(text))
+        if keyword_count >= 3:  # Pelo menos 3 keywords
+            matches.append((pagina['pagina'], keyword_count, text[:200]))  # Guardar número da página
+            print(f"Pagina {pagina['pagina']}: {keyword_count} keywords encontrados")
 
 print(f'\n=> Encontradas {len(matches)} paginas relevantes')
 print('\nPaginas com mais keywords:')
@@ -34,8 +33,6 @@ matches.sort(key=lambda x: x[1], reverse=True)
 for page_num, count, preview in matches[:20]:
     print(f'  Pagina {page_num}: {count} keywords')
 
-pdf.close()
-
 # Salvar lista de páginas relevantes
 with open('lr05-relevant-pages.txt', 'w', encoding='utf-8') as f:
     f.write('PAGINAS RELEVANTES PARA EQUIPAMENTO/PACKS\n')
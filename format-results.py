@@ -7,18 +7,33 @@ Formata dados extraídos em estrutura JSON conforme solicitado
 import json
 from pathlib import Path
 
+import units
+
 # Caminho dos dados
 DETAILED_JSON = Path(r"c:\Users\julio\Desktop\APLICACAO MASTER\LIFERAFT1.0\gestor-naval-pro\technical-specs-detailed.json")
 
 def format_pressure_data(model_data):
     """Formata dados de pressão para o formato solicitado"""
-    pressure = model_data['pressaoTrabalho_convertida']
+    pressure = dict(model_data.get('pressaoTrabalho_convertida') or {})
+    original = model_data.get('pressaoTrabalho') or {}
+    
+    # Sem conversão gravada (ou incompleta): converter o valor original (units.py)
+    if original and not all(pressure.get(u) for u in ('psi', 'mmWG', 'inH2O', 'milibares')):
+        unit, value = next(iter(original.items()))
+        converted = units.to_all(value, unit, units.PRESSURE_REPORT_UNITS, decimals=2)
+        converted['milibares'] = converted.pop('mbar')
+        for key, val in converted.items():
+            pressure.setdefault(key, val)
+    
+    # 'bar' nunca é milibares: converter em vez de copiar o número
+    if not pressure.get('milibares') and pressure.get('bar'):
+        pressure['milibares'] = round(units.convert(pressure['bar'], 'bar', 'mbar'), 2)
     
     return {
         "psi": pressure.get('psi'),
         "mmWG": pressure.get('mmWG'),
         "inH2O": pressure.get('inH2O'),
-        "milibares": pressure.get('milibares') or pressure.get('bar')
+        "milibares": pressure.get('milibares')
     }
 
 def extract_davit_data(model_data):
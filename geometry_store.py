@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Armazém persistente da geometria das páginas (palavras, traços, imagens)
+
+Para cada manual guarda, numa só passagem pelo PDF, as caixas das palavras
+(get_text("words")), os segmentos desenhados (linhas e arestas de
+retângulos, com a orientação), as caixas das imagens e as células de
+tabela delimitadas por réguas, como arrays NumPy estruturados num .npz
+sem compressão em .cache/geometria/<sha256 do PDF>.npz. Os arrays são
+abertos por memória mapeada (np.memmap sobre o membro do .npz): abrir o
+armazém não lê nem copia os dados e não reabre o PDF.
+
+As palavras de cada página estão ordenadas por uma grelha de
+`GRID` x `GRID` casas (pelo centro da palavra), com os deslocamentos de
+cada casa (formato CSR), pelo que "palavras dentro de um retângulo" só
+examina as casas que o intersetam. As células com réguas são calculadas
+na construção: a consulta é uma fatia.
+
+Consultas (GeometryStore):
+  words_in_bbox(página, bbox)       palavras que intersetam (ou centradas em) bbox
+  nearest_text(página, bbox, k)     palavras mais próximas de um retângulo (ex: imagem)
+  ruled_cells(página)               células de tabela desenhadas
+  images(página), segments(página)  caixas das imagens e segmentos
+
+Uso:
+  python geometry_store.py construir ["MARCAS/LR05.pdf" ...] [--workers 4]
+  python geometry_store.py consultar "MARCAS/LR05.pdf" 12 [--bbox 50,100,300,400]
+"""
+
+import argparse
+import os
+import struct
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from manifest import scan_inputs
+from pdf_cache import _shard, file_sha256
+
+GEOMETRY_DIR = Path(os.environ.get("GEOMETRY_DIR", ".cache/geometria"))
+FORMAT_VERSION = 1
+
+# Casas da grelha por eixo, em cada página
+GRID = 16
+# Desvio (pt) para um segmento contar como horizontal/vertical e para juntar réguas
+RULING_TOLERANCE = 1.0
+# Lado mínimo (pt) de uma célula desenhada
+MIN_CELL_SIZE = 4.0
+
+OBLIQUE, HORIZONTAL, VERTICAL = 0, 1, 2
+
+BOX_FIELDS = [("pagina", "<i4"), ("x0", "<f4"), ("y0", "<f4"), ("x1", "<f4"), ("y1", "<f4")]
+WORD_DTYPE = np.dtype(BOX_FIELDS + [("bloco", "<i4"), ("linha", "<i4")])
+SEGMENT_DTYPE = np.dtype(BOX_FIELDS + [("orientacao", "u1")])
+IMAGE_DTYPE = np.dtype(BOX_FIELDS + [("xref", "<i4")])
+CELL_DTYPE = np.dtype(BOX_FIELDS)
+PAGE_DTYPE = np.dtype([("largura", "<f4"), ("altura", "<f4"),
+                       ("max_largura", "<f4"), ("max_altura", "<f4")])
+
+
+def store_path(pdf_path, root=GEOMETRY_DIR):
+    return Path(root) / f"{file_sha256(pdf_path)}.npz"
+
+
+def _merge_intervals(intervals, tolerance):
+    """Intervalos (a, b) sobrepostos ou a menos de `tolerance` -> união ordenada"""
+    merged = []
+    for a, b in sorted(intervals):
+        if merged and a <= merged[-1][1] + tolerance:
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    return merged
+
+
+def _cluster_lines(positions, tolerance):
+    """Posições (y das horizontais ou x das verticais) -> (valores das réguas, régua de cada posição)"""
+    order = np.argsort(positions)
+    groups = np.concatenate([[0], np.cumsum(np.diff(positions[order]) > tolerance)])
+    labels = np.empty(len(positions), dtype=int)
+    labels[order] = groups
+    values = np.bincount(labels, weights=positions) / np.bincount(labels)
+    return values, labels
+
+
+def _coverage(lines, labels, starts, ends, cuts, tolerance):
+    """covered[l, i]: a régua l está desenhada de cuts[i] a cuts[i + 1]"""
+    covered = np.zeros((len(lines), max(len(cuts) - 1, 0)), dtype=bool)
+    for line in range(len(lines)):
+        mask = labels == line
+        for a, b in _merge_intervals(zip(starts[mask], ends[mask]), tolerance):
+            covered[line] |= (cuts[:-1] >= a - tolerance) & (cuts[1:] <= b + tolerance)
+    return covered
+
+
+def ruled_cells_from_segments(segments, tolerance=RULING_TOLERANCE, min_size=MIN_CELL_SIZE):
+    """
+    Segmentos (x0, y0, x1, y1, orientação) de uma página -> células (x0, y0, x1, y1).
+
+    Uma célula é um retângulo entre réguas com os quatro lados desenhados;
+    células fundidas (sem a régua interior) dão um só retângulo.
+    """
+    segments = np.asarray(segments, dtype=float).reshape(-1, 5)
+    h = segments[(segments[:, 4] == HORIZONTAL)
+                 & (segments[:, 2] - segments[:, 0] >= min_size)]
+    v = segments[(segments[:, 4] == VERTICAL)
+                 & (segments[:, 3] - segments[:, 1] >= min_size)]
+    if len(h) < 2 or len(v) < 2:
+        return []
+    ys, h_labels = _cluster_lines((h[:, 1] + h[:, 3]) / 2, tolerance)
+    xs, v_labels = _cluster_lines((v[:, 0] + v[:, 2]) / 2, tolerance)
+    top = _coverage(ys, h_labels, h[:, 0], h[:, 2], xs, tolerance)    # (réguas y, intervalos x)
+    side = _coverage(xs, v_labels, v[:, 1], v[:, 3], ys, tolerance)   # (réguas x, intervalos y)
+
+    cells = []
+    for j in range(len(ys) - 1):
+        for i in range(len(xs) - 1):
+            if not (top[j, i] and side[i, j]):
+                continue
+            # Direita: até à primeira régua vertical desenhada nesta faixa
+            i2 = i + 1
+            while i2 < len(xs) - 1 and not side[i2, j] and top[j, i2]:
+                i2 += 1
+            if not side[i2, j] or not top[j, i:i2].all():
+                continue
+            # Baixo: até à primeira régua horizontal desenhada de xs[i] a xs[i2]
+            j2 = j + 1
+            while j2 < len(ys) - 1 and not top[j2, i:i2].all() and side[i, j2] and side[i2, j2]:
+                j2 += 1
+            if not top[j2, i:i2].all() or not side[i, j:j2].all() or not side[i2, j:j2].all():
+                continue
+            if xs[i2] - xs[i] >= min_size and ys[j2] - ys[j] >= min_size:
+                cells.append((xs[i], ys[j], xs[i2], ys[j2]))
+    return cells
+
+
+def page_segments(page, tolerance=RULING_TOLERANCE):
+    """Segmentos de reta desenhados (x0, y0, x1, y1, orientação); retângulos dão 4 arestas"""
+    segments = []
+
+    def add(x0, y0, x1, y1):
+        if abs(y1 - y0) <= tolerance:
+            orientation = HORIZONTAL
+        elif abs(x1 - x0) <= tolerance:
+            orientation = VERTICAL
+        else:
+            orientation = OBLIQUE
+        segments.append((min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1), orientation))
+
+    for path in page.get_drawings():
+        for item in path["items"]:
+            if item[0] == "l":
+                add(item[1].x, item[1].y, item[2].x, item[2].y)
+            elif item[0] in ("re", "qu"):
+                rect = item[1].rect if item[0] == "qu" else item[1]
+                if rect.height <= 2 * tolerance:
+                    # Retângulo fino: régua horizontal
+                    y = (rect.y0 + rect.y1) / 2
+                    add(rect.x0, y, rect.x1, y)
+                elif rect.width <= 2 * tolerance:
+                    x = (rect.x0 + rect.x1) / 2
+                    add(x, rect.y0, x, rect.y1)
+                else:
+                    add(rect.x0, rect.y0, rect.x1, rect.y0)
+                    add(rect.x0, rect.y1, rect.x1, rect.y1)
+                    add(rect.x0, rect.y0, rect.x0, rect.y1)
+                    add(rect.x1, rect.y0, rect.x1, rect.y1)
+    return segments
+
+
+def _extract_range(pdf_path, pages):
+    """Geometria de um bloco de páginas (corre num processo do pool)"""
+    import fitz  # PyMuPDF
+
+    result = {}
+    with fitz.open(pdf_path) as doc:
+        for page_num in pages:
+            page = doc[page_num - 1]
+            segments = page_segments(page)
+            result[page_num] = {
+                "tamanho": (page.rect.width, page.rect.height),
+                "palavras": [tuple(w[:4]) + (w[5], w[6], w[4]) for w in page.get_text("words")],
+                "segmentos": segments,
+                "imagens": [tuple(info["bbox"]) + (info.get("xref", 0),)
+                            for info in page.get_image_info(xrefs=True)],
+                "celulas": ruled_cells_from_segments(segments),
+            }
+    return result
+
+
+def _records(rows, dtype, page_num):
+    array = np.zeros(len(rows), dtype=dtype)
+    array["pagina"] = page_num
+    for column, name in enumerate(dtype.names[1:]):
+        array[name] = [row[column] for row in rows]
+    return array
+
+
+def build_store(pdf_path, root=GEOMETRY_DIR, workers=1):
+    """Extrai a geometria de todas as páginas e grava o .npz; devolve o caminho"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(str(pdf_path)) as doc:
+        page_count = doc.page_count
+    pages = list(range(1, page_count + 1))
+    extracted = {}
+    if workers > 1 and page_count > 1:
+        chunks = _shard(pages, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_extract_range, [str(pdf_path)] * len(chunks), chunks):
+                extracted.update(part)
+    else:
+        extracted = _extract_range(str(pdf_path), pages)
+
+    info = np.zeros(page_count, dtype=PAGE_DTYPE)
+    words, texts, segments, images, cells = [], [], [], [], []
+    grid_offsets = np.zeros((page_count, GRID * GRID + 1), dtype=np.int32)
+    counts = {name: np.zeros(page_count + 1, dtype=np.int32)
+              for name in ("palavras", "segmentos", "imagens", "celulas")}
+    total_words = 0
+    for page_num in pages:
+        page = extracted[page_num]
+        width, height = page["tamanho"]
+        page_words = _records([w[:6] for w in page["palavras"]], WORD_DTYPE, page_num)
+        # Ordem da grelha: casa (linha, coluna) do centro de cada palavra
+        cell = _grid_cell(page_words, width, height)
+        order = np.argsort(cell, kind="stable")
+        page_words = page_words[order]
+        grid_offsets[page_num - 1] = total_words + np.searchsorted(
+            cell[order], np.arange(GRID * GRID + 1))
+        total_words += len(page_words)
+        words.append(page_words)
+        texts.extend(page["palavras"][i][6] for i in order)
+        segments.append(_records(page["segmentos"], SEGMENT_DTYPE, page_num))
+        images.append(_records(page["imagens"], IMAGE_DTYPE, page_num))
+        cells.append(_records(page["celulas"], CELL_DTYPE, page_num))
+        info[page_num - 1] = (width, height,
+                              (page_words["x1"] - page_words["x0"]).max(initial=0),
+                              (page_words["y1"] - page_words["y0"]).max(initial=0))
+        for name in counts:
+            counts[name][page_num] = len(page[name])
+
+    encoded = [text.encode("utf-8") for text in texts]
+    arrays = {
+        "versao": np.array([FORMAT_VERSION], dtype=np.int32),
+        "paginas": info,
+        "palavras": np.concatenate(words) if words else np.zeros(0, WORD_DTYPE),
+        "texto": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "texto_fim": np.cumsum([len(e) for e in encoded], dtype=np.int64),
+        "segmentos": np.concatenate(segments) if segments else np.zeros(0, SEGMENT_DTYPE),
+        "imagens": np.concatenate(images) if images else np.zeros(0, IMAGE_DTYPE),
+        "celulas": np.concatenate(cells) if cells else np.zeros(0, CELL_DTYPE),
+        "grelha": grid_offsets,
+    }
+    # Deslocamentos (CSR) por página de cada tipo de registo
+    arrays.update({f"{name}_pagina": np.cumsum(count) for name, count in counts.items()})
+
+    path = store_path(pdf_path, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+    np.savez(tmp, **arrays)  # sem compressão: os membros podem ser mapeados
+    tmp.replace(path)
+    return path
+
+
+def _grid_cell(words, width, height):
+    """Casa da grelha (linha * GRID + coluna) do centro de cada palavra"""
+    cx = (words["x0"] + words["x1"]) / 2
+    cy = (words["y0"] + words["y1"]) / 2
+    col = np.clip((cx / max(width, 1) * GRID).astype(int), 0, GRID - 1)
+    row = np.clip((cy / max(height, 1) * GRID).astype(int), 0, GRID - 1)
+    return row * GRID + col
+
+
+def load_npz_mmap(path):
+    """Membros de um .npz sem compressão como np.memmap (só leitura)"""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for member in archive.infolist():
+            if member.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: membro comprimido {member.filename}")
+            # Cabeçalho local do ZIP (30 bytes + nome + extra), depois o .npy
+            f.seek(member.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(member.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran, dtype = read_header(f)
+            name = member.filename[:-len(".npy")]
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                # Vista ndarray simples (mesma memória mapeada, sem o custo da subclasse)
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(),
+                                         shape=shape, order="F" if fortran else "C").view(np.ndarray)
+    return arrays
+
+
+class GeometryStore:
+    """Geometria de um manual (memória mapeada) com consultas espaciais por página"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        arrays = load_npz_mmap(self.path)
+        if int(arrays["versao"][0]) != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: versão {int(arrays['versao'][0])} do armazém")
+        self.arrays = arrays
+        self.pages = arrays["paginas"]
+        self.words = arrays["palavras"]
+        self.grid = arrays["grelha"]
+        self._text = arrays["texto"]
+        self._text_end = arrays["texto_fim"]
+
+    @classmethod
+    def open(cls, pdf_path, root=GEOMETRY_DIR, build=True, workers=1):
+        """Armazém do PDF (pelo SHA-256 do conteúdo); constrói-o se faltar e build=True"""
+        path = store_path(pdf_path, root)
+        if not path.exists():
+            if not build:
+                raise FileNotFoundError(path)
+            build_store(pdf_path, root, workers)
+        return cls(path)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def _range(self, name, page_num):
+        offsets = self.arrays[f"{name}_pagina"]
+        return int(offsets[page_num - 1]), int(offsets[page_num])
+
+    def _page_array(self, name, page_num):
+        start, end = self._range(name, page_num)
+        return self.arrays[name][start:end]
+
+    def text(self, index):
+        """Texto da palavra `index` (índice global em self.words)"""
+        start = int(self._text_end[index - 1]) if index else 0
+        return bytes(self._text[start:int(self._text_end[index])]).decode("utf-8")
+
+    def texts(self, indices):
+        return [self.text(int(i)) for i in indices]
+
+    def line_text(self, index):
+        """Texto da linha (bloco e linha do PyMuPDF) a que pertence a palavra `index`"""
+        word = self.words[index]
+        start, end = self._range("palavras", int(word["pagina"]))
+        words = self.words[start:end]
+        same = np.flatnonzero((words["bloco"] == word["bloco"]) & (words["linha"] == word["linha"]))
+        same = same[np.argsort(words["x0"][same], kind="stable")]
+        return " ".join(self.text(start + int(i)) for i in same)
+
+    def page_words(self, page_num):
+        """Palavras [x0, y0, x1, y1, palavra] da página (formato de get_text("words"))"""
+        start, end = self._range("palavras", page_num)
+        words = self.words[start:end]
+        order = np.lexsort((words["x0"], words["linha"], words["bloco"]))
+        return [[float(w["x0"]), float(w["y0"]), float(w["x1"]), float(w["y1"]),
+                 self.text(start + int(i))] for i, w in zip(order, words[order])]
+
+    def words_in_bbox(self, page_num, bbox, inside=False):
+        """
+        Índices das palavras que intersetam bbox (x0, y0, x1, y1), ou com o
+        centro dentro dela se inside=True.
+        """
+        x0, y0, x1, y1 = bbox
+        width, height, max_width, max_height = self.pages[page_num - 1].tolist()
+        # Casas que podem conter o centro de uma palavra que toque em bbox
+        pad_x, pad_y = (0, 0) if inside else (max_width / 2, max_height / 2)
+        col0, col1 = (min(max(int(x / max(width, 1) * GRID), 0), GRID - 1)
+                      for x in (x0 - pad_x, x1 + pad_x))
+        row0, row1 = (min(max(int(y / max(height, 1) * GRID), 0), GRID - 1)
+                      for y in (y0 - pad_y, y1 + pad_y))
+        offsets = self.grid[page_num - 1].tolist()
+        candidates = np.concatenate([
+            np.arange(offsets[row * GRID + col0], offsets[row * GRID + col1 + 1])
+            for row in range(row0, row1 + 1)
+        ])
+        words = self.words[candidates]
+        if inside:
+            cx = (words["x0"] + words["x1"]) / 2
+            cy = (words["y0"] + words["y1"]) / 2
+            hit = (cx >= x0) & (cx <= x1) & (cy >= y0) & (cy <= y1)
+        else:
+            hit = (words["x1"] >= x0) & (words["x0"] <= x1) & (words["y1"] >= y0) & (words["y0"] <= y1)
+        return candidates[hit]
+
+    def nearest_text(self, page_num, bbox, k=5, max_distance=None):
+        """Índices das k palavras mais próximas de bbox (distância entre retângulos), com as distâncias"""
+        start, end = self._range("palavras", page_num)
+        words = self.words[start:end]
+        x0, y0, x1, y1 = bbox
+        dx = np.maximum(0, np.maximum(words["x0"] - x1, x0 - words["x1"]))
+        dy = np.maximum(0, np.maximum(words["y0"] - y1, y0 - words["y1"]))
+        distance = np.hypot(dx, dy)
+        k = min(k, len(distance))
+        if k == 0:
+            return np.zeros(0, dtype=int), np.zeros(0)
+        nearest = np.argpartition(distance, k - 1)[:k]
+        nearest = nearest[np.argsort(distance[nearest], kind="stable")]
+        if max_distance is not None:
+            nearest = nearest[distance[nearest] <= max_distance]
+        return nearest + start, distance[nearest]
+
+    def ruled_cells(self, page_num):
+        """Células desenhadas da página (array com x0, y0, x1, y1)"""
+        return self._page_array("celulas", page_num)
+
+    def images(self, page_num):
+        return self._page_array("imagens", page_num)
+
+    def segments(self, page_num, orientation=None):
+        segments = self._page_array("segmentos", page_num)
+        return segments if orientation is None else segments[segments["orientacao"] == orientation]
+
+
+def _bbox(value):
+    coords = tuple(float(v) for v in value.split(","))
+    if len(coords) != 4:
+        raise argparse.ArgumentTypeError("bbox deve ser x0,y0,x1,y1")
+    return coords
+
+
+def _timed(fn, repeat=200):
+    """(resultado, µs por chamada)"""
+    began = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - began) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Armazém da geometria das páginas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    build = sub.add_parser("construir", help="extrai a geometria dos manuais")
+    build.add_argument("pdfs", nargs="*", help="PDFs (omissão: todos os documentos de entrada)")
+    build.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    build.add_argument("--full", action="store_true", help="reconstrói mesmo se já existir")
+
+    query = sub.add_parser("consultar", help="consultas espaciais numa página")
+    query.add_argument("pdf")
+    query.add_argument("pagina", type=int)
+    query.add_argument("--bbox", type=_bbox, help="retângulo x0,y0,x1,y1 (omissão: metade de cima)")
+
+    args = parser.parse_args()
+
+    if args.comando == "construir":
+        pdf_files = [Path(p) for p in args.pdfs] or scan_inputs()
+        print(f"\n📐 Geometria de {len(pdf_files)} documento(s) ({args.workers} processo(s))...\n")
+        for pdf_path in pdf_files:
+            path = store_path(pdf_path)
+            if path.exists() and not args.full:
+                print(f"  ✅ {pdf_path.name}: já em {path}")
+                continue
+            began = time.perf_counter()
+            store = GeometryStore(build_store(pdf_path, workers=args.workers))
+            print(f"  📄 {pdf_path.name}: {len(store)} págs, {len(store.words)} palavras, "
+                  f"{len(store.arrays['segmentos'])} segmentos, {len(store.arrays['imagens'])} imagens, "
+                  f"{len(store.arrays['celulas'])} células ({time.perf_counter() - began:.2f}s, "
+                  f"{path.stat().st_size / 1e6:.1f} MB)")
+        print()
+        return
+
+    began = time.perf_counter()
+    store = GeometryStore.open(args.pdf)
+    print(f"\n📐 {Path(args.pdf).name}: armazém aberto em {(time.perf_counter() - began) * 1e3:.1f} ms")
+    if not 1 <= args.pagina <= len(store):
+        print(f"❌ Página {args.pagina} fora de 1-{len(store)}")
+        return
+    width, height = store.pages[args.pagina - 1].tolist()[:2]
+    bbox = args.bbox or (0, 0, width, height / 2)
+
+    found, micros = _timed(lambda: store.words_in_bbox(args.pagina, bbox))
+    print(f"\n  Palavras em {tuple(round(v) for v in bbox)}: {len(found)} ({micros:.1f} µs)")
+    print(f"     {' '.join(store.texts(found[:20]))}")
+
+    cells, micros = _timed(lambda: store.ruled_cells(args.pagina))
+    print(f"\n  Células desenhadas: {len(cells)} ({micros:.1f} µs)")
+    for cell in cells[:10]:
+        box = (cell["x0"], cell["y0"], cell["x1"], cell["y1"])
+        inside = store.words_in_bbox(args.pagina, box, inside=True)
+        print(f"     {tuple(round(float(v)) for v in box)}  {' '.join(store.texts(inside))[:50]}")
+
+    images = store.images(args.pagina)
+    print(f"\n  Imagens: {len(images)}")
+    for image in images[:10]:
+        box = (image["x0"], image["y0"], image["x1"], image["y1"])
+        (nearest, distance), micros = _timed(lambda: store.nearest_text(args.pagina, box, k=1))
+        caption = store.line_text(int(nearest[0])) if len(nearest) else ""
+        print(f"     xref {image['xref']} {tuple(round(float(v)) for v in box)}: "
+              f"{caption!r} a {distance[0] if len(distance) else 0:.0f} pt ({micros:.1f} µs)")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,40 +8,27 @@ import json
 import sys
 from pathlib import Path
 
+import units
+
 if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 DETAILED_JSON = Path(r"c:\Users\julio\Desktop\APLICACAO MASTER\LIFERAFT1.0\gestor-naval-pro\technical-specs-detailed.json")
 
-class PressureConverter:
-    """Converte entre unidades de pressão"""
+# Casas decimais por unidade no relatório
+PRESSURE_DECIMALS = {'psi': 2, 'mmWG': 1, 'inH2O': 2, 'mbar': 1}
+
+def pressure_to_all_units(value, from_unit):
+    """Converte um valor de pressão para todas as unidades do relatório (units.py)"""
+    # Unidades desconhecidas ou de outra grandeza (ex: 'kg') não têm conversão
+    unit = units.canonical_unit(from_unit)
+    if unit is None or units.quantity(unit) != 'pressao':
+        return None
     
-    @staticmethod
-    def to_all_units(value, from_unit):
-        """Converte um valor para todas as unidades"""
-        # Constantes de conversão para PSI
-        to_psi = {
-            'psi': 1.0,
-            'mmWG': 1.0 / 703.06957964,
-            'inH2O': 1.0 / 27.68064,
-            'milibares': 1.0 / 68.948,
-            'bar': 1.0 / 14.5038
-        }
-        
-        # Converte para PSI
-        if from_unit not in to_psi:
-            return None
-        
-        psi_value = value * to_psi[from_unit]
-        
-        # Retorna todas as conversões
-        return {
-            'psi': round(psi_value, 2),
-            'mmWG': round(psi_value * 703.06957964, 1),
-            'inH2O': round(psi_value * 27.68064, 2),
-            'milibares': round(psi_value * 68.948, 1)
-        }
+    converted = units.to_all(value, from_unit, units.PRESSURE_REPORT_UNITS, PRESSURE_DECIMALS)
+    converted['milibares'] = converted.pop('mbar')
+    return converted
 
 def extract_model_data(raw_model):
     """Extrai e formata dados de um modelo"""
@@ -59,7 +46,7 @@ def extract_model_data(raw_model):
         unit = list(pressao_original.keys())[0] if pressao_original else None
         value = list(pressao_original.values())[0] if pressao_original else None
         if unit and value:
-            pressao_convertida = PressureConverter.to_all_units(value, unit)
+            pressao_convertida = pressure_to_all_units(value, unit) or {}
     
     # Extrai dados de davit launch
     davit_info = raw_model.get('davitLaunch', {})
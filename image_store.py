@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Armazém de imagens endereçado por conteúdo (spare_parts_images/)
+
+Cada imagem renderizada (página ou quadrante de um manual) é identificada
+pelo SHA-256 dos seus pixéis (largura x altura, modo e bytes) e gravada uma
+única vez em blobs/<2 primeiros>/<sha256>.webp (WebP sem perdas; ou PNG
+otimizado com formato='png'). Imagens iguais pixel a pixel (páginas em
+branco, quadrantes repetidos, reexportações do mesmo manual) não ocupam
+espaço adicional nem voltam a ser codificadas. Páginas apenas parecidas
+(ex: mesma figura com outro número de página no rodapé) ficam em blobs
+distintos: o armazém não tem perdas.
+
+O índice imagens.json associa (manual, página, região) -> blob; região é
+'pagina' para a página completa ou o nome do quadrante (ex: 'Q1_tl').
+Os índices por manual (ex: MK_IV_index.json) mantêm os nomes antigos dos
+ficheiros (page_001.png, page_001_Q1_tl.png) e ganham um mapa "blobs"
+nome -> caminho do blob, que é o que a API (/api/spares/mk4) serve.
+
+Uso:
+  python image_store.py importar spare_parts_images/MK_IV --manual "MK IV" \\
+      [--indice spare_parts_images/MK_IV_index.json] [--remover]
+  python image_store.py exportar "MK IV" pasta/    (recria page_NNN.png)
+  python image_store.py resumo
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+STORE_ROOT = Path("spare_parts_images")
+INDEX_NAME = "imagens.json"
+BLOBS_DIR = "blobs"
+
+# Opções de gravação por formato (sem perdas). Em WebP, method=1 / quality=0
+# fica a ~55% do PNG codificando quase tão depressa; níveis acima custam 2-3x
+# o tempo para mais 10% de compressão.
+FORMATS = {
+    "webp": (".webp", {"format": "WEBP", "lossless": True, "method": 1, "quality": 0}),
+    "png": (".png", {"format": "PNG", "optimize": True}),
+}
+DEFAULT_FORMAT = "webp"
+
+# Região da página completa e nomes antigos dos ficheiros
+PAGE_REGION = "pagina"
+LEGACY_NAME = re.compile(r"^page_(\d+)(?:_(.+))?\.png$")
+
+
+def legacy_name(page_num, region=PAGE_REGION):
+    """(página, região) -> nome antigo do ficheiro (page_001.png, page_001_Q1_tl.png)"""
+    if region == PAGE_REGION:
+        return f"page_{page_num:03d}.png"
+    return f"page_{page_num:03d}_{region}.png"
+
+
+def pixel_sha256(image):
+    """SHA-256 dos pixéis de uma imagem PIL ou array NumPy uint8 (não do ficheiro)"""
+    if hasattr(image, "shape"):
+        array = np.ascontiguousarray(image)
+        height, width = array.shape[:2]
+        mode = {1: "L", 3: "RGB", 4: "RGBA"}[1 if array.ndim == 2 else array.shape[2]]
+        data = array.data
+    else:
+        width, height = image.size
+        mode, data = image.mode, image.tobytes()
+    digest = hashlib.sha256(f"{width}x{height}:{mode}:".encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def write_blob(image, root=STORE_ROOT, fmt=DEFAULT_FORMAT):
+    """
+    Grava a imagem (PIL ou array NumPy) se o conteúdo ainda não existir.
+
+    Não lê nem altera o índice, pelo que pode correr em paralelo em vários
+    processos; devolve a descrição do blob para ImageStore.add no processo
+    principal.
+    """
+    from PIL import Image
+
+    digest = pixel_sha256(image)
+    suffix, options = FORMATS[fmt]
+    relative = Path(BLOBS_DIR) / digest[:2] / f"{digest}{suffix}"
+    path = Path(root) / relative
+    if hasattr(image, "shape"):
+        height, width = image.shape[:2]
+    else:
+        width, height = image.size
+    if not path.exists():
+        if hasattr(image, "shape"):
+            image = Image.fromarray(np.ascontiguousarray(image))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        image.save(tmp, **options)
+        tmp.replace(path)
+    return {"sha256": digest, "arquivo": relative.as_posix(), "largura": width,
+            "altura": height, "bytes": path.stat().st_size}
+
+
+class ImageStore:
+    """Blobs únicos + índice (manual, página, região) -> blob"""
+
+    def __init__(self, root=STORE_ROOT, fmt=DEFAULT_FORMAT):
+        self.root = Path(root)
+        self.fmt = fmt
+        self.index_path = self.root / INDEX_NAME
+        self.blobs = {}
+        self.images = {}
+        if self.index_path.exists():
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.blobs = data.get("blobs", {})
+            self.images = {
+                (item["manual"], item["pagina"], item["regiao"]): item["blob"]
+                for item in data.get("imagens", [])
+            }
+
+    def blob_path(self, blob):
+        """Caminho absoluto (relativo à pasta atual) de um blob do índice"""
+        return self.root / self.blobs[blob]["arquivo"]
+
+    def write(self, image):
+        """Grava a imagem no armazém (ver write_blob); devolve a descrição do blob"""
+        return write_blob(image, self.root, self.fmt)
+
+    def add(self, manual, page_num, region, blob):
+        """Regista (manual, página, região) -> blob (descrição devolvida por `write`)"""
+        self.blobs[blob["sha256"]] = {k: v for k, v in blob.items() if k != "sha256"}
+        self.images[(manual, page_num, region)] = blob["sha256"]
+        return blob["sha256"]
+
+    def put(self, image, manual, page_num, region=PAGE_REGION):
+        """Grava e regista uma imagem; devolve o SHA-256 do blob"""
+        return self.add(manual, page_num, region, self.write(image))
+
+    def get(self, manual, page_num, region=PAGE_REGION):
+        """Caminho do blob de (manual, página, região), ou None"""
+        blob = self.images.get((manual, page_num, region))
+        return self.blob_path(blob) if blob else None
+
+    def entries(self, manual):
+        """{(página, região): sha256} de um manual"""
+        return {(page, region): blob for (name, page, region), blob in self.images.items()
+                if name == manual}
+
+    def legacy_map(self, manual):
+        """Nome antigo do ficheiro -> caminho do blob (relativo à raiz), para os índices por manual"""
+        return {legacy_name(page, region): self.blobs[blob]["arquivo"]
+                for (page, region), blob in sorted(self.entries(manual).items())}
+
+    def forget(self, manual, pages=None):
+        """Remove as entradas de um manual, ou só das páginas indicadas (antes de as reexportar)"""
+        pages = None if pages is None else set(pages)
+        self.images = {key: blob for key, blob in self.images.items()
+                       if key[0] != manual or (pages is not None and key[1] not in pages)}
+
+    def prune(self):
+        """Apaga os blobs que nenhuma entrada referencia; devolve quantos"""
+        used = set(self.images.values())
+        removed = 0
+        for blob in [b for b in self.blobs if b not in used]:
+            self.blob_path(blob).unlink(missing_ok=True)
+            del self.blobs[blob]
+            removed += 1
+        return removed
+
+    def save(self):
+        """Grava imagens.json (escrita atómica)"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {
+            "formato": self.fmt,
+            "blobs": dict(sorted(self.blobs.items())),
+            "imagens": [
+                {"manual": manual, "pagina": page, "regiao": region, "blob": blob}
+                for (manual, page, region), blob in sorted(self.images.items())
+            ],
+        }
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        tmp.replace(self.index_path)
+
+    def summary(self):
+        """Imagens, blobs únicos e bytes ocupados (com e sem deduplicação)"""
+        stored = sum(info["bytes"] for info in self.blobs.values())
+        referenced = sum(self.blobs[blob]["bytes"] for blob in self.images.values())
+        return {
+            "imagens": len(self.images),
+            "blobs": len(self.blobs),
+            "bytes": stored,
+            "bytes_sem_dedup": referenced,
+            "manuais": sorted({manual for manual, _, _ in self.images}),
+        }
+
+
+def update_manual_index(index_file, store, manual):
+    """Acrescenta/atualiza o mapa "blobs" (nome antigo -> blob) num índice por manual"""
+    index_file = Path(index_file)
+    with open(index_file, encoding="utf-8") as f:
+        index = json.load(f)
+    index["blobs"] = store.legacy_map(manual)
+    with open(index_file, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+
+
+def import_directory(store, directory, manual, remove=False):
+    """Importa os page_NNN*.png de uma pasta; devolve (importadas, bytes originais)"""
+    from PIL import Image
+
+    count, original = 0, 0
+    for path in sorted(Path(directory).glob("page_*.png")):
+        match = LEGACY_NAME.match(path.name)
+        if not match:
+            continue
+        with Image.open(path) as image:
+            image.load()
+            store.put(image, manual, int(match.group(1)), match.group(2) or PAGE_REGION)
+        original += path.stat().st_size
+        count += 1
+        if remove:
+            path.unlink()
+        if count % 100 == 0:
+            print(f"   ... {count} imagens")
+    return count, original
+
+
+def export_directory(store, manual, directory):
+    """Recria os ficheiros com os nomes antigos (PNG) a partir dos blobs"""
+    from PIL import Image
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    entries = store.entries(manual)
+    for (page, region), blob in sorted(entries.items()):
+        with Image.open(store.blob_path(blob)) as image:
+            image.save(directory / legacy_name(page, region), "PNG")
+    return len(entries)
+
+
+def _mb(size):
+    return f"{size / 1e6:.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Armazém de imagens endereçado por conteúdo")
+    parser.add_argument("--raiz", default=str(STORE_ROOT), help="pasta do armazém")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    imp = sub.add_parser("importar", help="importa uma pasta de page_NNN*.png")
+    imp.add_argument("pasta")
+    imp.add_argument("--manual", required=True)
+    imp.add_argument("--indice", help="índice do manual a atualizar (ex: MK_IV_index.json)")
+    imp.add_argument("--formato", choices=sorted(FORMATS), default=DEFAULT_FORMAT)
+    imp.add_argument("--remover", action="store_true", help="apaga os PNG importados")
+
+    exp = sub.add_parser("exportar", help="recria page_NNN*.png de um manual")
+    exp.add_argument("manual")
+    exp.add_argument("pasta")
+
+    sub.add_parser("resumo", help="imagens, blobs e espaço ocupado")
+
+    args = parser.parse_args()
+
+    if args.comando == "importar":
+        store = ImageStore(args.raiz, args.formato)
+        print(f"\n📥 Importando {args.pasta} ({args.manual}) para {store.root}/{BLOBS_DIR}...")
+        count, original = import_directory(store, args.pasta, args.manual, args.remover)
+        store.save()
+        if args.indice:
+            update_manual_index(args.indice, store, args.manual)
+            print(f"   📋 Mapa de blobs atualizado em {args.indice}")
+        entries = store.entries(args.manual)
+        stored = sum(store.blobs[b]["bytes"] for b in set(entries.values()))
+        print(f"✅ {count} imagens -> {len(set(entries.values()))} blob(s) únicos: "
+              f"{_mb(original)} -> {_mb(stored)}\n")
+        return
+
+    store = ImageStore(args.raiz)
+    if args.comando == "exportar":
+        count = export_directory(store, args.manual, args.pasta)
+        print(f"✅ {count} imagens de {args.manual} em {args.pasta}")
+        return
+
+    summary = store.summary()
+    print(f"\n🗄️  {store.root}: {summary['imagens']} imagens em {summary['blobs']} blob(s), "
+          f"{_mb(summary['bytes'])} (sem deduplicação {_mb(summary['bytes_sem_dedup'])})")
+    for manual in summary["manuais"]:
+        entries = store.entries(manual)
+        print(f"   {manual}: {len(entries)} imagens, {len(set(entries.values()))} blob(s)")
+    print()
+
+
+if __name__ == "__main__":
+    main()
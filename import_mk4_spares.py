@@ -8,6 +8,9 @@ import os
 import json
 from pathlib import Path
 
+from part_index import PartNumberIndex
+from part_locator import image_url, load_locations
+
 # Tentar importar psycopg2
 try:
     import psycopg2
@@ -52,10 +55,43 @@ references = spares_data.get('referencias_encontradas', [])
 components = spares_data.get('spares', [])
 imagens = spares_data.get('imagens_por_pagina', {})
 
+# Página e recorte de cada referência (part_locator.py); sem localização,
+# a primeira página onde a referência aparece
+locations = load_locations()
+reference_pages = {r['referencia']: r['paginas'] for r in spares_data.get('referencias', [])}
+
+
+def image_for(ref, page=None):
+    """Caminho da imagem de uma referência: recorte localizado, página conhecida ou None"""
+    location = locations.get(ref)
+    if location:
+        return location['imagem']
+    pages = reference_pages.get(ref)
+    page = page or (pages[0] if pages else None)
+    return image_url(page) if page else None
+
+
+# Aliases de referências (part_index.py): grava-se sempre a referência canónica
+part_index = PartNumberIndex.load()
+
+
+def canonical_reference(ref):
+    """Referência canónica (ex: histórica -> atual); a própria se não estiver no índice"""
+    return part_index.canonical(ref) or ref
+
+
+def alias_note(ref):
+    """' (aliases: A, B)' com as referências equivalentes, ou ''"""
+    aliases = part_index.alias_group(ref)[1:]
+    return f" (aliases: {', '.join(aliases)})" if aliases else ""
+
+
 print(f"📊 Dados carregados:")
 print(f"   Referências: {len(references)}")
 print(f"   Componentes: {len(components)}")
-print(f"   Imagens disponíveis: {len(imagens)}\n")
+print(f"   Imagens disponíveis: {len(imagens)}")
+print(f"   Referências localizadas: {len(locations)}")
+print(f"   Índice de referências: {len(part_index)}\n")
 
 # Conectar ao banco
 try:
@@ -70,34 +106,32 @@ try:
     # Inserir referências
     print(f"📦 Processando {len(references)} referências...\n")
     
-    for ref in references:
-        if not ref or ref == '.' or len(ref) < 3:
+    for original in references:
+        if not original or original == '.' or len(original) < 3:
             continue
+        ref = canonical_reference(original.strip())
         
-        # Verificar se existe
+        # Verificar se existe (aliases já importados contam como existentes)
         cursor.execute(
             'SELECT id FROM stock WHERE "refFabricante" = %s AND categoria = %s',
-            (ref.strip(), categoria)
+            (ref, categoria)
         )
         
         if cursor.fetchone():
             ref_existentes += 1
             continue
         
-        # Quebra de página aleatória para imagem
-        paginas = list(imagens.keys())
-        imagem_page = paginas[len(ref) % len(paginas)] if paginas else None
-        imagem_path = f"/api/spares/mk4/{imagem_page}" if imagem_page else None
+        imagem_path = image_for(original.strip()) or image_for(ref)
         
         nome = f"MK IV Spare Part - {ref.upper()}"
-        descricao = f"MK IV Spare Part - Referência do fabricante: {ref}"
+        descricao = f"MK IV Spare Part - Referência do fabricante: {ref}{alias_note(ref)}"
         
         try:
             cursor.execute(
                 """INSERT INTO stock (nome, descricao, categoria, quantidade, "quantidadeMinima", "refFabricante", imagem, lote, status, "createdAt", "updatedAt")
                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
                    ON CONFLICT ("refFabricante") DO NOTHING""",
-                (nome, descricao, categoria, 0, 0, ref.strip(), imagem_path, 'MK_IV_SPARES', 'ativo')
+                (nome, descricao, categoria, 0, 0, ref, imagem_path, 'MK_IV_SPARES', 'ativo')
             )
             ref_adicionadas += 1
             
@@ -115,9 +149,10 @@ try:
         if not comp.get('descricao') and not comp.get('refFabricante'):
             continue
         
-        ref = comp.get('refFabricante', '')
-        if not ref:
+        original = comp.get('refFabricante', '')
+        if not original:
             continue
+        ref = canonical_reference(original)
         
         # Verificar se existe
         cursor.execute(
@@ -128,12 +163,10 @@ try:
         if cursor.fetchone():
             continue
         
-        imagem_path = None
-        if comp.get('pagina'):
-            imagem_path = f"/api/spares/mk4/page_{comp['pagina']:03d}.png"
+        imagem_path = image_for(original, comp.get('pagina'))
         
         nome = comp.get('descricao', f"MK IV - {ref}")
-        descricao = f"{comp.get('descricao', 'MK IV Spare Part')} - Ref: {ref}"
+        descricao = f"{comp.get('descricao', 'MK IV Spare Part')} - Ref: {ref}{alias_note(ref)}"
         
         try:
             cursor.execute(
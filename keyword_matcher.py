@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Pesquisa de várias palavras-chave numa só passagem (Aho-Corasick)
+
+O texto e as palavras-chave são normalizados da mesma forma (sem acentos,
+minúsculas), pelo que "PRESSÃO", "pressao" e "Pressão" são o mesmo termo
+e listas em português e inglês podem ser misturadas. Em vez de N
+pesquisas `kw in text.upper()` por página ou linha, o autómato percorre o
+texto uma vez e devolve todas as ocorrências.
+
+O texto normalizado de cada página fica guardado no cache partilhado
+(campo "texto_norm" em pdf_cache.py / PageSource.normalized_text).
+
+Uso: python keyword_matcher.py "TEXTO A PESQUISAR" kw1 kw2 ...
+"""
+
+import sys
+import unicodedata
+from collections import deque
+
+
+def normalize(text):
+    """Remove acentos e converte para minúsculas (forma de comparação)"""
+    if not text:
+        return ""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+class KeywordMatcher:
+    """Autómato Aho-Corasick sobre palavras-chave normalizadas"""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._lengths = []
+        # Trie: goto[s] mapeia carácter -> estado seguinte (estado 0 = raiz)
+        goto = [{}]
+        terminals = {}
+        for index, keyword in enumerate(self.keywords):
+            key = normalize(keyword)
+            if not key:
+                raise ValueError(f"Palavra-chave vazia: {keyword!r}")
+            state = 0
+            for ch in key:
+                if ch not in goto[state]:
+                    goto[state][ch] = len(goto)
+                    goto.append({})
+                state = goto[state][ch]
+            terminals.setdefault(state, []).append(index)
+            self._lengths.append(len(key))
+        self._build(goto, terminals)
+
+    def _build(self, goto, terminals):
+        """Ligações de falha e transições completas (DFA), por largura"""
+        fail = [0] * len(goto)
+        self._out = [()] * len(goto)
+        self._delta = [None] * len(goto)
+        self._delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        for state in queue:
+            self._out[state] = tuple(terminals.get(state, ()))
+        while queue:
+            state = queue.popleft()
+            # Herdar as transições do estado de falha: o autómato nunca recua
+            self._delta[state] = {**self._delta[fail[state]], **goto[state]}
+            for ch, nxt in goto[state].items():
+                fail[nxt] = self._delta[fail[state]].get(ch, 0) if state else 0
+                self._out[nxt] = tuple(terminals.get(nxt, ())) + self._out[fail[nxt]]
+                queue.append(nxt)
+
+    def iter_matches(self, text, normalized=False):
+        """Gera (início, fim, palavra-chave) sobre o texto normalizado"""
+        if not normalized:
+            text = normalize(text)
+        delta, out, lengths = self._delta, self._out, self._lengths
+        state = 0
+        for pos, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            for index in out[state]:
+                yield pos + 1 - lengths[index], pos + 1, self.keywords[index]
+
+    def counts(self, text, normalized=False):
+        """Ocorrências de cada palavra-chave, pela ordem de self.keywords"""
+        if not normalized:
+            text = normalize(text)
+        totals = [0] * len(self.keywords)
+        delta, out = self._delta, self._out
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            for index in out[state]:
+                totals[index] += 1
+        return totals
+
+    def hits(self, text, normalized=False):
+        """Palavras-chave presentes no texto (pela ordem de self.keywords)"""
+        return [kw for kw, n in zip(self.keywords, self.counts(text, normalized)) if n]
+
+    def search(self, text, normalized=False):
+        """Primeira palavra-chave encontrada (ou None), parando logo aí"""
+        for _, _, keyword in self.iter_matches(text, normalized):
+            return keyword
+        return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print('Uso: python keyword_matcher.py "TEXTO" kw1 kw2 ...')
+        sys.exit(1)
+    matcher = KeywordMatcher(sys.argv[2:])
+    for start, end, keyword in matcher.iter_matches(sys.argv[1]):
+        print(f"  {start:>5}-{end:<5} {keyword}")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Manifesto de ficheiros de entrada para reindexação incremental
+
+Regista caminho, tamanho, mtime e SHA-256 de cada documento em MARCAS/,
+MARCAS/boletins/ e legislaçao/, e a versão do extrator que o processou.
+Cada script de extração guarda o seu próprio manifesto e, em cada
+execução, só reprocessa documentos novos ou modificados (ou extraídos por
+outra versão) e remove as saídas dos que foram apagados.
+
+Uso: python manifest.py   (mostra o estado face ao manifesto de extract_all_manuals)
+"""
+
+import json
+import os
+from pathlib import Path
+
+from pdf_cache import file_sha256
+
+INPUT_ROOTS = [Path("MARCAS"), Path("MARCAS/boletins"), Path("legislaçao")]
+MANIFEST_DIR = Path(".cache/manifestos")
+
+
+def scan_inputs(roots=INPUT_ROOTS, pattern="*.pdf"):
+    """Lista (sem duplicados) os documentos sob as pastas de entrada"""
+    found = set()
+    for root in roots:
+        if root.exists():
+            found.update(p for p in root.rglob(pattern) if p.is_file())
+    return sorted(found)
+
+
+class Manifest:
+    """Estado dos documentos na última execução bem-sucedida de um script"""
+
+    def __init__(self, name, version=1):
+        self.path = MANIFEST_DIR / f"{name}.json"
+        # Aumentar quando a saída do script muda: as entradas antigas deixam de valer
+        self.version = version
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("ficheiros", {})
+
+    @staticmethod
+    def key(path):
+        return Path(os.path.normpath(path)).as_posix()
+
+    def _is_unchanged(self, path):
+        """Compara tamanho/mtime; só recalcula o hash quando estes mudaram"""
+        entry = self.entries.get(self.key(path))
+        # Entradas sem "versao" são de antes do campo existir (versão 1)
+        if entry is None or entry.get("versao", 1) != self.version:
+            return False
+        stat = path.stat()
+        if entry["tamanho"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+            return True
+        if entry["tamanho"] == stat.st_size and entry["sha256"] == file_sha256(path):
+            # Apenas "tocado" (cópia, checkout): atualizar mtime sem reprocessar
+            entry["mtime"] = stat.st_mtime_ns
+            return True
+        return False
+
+    def changes(self, paths):
+        """Classifica os documentos atuais face ao manifesto"""
+        paths = [Path(p) for p in paths]
+        current = {self.key(p) for p in paths}
+        result = {"novos": [], "modificados": [], "inalterados": [], "removidos": []}
+        for path in paths:
+            if self.key(path) not in self.entries:
+                result["novos"].append(path)
+            elif self._is_unchanged(path):
+                result["inalterados"].append(path)
+            else:
+                result["modificados"].append(path)
+        result["removidos"] = [Path(k) for k in sorted(self.entries) if k not in current]
+        return result
+
+    def mark(self, path):
+        """Regista o documento como processado (chamar só após sucesso)"""
+        path = Path(path)
+        stat = path.stat()
+        self.entries[self.key(path)] = {
+            "tamanho": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "sha256": file_sha256(path),
+            "versao": self.version,
+        }
+
+    def forget(self, path):
+        self.entries.pop(self.key(path), None)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"ficheiros": self.entries}, f, indent=2, ensure_ascii=False)
+
+
+def print_changes(changes):
+    print(f"   🆕 Novos: {len(changes['novos'])}")
+    print(f"   ✏️  Modificados: {len(changes['modificados'])}")
+    print(f"   🗑️  Removidos: {len(changes['removidos'])}")
+    print(f"   ✅ Inalterados: {len(changes['inalterados'])}")
+
+
+if __name__ == "__main__":
+    manifest = Manifest("extract_all_manuals")
+    changes = manifest.changes(scan_inputs())
+    print(f"\n📋 Estado face a {manifest.path}:\n")
+    print_changes(changes)
+    for label in ("novos", "modificados", "removidos"):
+        for path in changes[label]:
+            print(f"   • [{label}] {path}")
+    print()
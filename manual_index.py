@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Índice de texto integral (SQLite FTS5) por página de manuais, boletins e legislação
+
+Uma linha por página com documento, página, título e texto, construída a
+partir do texto já extraído (page_source.py / pdf_cache.py). A descoberta
+de páginas por palavra-chave ("CYLINDER", "WEAK LINK", "TABLE 3.3") passa
+a ser uma consulta de milissegundos em vez de reler o PDF inteiro.
+
+Uso:
+  python manual_index.py build [--full]
+  python manual_index.py search "weak link" [--limit 20] [--doc LR05] [--substring]
+
+A pesquisa aceita a sintaxe FTS5: "weak link" (frase), cylinder AND co2,
+psi OR mbar, valv* (prefixo). Resultados ordenados por BM25 (menor = melhor).
+
+O tokenizador unicode61 só casa palavras inteiras ou prefixos de palavras
+("CYLINDER*" não encontra "CO2CYLINDER", "pack*" não encontra "backpack").
+Para pré-filtrar páginas que um script depois verifica com `in` ou com
+KeywordMatcher há uma segunda tabela com trigramas sobre o texto
+normalizado (keyword_matcher.normalize): com substring=True,
+literal('TABLE 3') casa todas as páginas cujo texto contém "table 3", como
+a verificação por substring. Requer SQLite >= 3.34.
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+from keyword_matcher import normalize
+from manifest import Manifest, print_changes, scan_inputs
+from page_source import PageSource
+
+INDEX_PATH = Path(".cache/indice_manuais.sqlite")
+# 2: tabela de trigramas (paginas_sub); documentos indexados antes são reindexados
+INDEX_VERSION = 2
+
+
+def page_heading(text, max_lines=8):
+    """Título da página: primeira linha curta em maiúsculas, ou a primeira com letras"""
+    candidates = []
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if sum(c.isalpha() for c in line) >= 3 and len(line) <= 80:
+            candidates.append(line)
+            if len(candidates) >= max_lines:
+                break
+    for line in candidates:
+        letters = [c for c in line if c.isalpha()]
+        if sum(c.isupper() for c in letters) / len(letters) > 0.8:
+            return line
+    return candidates[0] if candidates else ""
+
+
+def phrase(text):
+    """Cita um termo para pesquisa FTS5 exata (ex: TABLE 3.3 -> "TABLE 3.3")"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def literal(text):
+    """Substring para pesquisa com substring=True (normalizada como o texto indexado)"""
+    key = normalize(text)
+    if len(key) < 3:
+        # Os trigramas não encontram substrings com menos de 3 caracteres
+        raise ValueError(f"substring com menos de 3 caracteres: {text!r}")
+    return phrase(key)
+
+
+class ManualIndex:
+    """Índice FTS5 página a página, atualizado incrementalmente pelo manifesto"""
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documentos (
+                documento TEXT PRIMARY KEY,
+                paginas INTEGER NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS paginas USING fts5(
+                documento UNINDEXED,
+                pagina UNINDEXED,
+                titulo,
+                texto,
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+            -- Mesmo rowid que em paginas; texto normalizado, pesquisa por substring
+            CREATE VIRTUAL TABLE IF NOT EXISTS paginas_sub USING fts5(
+                documento UNINDEXED,
+                pagina UNINDEXED,
+                titulo UNINDEXED,
+                texto,
+                tokenize = 'trigram'
+            );
+        """)
+        self.manifest = Manifest("manual_index", INDEX_VERSION)
+
+    def _indexed(self):
+        return {row[0] for row in self.conn.execute("SELECT documento FROM documentos")}
+
+    def _remove(self, documento):
+        self.conn.execute("DELETE FROM paginas WHERE documento = ?", (documento,))
+        self.conn.execute("DELETE FROM paginas_sub WHERE documento = ?", (documento,))
+        self.conn.execute("DELETE FROM documentos WHERE documento = ?", (documento,))
+
+    def _add(self, pdf_path):
+        documento = Manifest.key(pdf_path)
+        self._remove(documento)
+        with PageSource(pdf_path) as source:
+            rows = [
+                (documento, p["pagina"], page_heading(p["texto"]), p["texto"], p["texto_norm"])
+                for p in source.pages(normalized=True)
+            ]
+        for documento, pagina, titulo, texto, texto_norm in rows:
+            rowid = self.conn.execute(
+                "INSERT INTO paginas (documento, pagina, titulo, texto) VALUES (?, ?, ?, ?)",
+                (documento, pagina, titulo, texto),
+            ).lastrowid
+            self.conn.execute(
+                "INSERT INTO paginas_sub (rowid, documento, pagina, titulo, texto) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (rowid, documento, pagina, titulo, texto_norm),
+            )
+        self.conn.execute(
+            "INSERT INTO documentos (documento, paginas) VALUES (?, ?)", (documento, len(rows))
+        )
+        self.conn.commit()
+        self.manifest.mark(pdf_path)
+        return len(rows)
+
+    def update(self, paths=None, full=False, verbose=False):
+        """
+        Indexa documentos novos/modificados e remove os apagados.
+
+        `paths` restringe a atualização a esses PDFs (não remove outros);
+        None percorre MARCAS/, MARCAS/boletins/ e legislaçao/.
+        """
+        scan_all = paths is None
+        paths = [Path(p) for p in (scan_inputs() if scan_all else paths)]
+        changes = self.manifest.changes(paths)
+        indexed = self._indexed()
+
+        if full:
+            todo = paths
+        else:
+            todo = changes["novos"] + changes["modificados"] + [
+                p for p in changes["inalterados"] if Manifest.key(p) not in indexed
+            ]
+        if verbose:
+            print_changes(changes)
+            print(f"\n🔄 A indexar: {len(todo)}\n")
+
+        for pdf_path in todo:
+            try:
+                total = self._add(pdf_path)
+                if verbose:
+                    print(f"   ✅ {pdf_path} ({total} páginas)")
+            except Exception as e:
+                print(f"   ❌ Erro ao indexar {pdf_path}: {e}")
+
+        if scan_all:
+            for removed in changes["removidos"]:
+                self._remove(Manifest.key(removed))
+                self.manifest.forget(removed)
+                if verbose:
+                    print(f"   🗑️  Removido do índice: {removed}")
+            self.conn.commit()
+        self.manifest.save()
+        return changes
+
+    def search(self, query, limit=20, document=None, document_like=None, with_text=False,
+               substring=False):
+        """
+        Páginas que satisfazem `query`, ordenadas por BM25 (título pesa 2x).
+
+        `document` filtra um PDF exato; `document_like` um excerto do caminho;
+        `limit=None` devolve todas. Com `substring=True` a consulta é feita
+        sobre os trigramas do texto normalizado (termos com `literal`).
+        """
+        table = "paginas_sub" if substring else "paginas"
+        filtros, params = "", [query]
+        if document:
+            filtros += " AND documento = ?"
+            params.append(Manifest.key(document))
+        if document_like:
+            filtros += " AND documento LIKE ?"
+            params.append(f"%{document_like}%")
+        # LIMIT -1 do SQLite: sem limite
+        params.append(-1 if limit is None else limit)
+        # Pesos por coluna (documento, pagina, titulo, texto); o texto original está em paginas
+        sql = """
+            SELECT documento, pagina, titulo,
+                   snippet({table}, 3, '[', ']', ' … ', 12),
+                   bm25({table}, 0, 0, 2.0, 1.0){texto}
+            FROM {table}
+            WHERE {table} MATCH ?{filtros}
+            ORDER BY bm25({table}, 0, 0, 2.0, 1.0)
+            LIMIT ?
+        """.format(
+            table=table,
+            texto=f", (SELECT texto FROM paginas WHERE paginas.rowid = {table}.rowid)"
+            if with_text else "",
+            filtros=filtros,
+        )
+        results = []
+        for row in self.conn.execute(sql, params):
+            result = {
+                "documento": row[0],
+                "pagina": row[1],
+                "titulo": row[2],
+                "trecho": row[3],
+                "bm25": round(row[4], 3),
+            }
+            if with_text:
+                result["texto"] = row[5]
+            results.append(result)
+        return results
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def find_pages(pdf_path, query, limit=None, with_text=False, substring=False):
+    """
+    Atalho para scripts: indexa o PDF se preciso e devolve as páginas que
+    casam (todas, por omissão). Como pré-filtro de verificações por
+    substring usar substring=True com termos `literal`.
+    """
+    with ManualIndex() as index:
+        index.update([pdf_path])
+        return index.search(query, limit=limit, document=pdf_path, with_text=with_text,
+                            substring=substring)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice FTS5 de manuais, boletins e legislação")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    build = sub.add_parser("build", help="(re)indexa documentos novos ou modificados")
+    build.add_argument("--full", action="store_true", help="reindexa todos os documentos")
+
+    search = sub.add_parser("search", help="pesquisa páginas (sintaxe FTS5)")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--doc", help="filtra documentos cujo caminho contém este texto")
+    search.add_argument("--substring", action="store_true",
+                        help="procura o texto como substring (trigramas), não como consulta FTS5")
+
+    args = parser.parse_args()
+
+    with ManualIndex() as index:
+        if args.comando == "build":
+            print(f"\n📚 Atualizando índice {index.path}...\n")
+            index.update(full=args.full, verbose=True)
+            total = index.conn.execute("SELECT COUNT(*) FROM paginas").fetchone()[0]
+            print(f"\n✅ Índice com {total} páginas\n")
+            return
+
+        try:
+            query = literal(args.query) if args.substring else args.query
+            results = index.search(query, limit=args.limit, document_like=args.doc,
+                                   substring=args.substring)
+        except (sqlite3.OperationalError, ValueError) as e:
+            print(f"❌ Consulta inválida: {e}")
+            sys.exit(1)
+
+        print(f"\n🔍 {len(results)} página(s) para: {args.query}\n")
+        for r in results:
+            print(f"  {r['bm25']:>8.3f}  {r['documento']} — pág. {r['pagina']}")
+            if r["titulo"]:
+                print(f"            {r['titulo']}")
+            print(f"            {' '.join(r['trecho'].split())}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,59 +3,157 @@
 """
 OCR para PDFs SEASAVA - Extrai especificações técnicas
 Processa páginas específicas dos PDFs escaneados
+
+As páginas são renderizadas uma a uma (page_renderer.py) e passam aos
+workers de OCR por uma fila limitada, pelo que a memória não cresce com o
+número de páginas pedidas. Cada worker reutiliza o mesmo motor de OCR
+(ocr_processor.get_backend: tesserocr persistente, ou pytesseract).
+Cada página escolhe o seu DPI, é endireitada e binarizada e a língua é
+confirmada pelo texto reconhecido (ocr_preprocess.py); como a escala de
+DPI volta a renderizar a página, este modo corre num conjunto de
+processos, cada um com o PDF aberto (o PyMuPDF não suporta threads).
+--fixo usa 200 dpi e inglês em todas.
+
+As caixas das palavras do mesmo OCR reconstroem as tabelas de capacidades
+(ocr_tables.py), gravadas em extracted_manuals/<pdf>_ocr_tables.json no
+formato dos *_tables.json dos manuais digitais; as tabelas com achados de
+spec_rules entram nas especificações com as linhas e colunas intactas.
+
+Com --regioes só os blocos de texto/tabela detetados em cada página vão ao
+OCR (ocr_regions.py), com relatório de pixéis e tempo poupados em
+seasava-ocr-regioes.json; --comparar mede também a página inteira.
+
+Uso: python ocr-seasava.py [--fixo] [--regioes [--so-tabelas] [--comparar]]
 """
 
 import os
 import json
-import re
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from pdf2image import convert_from_path
-import pytesseract
+import fitz  # PyMuPDF
 from datetime import datetime
 
+from ocr_preprocess import AdaptiveOCR
+from ocr_processor import available_languages, get_backend
+from ocr_regions import RegionOCR, format_page, summarize
+from ocr_tables import extract_tables, tables_document
+from page_renderer import map_pages
+from pdf_cache import _shard
+from spec_rules import DEFAULT_RULES, values
+
+# Capacidades, pressões em PSI e pesos de CO2
+SPEC_RULES = DEFAULT_RULES.select('capacidade', 'pressao', 'massa_co2')
+
+
+def _ocr_adaptive_range(pdf_path, pages):
+    """Worker: OCR adaptativo de um bloco de páginas com o PDF aberto uma só vez"""
+    adaptive = AdaptiveOCR(lambda lang: get_backend(lang=lang),
+                           languages=available_languages(), default_lang='eng')
+    results = []
+    with fitz.open(pdf_path) as doc:
+        for page_num in pages:
+            text, _, _, words = adaptive.recognize_page(doc, page_num, lang_hint='eng', words=True)
+            results.append((page_num, (text, extract_tables(words))))
+    return results
+
+
 class ExtractorSEASAVA:
-    def __init__(self):
+    def __init__(self, regions=False, tables_only=False, compare=False, adaptive=True):
         self.pdfs = {
             'SEASAVA PLUS': 'MARCAS/Seasava Plus.pdf',
             'SEASAVA X E R': 'MARCAS/Seasava Plus X E R.pdf'
         }
         self.results = {}
+        # OCR só das regiões de texto/tabela (índice de recortes partilhado pelos dois PDFs)
+        self.region_ocr = RegionOCR(lang='eng', tables_only=tables_only, compare=compare) \
+            if regions else None
+        self.region_report = {}
+        self.adaptive = adaptive
         
     def extract_pages(self, pdf_path, start_page=1, end_page=None, pages_list=None):
         """Extrai OCR de páginas específicas"""
         print(f"\n📄 Processando: {pdf_path}")
-        print("  Convertendo PDF em imagens...")
+        if not pages_list:
+            # Intervalo start_page..end_page (até ao fim do documento se end_page for None)
+            if end_page is None:
+                with fitz.open(pdf_path) as doc:
+                    end_page = doc.page_count
+            pages_list = list(range(start_page, end_page + 1))
+        workers = os.cpu_count() or 1
+        print(f"  Renderizando e extraindo OCR ({workers} worker(s))...")
+        
+        if self.region_ocr:
+            return self.extract_regions(pdf_path, pages_list, workers)
+        
+        if self.adaptive:
+            results = self.adaptive_ocr(pdf_path, pages_list, workers)
+        else:
+            def ocr(image):
+                text, _, words = get_backend(lang='eng').recognize(image, words=True)
+                return text, extract_tables(words)
+            results = map_pages(ocr, pdf_path, pages_list, workers=workers, dpi=200,
+                                gray=True, array=True)
         
         try:
-            if pages_list:
-                images = convert_from_path(pdf_path, first_page=min(pages_list), 
-                                          last_page=max(pages_list))
-                filtered_images = [images[i-1] for i in pages_list if i <= len(images)]
-                images = filtered_images
-            else:
-                images = convert_from_path(pdf_path, first_page=start_page, 
-                                          last_page=end_page)
-            
-            print(f"  ✅ {len(images)} página(s) convertidas")
-            
             all_text = []
-            for i, image in enumerate(images):
-                page_num = (pages_list[i] if pages_list else start_page + i)
-                print(f"  🔤 Extraindo OCR página {page_num}...", end='')
-                
-                text = pytesseract.image_to_string(image, lang='eng')
+            for page_num, (text, tables) in results:
+                print(f"  🔤 OCR página {page_num} ✓" + (f" ({len(tables)} tabela(s))" if tables else ""))
                 all_text.append({
                     'page': page_num,
-                    'text': text
+                    'text': text,
+                    'tables': tables
                 })
-                print(" ✓")
             
+            all_text.sort(key=lambda item: item['page'])
+            print(f"  ✅ {len(all_text)} página(s) processadas")
             return all_text
             
         except Exception as e:
             print(f"  ❌ Erro: {e}")
             return []
     
+    def adaptive_ocr(self, pdf_path, pages_list, workers):
+        """(página, (texto, tabelas)) do OCR adaptativo, por blocos de páginas em processos"""
+        chunks = _shard(pages_list, workers)
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_ocr_adaptive_range, pdf_path, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    yield from future.result()
+        else:
+            for chunk in chunks:
+                yield from _ocr_adaptive_range(pdf_path, chunk)
+    
+    def extract_regions(self, pdf_path, pages_list, workers):
+        """OCR só das regiões de texto/tabela de cada página, com relatório de poupança"""
+        try:
+            pages = []
+            for page_num, page in map_pages(self.region_ocr, pdf_path, pages_list,
+                                            workers=workers, dpi=200, gray=True, array=True):
+                print(format_page(page_num, page))
+                pages.append((page_num, page))
+            
+            pages.sort(key=lambda item: item[0])
+            summary = summarize([page for _, page in pages])
+            print(f"  ✅ {len(pages)} página(s) processadas: "
+                  f"{summary['pixeis_poupados'] * 100:.1f}% dos pixéis fora do OCR")
+            self.region_report[pdf_path] = {
+                'resumo': summary,
+                'paginas': [
+                    {'pagina': page_num,
+                     **{k: v for k, v in page.items() if k not in ('texto', 'regioes')},
+                     'regioes': [{k: v for k, v in r.items() if k != 'texto'}
+                                 for r in page['regioes']]}
+                    for page_num, page in pages
+                ],
+            }
+            return [{'page': page_num, 'text': page['texto']} for page_num, page in pages]
+            
+        except Exception as e:
+            print(f"  ❌ Erro: {e}")
+            return []
+    
     def procesar_seasava_plus(self):
         """Extrai SEASAVA PLUS"""
         print("\n" + "="*80)
@@ -68,8 +166,6 @@ class ExtractorSEASAVA:
         text_data = self.extract_pages(self.pdfs['SEASAVA PLUS'], pages_list=pages_to_extract)
         
         if text_data:
-            all_text = '\n'.join([item['text'] for item in text_data])
-            
             # Salvar texto bruto
             with open('seasava-plus-ocr-raw.txt', 'w', encoding='utf-8') as f:
                 for item in text_data:
@@ -77,9 +173,10 @@ class ExtractorSEASAVA:
                     f.write(item['text'])
             
             print(f"\n✅ Texto salvo em: seasava-plus-ocr-raw.txt")
+            self.save_tables(self.pdfs['SEASAVA PLUS'], text_data)
             
             # Tentar extrair especificações
-            specs = self.extract_specs_from_text(all_text)
+            specs = self.extract_specs_from_text(text_data)
             return specs
         
         return None
@@ -96,8 +193,6 @@ class ExtractorSEASAVA:
         text_data = self.extract_pages(self.pdfs['SEASAVA X E R'], pages_list=pages_to_extract)
         
         if text_data:
-            all_text = '\n'.join([item['text'] for item in text_data])
-            
             # Salvar texto bruto
             with open('seasava-xe-r-ocr-raw.txt', 'w', encoding='utf-8') as f:
                 for item in text_data:
@@ -105,32 +200,70 @@ class ExtractorSEASAVA:
                     f.write(item['text'])
             
             print(f"\n✅ Texto salvo em: seasava-xe-r-ocr-raw.txt")
+            self.save_tables(self.pdfs['SEASAVA X E R'], text_data)
             
             # Tentar extrair especificações
-            specs = self.extract_specs_from_text(all_text)
+            specs = self.extract_specs_from_text(text_data)
             return specs
         
         return None
     
-    def extract_specs_from_text(self, text):
-        """Extrai números e especificações do texto OCR"""
+    def save_tables(self, pdf_path, text_data):
+        """Grava as tabelas do OCR em extracted_manuals/<pdf>_ocr_tables.json"""
+        if self.region_ocr:
+            # Recortes de regiões: sem caixas na página inteira, sem tabelas
+            return
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+        document = tables_document(pdf_path, page_count, {
+            item['page']: item['tables'] for item in text_data if item.get('tables')
+        })
+        tables_file = Path('extracted_manuals') / f"{Path(pdf_path).stem}_ocr_tables.json"
+        tables_file.parent.mkdir(exist_ok=True)
+        with open(tables_file, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+        print(f"✅ Tabelas ({document['tabelas_total']}) salvas em: {tables_file}")
+    
+    def extract_specs_from_text(self, text_data):
+        """Extrai números e especificações do texto OCR (regras de spec_rules.py)"""
         specs = {}
+        findings = SPEC_RULES.scan_pages(
+            {'pagina': item['page'], 'texto': item['text']} for item in text_data
+        )
         
-        # Procurar por padrões de capacidades
-        capacities = re.findall(r'(\d+)\s*p(?:erson|essoa|erspoon)', text, re.IGNORECASE)
+        # Capacidades
+        capacities = values(findings, regra='capacidade', plausible=False)
         if capacities:
-            specs['capacidades_encontradas'] = list(set(capacities))
+            specs['capacidades_encontradas'] = capacities
         
-        # Procurar pressões em PSI
-        pressoes_psi = re.findall(r'([\d.]+)\s*psi', text, re.IGNORECASE)
+        # Pressões em PSI
+        pressoes_psi = values(findings, regra='pressao', unidade='psi', plausible=False)
         if pressoes_psi:
             specs['pressoes_psi'] = pressoes_psi
         
-        # Procurar pesos de CO2
-        pesos_co2 = re.findall(r'([\d.]+)\s*kg\s*co2', text, re.IGNORECASE)
+        # Pesos de CO2
+        pesos_co2 = values(findings, regra='massa_co2', unidade='kg', plausible=False)
         if pesos_co2:
             specs['pesos_co2'] = pesos_co2
         
+        # Tabelas com capacidades/pressões/CO2, com linhas e colunas
+        tables = []
+        for item in text_data:
+            for index, table in enumerate(item.get('tables', [])):
+                rows = [' | '.join(cell or '' for cell in row) for row in table['dados']]
+                if SPEC_RULES.scan('\n'.join(rows), item['page']):
+                    tables.append({'pagina': item['page'], 'indice': index, 'dados': table['dados']})
+        if tables:
+            specs['tabelas'] = tables
+        
+        # Página de cada achado, para revisão manual do texto OCR
+        if findings:
+            specs['achados'] = [
+                {'regra': f['regra'], 'valor': f['valor'], 'unidade': f['unidade'],
+                 'pagina': f['pagina'], 'texto': f['texto']}
+                for f in findings
+            ]
+        
         return specs
     
     def run(self):
@@ -147,6 +280,10 @@ class ExtractorSEASAVA:
         with open('seasava-ocr-specs.json', 'w', encoding='utf-8') as f:
             json.dump(self.results, f, ensure_ascii=False, indent=2)
         
+        if self.region_ocr:
+            with open('seasava-ocr-regioes.json', 'w', encoding='utf-8') as f:
+                json.dump(self.region_report, f, ensure_ascii=False, indent=2)
+        
         print("\n" + "="*80)
         print("✅ EXTRAÇÃO CONCLUÍDA!")
         print("="*80)
@@ -154,9 +291,23 @@ class ExtractorSEASAVA:
         print("  📄 seasava-plus-ocr-raw.txt - Texto bruto SEASAVA PLUS")
         print("  📄 seasava-xe-r-ocr-raw.txt - Texto bruto SEASAVA X E R")
         print("  📄 seasava-ocr-specs.json - Especificações estruturadas")
+        print("  📄 extracted_manuals/*_ocr_tables.json - Tabelas reconstruídas do OCR")
+        if self.region_ocr:
+            print("  📄 seasava-ocr-regioes.json - Regiões, pixéis e tempo poupados por página")
         print("\n💡 Próximo passo: Revisar arquivos .txt e preencher SEASAVA-TEMPLATE-SPECS.json manualmente")
         print("\n" + "="*80)
 
 if __name__ == '__main__':
-    extrator = ExtractorSEASAVA()
+    parser = argparse.ArgumentParser(description="OCR dos PDFs SEASAVA")
+    parser.add_argument('--regioes', action='store_true',
+                        help="OCR só das regiões de texto/tabela detetadas")
+    parser.add_argument('--so-tabelas', action='store_true', help="só regiões com réguas")
+    parser.add_argument('--comparar', action='store_true',
+                        help="mede também o OCR da página inteira (tempo poupado)")
+    parser.add_argument('--fixo', action='store_true',
+                        help="200 dpi e inglês em todas as páginas (sem pré-processamento)")
+    args = parser.parse_args()
+    
+    extrator = ExtractorSEASAVA(regions=args.regioes, tables_only=args.so_tabelas,
+                                compare=args.comparar, adaptive=not args.fixo)
     extrator.run()
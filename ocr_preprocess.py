@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Pré-processamento adaptativo para OCR: DPI, binarização, inclinação e língua
+
+Em vez de uma resolução e uma língua fixas para todos os documentos
+(manuais em inglês, certificados e legislação em português), cada página é
+primeiro renderizada a baixa resolução (`PROBE_DPI`) e analisada em NumPy:
+
+  - altura das linhas de texto (perfil de projeção) -> o menor DPI de
+    `DPI_STEPS` que dá ~`TARGET_LINE_PX` px por linha;
+  - inclinação (variância do perfil de projeção para ângulos de
+    -MAX_SKEW a +MAX_SKEW graus) -> a página é endireitada;
+  - binarização local (Bradley, média numa janela via somas acumuladas),
+    robusta a digitalizações com iluminação irregular.
+
+A língua vem de um palpite barato (palavras funcionais e acentos) sobre a
+camada de texto do documento ou, sem ela, sobre um primeiro OCR: só se
+carrega 'por', 'eng' ou 'por+eng' quando o texto é de facto misto. Se a
+confiança vier abaixo de `LOW_CONFIDENCE`, a página é repetida no degrau de
+DPI seguinte e fica o melhor resultado.
+
+Uso: python ocr_preprocess.py "MARCAS/Seasava Plus.pdf" [--pages 1-5]
+  Mostra, por página, o DPI escolhido, a inclinação e o limiar de tinta
+  (sem OCR).
+"""
+
+import argparse
+import re
+from collections import Counter
+
+import numpy as np
+
+# Renderização de análise (barata) e degraus de resolução para o OCR
+PROBE_DPI = 100
+DPI_STEPS = (150, 200, 300, 400)
+# Sem linhas mensuráveis (páginas rodadas, só figuras) usa-se este degrau
+DEFAULT_DPI = 200
+# Altura de linha mínima (px) para o Tesseract reconhecer bem os carateres
+TARGET_LINE_PX = 24
+# Inclinação máxima procurada (graus) e passo da pesquisa grossa
+MAX_SKEW = 5.0
+SKEW_STEP = 0.5
+# Bradley: janela = 1/8 da largura; pixel é tinta se < (1 - T) x média local
+BRADLEY_T = 0.15
+# Abaixo desta confiança média (0-100) a página é repetida com mais DPI
+LOW_CONFIDENCE = 60
+# Mínimo de palavras funcionais para arriscar um palpite de língua
+MIN_LANGUAGE_WORDS = 5
+
+STOPWORDS = {
+    "por": {
+        "de", "da", "do", "das", "dos", "que", "para", "com", "não", "uma", "os", "as",
+        "no", "na", "nos", "nas", "ao", "aos", "pelo", "pela", "se", "em", "é", "são",
+        "ou", "mais", "deve", "artigo", "número", "alínea",
+    },
+    "eng": {
+        "the", "and", "of", "to", "with", "for", "is", "are", "be", "this", "that",
+        "on", "from", "by", "it", "as", "at", "or", "must", "should", "which", "not",
+        "all", "each", "when", "will",
+    },
+}
+# Carateres que só aparecem em português (entre as línguas dos documentos)
+PORTUGUESE_CHARS = set("ãõçâêôáéíóúà")
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+
+def guess_language(text, min_words=MIN_LANGUAGE_WORDS):
+    """
+    Palpite 'por', 'eng' ou 'por+eng' a partir de palavras funcionais.
+
+    Devolve None se o texto não tiver palavras suficientes para decidir.
+    """
+    words = Counter(w.lower() for w in _WORD_RE.findall(text or ""))
+    scores = {
+        lang: sum(n for w, n in words.items() if w in stopwords)
+        for lang, stopwords in STOPWORDS.items()
+    }
+    scores["por"] += sum(n for w, n in words.items() if PORTUGUESE_CHARS & set(w))
+    total = sum(scores.values())
+    if total < min_words:
+        return None
+    best = max(scores, key=scores.get)
+    return best if scores[best] >= 0.8 * total else "por+eng"
+
+
+def _segments(mask):
+    """Comprimentos das sequências de True consecutivos"""
+    padded = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return edges[1::2] - edges[::2]
+
+
+def ink_threshold(gray):
+    """
+    Limiar global de Otsu (histograma de 256 níveis): tinta é `gray < limiar`.
+
+    A classe escura de Otsu inclui o nível escolhido, daí o +1; numa página
+    só a preto e branco todos os níveis de 0 a 254 empatam, argmax dá 0 e o
+    preto (0) tem de contar como tinta.
+    """
+    hist = np.bincount(np.asarray(gray, dtype=np.uint8).ravel(), minlength=256).astype(float)
+    levels = np.arange(256)
+    weight = np.cumsum(hist)
+    mean = np.cumsum(hist * levels)
+    total, total_mean = weight[-1], mean[-1]
+    background = total - weight
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (total_mean * weight - mean * total) ** 2 / (weight * background)
+    between[~np.isfinite(between)] = 0
+    return int(np.argmax(between)) + 1
+
+
+def estimate_line_height(gray, dpi, threshold=None):
+    """
+    Altura mediana das linhas de texto em pontos tipográficos (ou None).
+
+    Usa o perfil horizontal de tinta: cada sequência de linhas de pixéis com
+    tinta é uma linha de texto; blocos altos demais (figuras) são ignorados.
+    """
+    threshold = ink_threshold(gray) if threshold is None else threshold
+    profile = (np.asarray(gray) < threshold).mean(axis=1) > 0.002
+    heights = _segments(profile)
+    # Linhas de texto entre ~4 e ~40 pt; o resto são réguas, pó ou figuras
+    points = heights * 72.0 / dpi
+    points = points[(points >= 4) & (points <= 40)]
+    if len(points) < 3:
+        return None
+    return float(np.median(points))
+
+
+def choose_dpi(line_height_pt, steps=DPI_STEPS, target_px=TARGET_LINE_PX, default=None):
+    """Menor degrau de DPI com linhas de pelo menos `target_px` pixéis"""
+    if line_height_pt is None:
+        return default if default is not None else DEFAULT_DPI
+    for dpi in steps:
+        if line_height_pt * dpi / 72.0 >= target_px:
+            return dpi
+    return steps[-1]
+
+
+def estimate_skew(gray, threshold=None, max_angle=MAX_SKEW, step=SKEW_STEP):
+    """
+    Inclinação do texto em graus (positivo = linhas a subir para a direita).
+
+    Projeta as coordenadas dos pixéis de tinta para cada ângulo candidato e
+    escolhe o que maximiza a variância do perfil (linhas mais nítidas);
+    pesquisa grossa com `step` e depois fina com step/5 à volta do melhor.
+    """
+    threshold = ink_threshold(gray) if threshold is None else threshold
+    ys, xs = np.nonzero(np.asarray(gray) < threshold)
+    if len(ys) < 100:
+        return 0.0
+    if len(ys) > 200_000:
+        keep = np.random.default_rng(0).choice(len(ys), 200_000, replace=False)
+        ys, xs = ys[keep], xs[keep]
+    xs = xs - xs.mean()
+
+    def score(angle):
+        rows = np.round(ys - xs * np.tan(np.radians(angle))).astype(np.int64)
+        counts = np.bincount(rows - rows.min())
+        return float(np.var(counts))
+
+    coarse = np.arange(-max_angle, max_angle + step / 2, step)
+    best = coarse[int(np.argmax([score(a) for a in coarse]))]
+    fine = np.arange(best - step, best + step + step / 10, step / 5)
+    best = fine[int(np.argmax([score(a) for a in fine]))]
+    # Linhas a subir (y diminui com x) alinham-se com tan(ângulo) negativo
+    return round(float(-best), 2) + 0.0
+
+
+def deskew(gray, angle):
+    """Roda a página para anular a inclinação `angle` de estimate_skew (fundo branco)"""
+    from PIL import Image
+
+    if abs(angle) < 0.1:
+        return gray
+    image = Image.fromarray(np.ascontiguousarray(gray))
+    rotated = image.rotate(-angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    return np.asarray(rotated)
+
+
+def binarize(gray, t=BRADLEY_T, window=None):
+    """
+    Binarização local de Bradley: 0 (tinta) / 255 (fundo), array uint8.
+
+    As médias das janelas vêm de somas acumuladas separáveis (colunas e
+    depois linhas), pelo que o custo não depende do tamanho da janela; a
+    comparação é feita em inteiros.
+    """
+    gray = np.asarray(gray)
+    height, width = gray.shape
+    half = max(1, (window or max(width // 8, 16)) // 2)
+    y0 = np.clip(np.arange(height) - half, 0, height)
+    y1 = np.clip(np.arange(height) + half + 1, 0, height)
+    x0 = np.clip(np.arange(width) - half, 0, width)
+    x1 = np.clip(np.arange(width) + half + 1, 0, width)
+
+    columns = np.zeros((height + 1, width), dtype=np.int32)
+    np.cumsum(gray, axis=0, dtype=np.int32, out=columns[1:])
+    rows = columns[y1]
+    rows -= columns[y0]
+    cumulative = np.zeros((height, width + 1), dtype=np.int64)
+    np.cumsum(rows, axis=1, out=cumulative[:, 1:])
+    sums = cumulative[:, x1]
+    sums -= cumulative[:, x0]
+
+    # pixel x área x 100 < soma x 100 x (1 - t)
+    scaled = (y1 - y0).astype(np.int64)[:, None] * ((x1 - x0).astype(np.int64) * 100)[None, :]
+    scaled *= gray
+    sums *= int(round(100 * (1 - t)))
+    out = np.full((height, width), 255, dtype=np.uint8)
+    out[scaled < sums] = 0
+    return out
+
+
+def analyze(probe, probe_dpi=PROBE_DPI, default_dpi=None):
+    """Parâmetros de uma página a partir da renderização de análise"""
+    threshold = ink_threshold(probe)
+    line_height = estimate_line_height(probe, probe_dpi, threshold)
+    return {
+        "limiar": threshold,
+        "altura_linha_pt": round(line_height, 1) if line_height else None,
+        "dpi": choose_dpi(line_height, default=default_dpi),
+        "angulo": estimate_skew(probe, threshold),
+    }
+
+
+class AdaptiveOCR:
+    """
+    OCR de uma página com DPI, inclinação, binarização e língua adaptados.
+
+    `backend_for(lang)` devolve o motor de OCR de uma língua (ex:
+    lambda lang: ocr_processor.get_backend("auto", lang)); `languages` são
+    os pacotes instalados.
+    """
+
+    def __init__(self, backend_for, languages=("eng",), default_lang="eng",
+                 low_confidence=LOW_CONFIDENCE, steps=DPI_STEPS, default_dpi=None):
+        self.backend_for = backend_for
+        self.languages = set(languages)
+        self.default_lang = default_lang
+        self.low_confidence = low_confidence
+        self.steps = steps
+        self.default_dpi = default_dpi
+
+    def _usable(self, lang):
+        """A língua pedida, reduzida aos pacotes instalados"""
+        if lang is None:
+            return self.default_lang
+        parts = [part for part in lang.split("+") if part in self.languages]
+        return "+".join(parts) if parts else self.default_lang
+
+    def _recognize(self, gray, angle, lang, words=False):
+        image = binarize(deskew(gray, angle))
+        return self.backend_for(lang).recognize(image, words=words)
+
+    def recognize_page(self, doc, page_num, probe=None, lang_hint=None, words=False):
+        """
+        OCR da página `page_num` (1-based) de um documento PyMuPDF aberto.
+
+        Devolve (texto, confiança, parâmetros) com os parâmetros da
+        tentativa escolhida e o número de tentativas; com `words=True`
+        acrescenta as caixas das palavras dessa tentativa (image_to_data,
+        em pixéis da página endireitada ao DPI escolhido).
+        """
+        from page_renderer import render_array
+
+        if probe is None:
+            probe = render_array(doc, page_num, PROBE_DPI)
+        params = analyze(probe, default_dpi=self.default_dpi)
+        lang = self._usable(lang_hint)
+        dpi = params["dpi"]
+        attempts, best = 0, None
+        while True:
+            gray = render_array(doc, page_num, dpi)
+            result = self._recognize(gray, params["angulo"], lang, words)
+            attempts += 1
+            # A língua do texto reconhecido contradiz o palpite: repetir com a certa
+            guessed = guess_language(result[0])
+            detected = self._usable(guessed) if guessed else lang
+            if detected != lang:
+                retry = self._recognize(gray, params["angulo"], detected, words)
+                attempts += 1
+                if retry[1] >= result[1]:
+                    result, lang = retry, detected
+            if best is None or result[1] > best[0][1]:
+                best = (result, dict(params, dpi=dpi, lingua=lang))
+            higher = [step for step in self.steps if step > dpi]
+            if result[1] >= self.low_confidence or not higher:
+                break
+            dpi = higher[0]
+        result, chosen = best
+        chosen["tentativas"] = attempts
+        return (result[0], result[1], chosen) + tuple(result[2:])
+
+
+def main():
+    import fitz  # PyMuPDF
+
+    from page_renderer import render_array
+    from page_source import parse_page_range
+
+    parser = argparse.ArgumentParser(description="Parâmetros de OCR adaptativos por página")
+    parser.add_argument("pdf")
+    parser.add_argument("--pages", help="intervalo de páginas, ex: 1-5")
+    args = parser.parse_args()
+
+    with fitz.open(args.pdf) as doc:
+        pages = parse_page_range(args.pages, doc.page_count)
+        hint = guess_language(" ".join(doc[p - 1].get_text() for p in pages))
+        print(f"\n🔎 {args.pdf}: língua do texto existente -> {hint or 'indeterminada'}\n")
+        print(f"{'Pág':>4} {'linha (pt)':>10} {'DPI':>5} {'ângulo':>7} {'limiar':>7}")
+        for page_num in pages:
+            params = analyze(render_array(doc, page_num, PROBE_DPI))
+            line = f"{params['altura_linha_pt']:.1f}" if params["altura_linha_pt"] else "-"
+            print(f"{page_num:>4} {line:>10} {params['dpi']:>5} {params['angulo']:>7.2f} "
+                  f"{params['limiar']:>7}")
+
+
+if __name__ == "__main__":
+    main()
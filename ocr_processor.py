@@ -1,3 +1,589 @@
+#!/usr/bin/env python3
+"""
+Motor de OCR para manuais escaneados (Tesseract) com pool de processos e cache
+
+Só as páginas cuja camada de texto tem menos de `text_threshold` caracteres
+(coluna "caracteres" de page_features.py) são renderizadas e passadas ao
+Tesseract; as restantes usam o texto do PDF. O OCR corre num pool de
+processos (um por núcleo, blocos de páginas contíguas por worker) e o
+resultado fica em .cache/ocr.sqlite, indexado pelo SHA-256 da imagem da
+página: uma segunda execução (ou uma página idêntica noutro manual) não
+volta a chamar o Tesseract.
+
+Cada página devolve {'pagina', 'texto', 'confianca', 'origem'} com
+origem 'texto' (camada do PDF), 'ocr' ou 'cache' e a confiança média das
+palavras (0-100) reportada pelo Tesseract.
+
+Por omissão cada página passa pelo pré-processamento adaptativo de
+ocr_preprocess.py (DPI pela altura das linhas, endireitamento,
+binarização, língua por palpite, repetição com mais DPI se a confiança
+for baixa); --fixo volta ao DPI e língua fixos.
+
+Com o tesserocr instalado cada worker mantém uma instância da API C do
+Tesseract (modelo carregado uma só vez) e passa-lhe as páginas em
+sequência; sem ele, recorre ao pytesseract (um processo por página).
+
+Uso: python ocr_processor.py "MARCAS/Seasava Plus.pdf" [--pages 1-20] [--workers 4] [--fixo]
+     python ocr_processor.py "MARCAS/Seasava Plus.pdf" --pages 1-20 --benchmark
+     python ocr_processor.py --seasava
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from ocr_preprocess import PROBE_DPI, AdaptiveOCR, guess_language
+from page_features import load_features
+from page_renderer import iter_pages, render_array
+from page_source import PageSource, parse_page_range
+from pdf_cache import _shard, file_sha256
+
+OCR_CACHE_PATH = Path(os.environ.get("OCR_CACHE_PATH", ".cache/ocr.sqlite"))
+
+# Páginas com menos caracteres de texto do que isto são tratadas como escaneadas
+TEXT_THRESHOLD = 50
+OCR_DPI = 200
+OCR_LANG = "eng"
+
+SEASAVA_PDFS = {
+    "SEASAVA PLUS": (Path("MARCAS/Seasava Plus.pdf"), "seasava-plus-ocr-raw.txt"),
+    "SEASAVA X E R": (Path("MARCAS/Seasava Plus X E R.pdf"), "seasava-xe-r-ocr-raw.txt"),
+}
+
+
+class OCRCache:
+    """Resultados de OCR por imagem e atalho (PDF, página) -> imagem"""
+
+    def __init__(self, path=OCR_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ocr_imagens (
+                sha256 TEXT NOT NULL,
+                motor TEXT NOT NULL,
+                texto TEXT NOT NULL,
+                confianca REAL,
+                parametros TEXT,
+                PRIMARY KEY (sha256, motor)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS ocr_paginas (
+                pdf_sha256 TEXT NOT NULL,
+                pagina INTEGER NOT NULL,
+                render TEXT NOT NULL,
+                imagem_sha256 TEXT NOT NULL,
+                PRIMARY KEY (pdf_sha256, pagina, render)
+            ) WITHOUT ROWID;
+        """)
+        # Caches criados antes do pré-processamento adaptativo não têm os parâmetros
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(ocr_imagens)")}
+        if "parametros" not in columns:
+            self.conn.execute("ALTER TABLE ocr_imagens ADD COLUMN parametros TEXT")
+
+    def get_pages(self, pdf_hash, pages, render, engine):
+        """{pagina: (texto, confianca, parametros)} das páginas já reconhecidas"""
+        found = {}
+        for page_num in pages:
+            row = self.conn.execute(
+                "SELECT i.texto, i.confianca, i.parametros FROM ocr_paginas p "
+                "JOIN ocr_imagens i ON i.sha256 = p.imagem_sha256 AND i.motor = ? "
+                "WHERE p.pdf_sha256 = ? AND p.pagina = ? AND p.render = ?",
+                (engine, pdf_hash, page_num, render),
+            ).fetchone()
+            if row:
+                found[page_num] = (row[0], row[1], json.loads(row[2]) if row[2] else None)
+        return found
+
+    def get_image(self, image_hash, engine):
+        row = self.conn.execute(
+            "SELECT texto, confianca, parametros FROM ocr_imagens WHERE sha256 = ? AND motor = ?",
+            (image_hash, engine),
+        ).fetchone()
+        return (row[0], row[1], json.loads(row[2]) if row[2] else None) if row else None
+
+    def put(self, pdf_hash, page_num, render, engine, image_hash, text, confidence, params=None):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ocr_imagens (sha256, motor, texto, confianca, parametros) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (image_hash, engine, text, confidence,
+                 json.dumps(params, ensure_ascii=False) if params else None),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ocr_paginas (pdf_sha256, pagina, render, imagem_sha256) "
+                "VALUES (?, ?, ?, ?)",
+                (pdf_hash, page_num, render, image_hash),
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+def tesseract_available(backend="tesseract"):
+    """O motor está instalado? ('tesseract' = binário via pytesseract)"""
+    try:
+        if backend == "tesserocr":
+            import tesserocr
+            tesserocr.tesseract_version()
+        else:
+            import pytesseract
+            pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def resolve_backend(backend="auto"):
+    """'auto' -> 'tesserocr' se disponível, senão 'tesseract' (subprocesso)"""
+    if backend != "auto":
+        return backend
+    return "tesserocr" if tesseract_available("tesserocr") else "tesseract"
+
+
+@functools.lru_cache(maxsize=None)
+def available_languages(backend="auto"):
+    """Pacotes de língua instalados para o motor (só OCR_LANG se não der para saber)"""
+    try:
+        if resolve_backend(backend) == "tesserocr":
+            import tesserocr
+            return frozenset(tesserocr.get_languages()[1])
+        import pytesseract
+        return frozenset(pytesseract.get_languages(config=""))
+    except Exception:
+        return frozenset({OCR_LANG})
+
+
+def _parse_config(config):
+    """Opções ao estilo da linha de comando ('--psm 6 -c k=v') -> (psm, {k: v})"""
+    tokens = (config or "").split()
+    psm, variables = None, {}
+    for i, token in enumerate(tokens[:-1]):
+        if token == "--psm":
+            psm = int(tokens[i + 1])
+        elif token == "-c" and "=" in tokens[i + 1]:
+            key, value = tokens[i + 1].split("=", 1)
+            variables[key] = value
+    return psm, variables
+
+
+class PytesseractBackend:
+    """Um processo `tesseract` por página (pytesseract): recarrega o modelo sempre"""
+
+    name = "tesseract"
+
+    def __init__(self, lang=OCR_LANG, config=""):
+        import pytesseract
+
+        self._pytesseract = pytesseract
+        self.lang = lang
+        self.config = config
+
+    def recognize(self, image, words=False):
+        """
+        Imagem (array NumPy ou PIL) -> (texto, confiança média); com
+        `words=True` também as caixas das palavras (saída de image_to_data)
+        """
+        data = self._pytesseract.image_to_data(
+            image, lang=self.lang, config=self.config,
+            output_type=self._pytesseract.Output.DICT,
+        )
+        text, confidence = data_to_text(data)
+        return (text, confidence, data) if words else (text, confidence)
+
+    def close(self):
+        pass
+
+
+class TesserocrBackend:
+    """Instância persistente da API C do Tesseract: o modelo é carregado uma vez"""
+
+    name = "tesserocr"
+
+    def __init__(self, lang=OCR_LANG, config=""):
+        import tesserocr
+
+        psm, variables = _parse_config(config)
+        self.api = tesserocr.PyTessBaseAPI(lang=lang)
+        if psm is not None:
+            self.api.SetPageSegMode(psm)
+        for key, value in variables.items():
+            self.api.SetVariable(key, value)
+
+    def recognize(self, image, words=False):
+        """
+        Imagem (array NumPy uint8 ou PIL) -> (texto, confiança média); com
+        `words=True` também as caixas das palavras (como image_to_data)
+        """
+        if hasattr(image, "shape"):
+            height, width = image.shape[:2]
+            channels = 1 if image.ndim == 2 else image.shape[2]
+            # O tesserocr só aceita `bytes`: uma cópia, em ordem C (também para
+            # recortes de PixmapArray). O Tesseract não copia o buffer, por isso
+            # a referência fica em self até ao próximo reconhecimento.
+            self._image_bytes = np.ascontiguousarray(image).tobytes()
+            self.api.SetImageBytes(self._image_bytes, width, height, channels, width * channels)
+        else:
+            self.api.SetImage(image)
+        text = self.api.GetUTF8Text()
+        confidences = self.api.AllWordConfidences()
+        confidence = round(sum(confidences) / len(confidences), 1) if confidences else 0.0
+        if words:
+            return text.strip(), confidence, self._word_boxes()
+        return text.strip(), confidence
+
+    def _word_boxes(self):
+        """Palavras do último reconhecimento, nas colunas de image_to_data"""
+        from tesserocr import RIL, iterate_level
+
+        data = {key: [] for key in ("text", "left", "top", "width", "height", "conf")}
+        for word in iterate_level(self.api.GetIterator(), RIL.WORD):
+            box = word.BoundingBox(RIL.WORD)
+            if box is None:
+                continue
+            left, top, right, bottom = box
+            data["text"].append(word.GetUTF8Text(RIL.WORD) or "")
+            data["left"].append(left)
+            data["top"].append(top)
+            data["width"].append(right - left)
+            data["height"].append(bottom - top)
+            data["conf"].append(word.Confidence(RIL.WORD))
+        return data
+
+    def close(self):
+        self.api.End()
+
+
+BACKENDS = {"tesseract": PytesseractBackend, "tesserocr": TesserocrBackend}
+
+# Uma instância por thread (e, portanto, por processo do pool), reutilizada entre páginas
+_local = threading.local()
+
+
+def get_backend(backend="auto", lang=OCR_LANG, config=""):
+    """Motor de OCR desta thread, criado na primeira chamada e depois reutilizado"""
+    key = (resolve_backend(backend), lang, config)
+    instances = _local.__dict__.setdefault("backends", {})
+    if key not in instances:
+        instances[key] = BACKENDS[key[0]](lang, config)
+    return instances[key]
+
+
+def data_to_text(data):
+    """Saída de image_to_data (DICT) -> (texto por linhas, confiança média)"""
+    lines, confidences = {}, []
+    for i, word in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        if conf < 0 or not word.strip():
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        confidences.append(conf)
+
+    text, previous_block = [], None
+    for (block, _, _), words in lines.items():
+        if previous_block is not None and block != previous_block:
+            text.append("")
+        text.append(" ".join(words))
+        previous_block = block
+    confidence = round(sum(confidences) / len(confidences), 1) if confidences else 0.0
+    return "\n".join(text), confidence
+
+
+def image_sha256(array):
+    """SHA-256 dos pixels de uma página (array NumPy, com as dimensões)"""
+    digest = hashlib.sha256(f"{array.shape[1]}x{array.shape[0]}:".encode())
+    # Recortes (vistas com strides) são copiados para ordem C; arrays contíguos não
+    digest.update(np.ascontiguousarray(array).data)
+    return digest.hexdigest()
+
+
+def _ocr_range(pdf_path, pages, dpi, lang, config, backend, engine, cache_path,
+               adaptive=False, lang_hint=None):
+    """Worker: renderiza um bloco de páginas e faz OCR das imagens ainda sem cache"""
+    cache = OCRCache(cache_path)
+    results = {}
+    try:
+        if adaptive:
+            _ocr_adaptive(pdf_path, pages, dpi, lang, config, backend, engine, cache,
+                          lang_hint, results)
+            return results
+        ocr = get_backend(backend, lang, config)
+        # Arrays sobre os samples do Pixmap: o Tesseract recebe os pixels sem PNG intermédio
+        for page_num, image in iter_pages(pdf_path, pages, dpi, gray=True, array=True):
+            image_hash = image_sha256(image)
+            cached = cache.get_image(image_hash, engine)
+            if cached:
+                results[page_num] = (image_hash, *cached, True)
+                continue
+            text, confidence = ocr.recognize(image)
+            results[page_num] = (image_hash, text, confidence, None, False)
+    finally:
+        cache.close()
+    return results
+
+
+def _ocr_adaptive(pdf_path, pages, dpi, lang, config, backend, engine, cache, lang_hint,
+                  results):
+    """Páginas pelo pré-processamento adaptativo; a chave do cache é a imagem de análise"""
+    import fitz  # PyMuPDF
+
+    adaptive = AdaptiveOCR(
+        lambda page_lang: get_backend(backend, page_lang, config),
+        languages=available_languages(backend), default_lang=lang, default_dpi=dpi,
+    )
+    doc = fitz.open(str(pdf_path))
+    try:
+        for page_num in pages:
+            probe = render_array(doc, page_num, PROBE_DPI)
+            image_hash = image_sha256(probe)
+            cached = cache.get_image(image_hash, engine)
+            if cached:
+                results[page_num] = (image_hash, *cached, True)
+                continue
+            text, confidence, params = adaptive.recognize_page(doc, page_num, probe, lang_hint)
+            results[page_num] = (image_hash, text, confidence, params, False)
+    finally:
+        doc.close()
+
+
 class ProcessadorOCR:
+    """OCR das páginas sem texto de um PDF, em paralelo e com cache"""
+
+    def __init__(self, workers=None, dpi=OCR_DPI, lang=OCR_LANG, config="",
+                 text_threshold=TEXT_THRESHOLD, cache_path=OCR_CACHE_PATH, backend="auto",
+                 adaptive=True):
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = resolve_backend(backend)
+        # Adaptativo: dpi e lang passam a ser só os valores de recurso
+        self.adaptive = adaptive
+        self.dpi = dpi
+        self.lang = lang
+        self.config = config
+        self.text_threshold = text_threshold
+        self.cache_path = Path(cache_path)
+
+    @property
+    def engine(self):
+        if self.adaptive:
+            return f"{self.backend}:adaptativo:{self.lang}:{self.config}"
+        return f"{self.backend}:{self.lang}:{self.config}"
+
+    @property
+    def render(self):
+        return f"sonda:{PROBE_DPI}" if self.adaptive else f"gray:{self.dpi}"
+
+    def pages_needing_ocr(self, pdf_path, pages=None):
+        """Páginas (1-based) cuja camada de texto está abaixo do limiar"""
+        features = load_features(pdf_path)
+        mask = features.caracteres < self.text_threshold
+        low_text = features.pages(mask)
+        if pages is None:
+            return low_text
+        wanted = set(pages)
+        return [p for p in low_text if p in wanted]
+
+    def process_pdf(self, pdf_path, pages=None, verbose=True):
+        """
+        Texto de cada página pedida: camada do PDF ou OCR (em cache).
+
+        Devolve registos {'pagina', 'texto', 'confianca', 'origem',
+        'parametros'} por ordem; 'parametros' (DPI, ângulo, língua, tentativas)
+        só existe nas páginas de OCR adaptativo.
+        """
+        pdf_path = Path(pdf_path)
+        with PageSource(pdf_path) as source:
+            pages = list(pages) if pages is not None else list(range(1, len(source) + 1))
+            ocr_pages = set(self.pages_needing_ocr(pdf_path, pages))
+            text_pages = [p for p in pages if p not in ocr_pages]
+            records = {
+                r["pagina"]: {"pagina": r["pagina"], "texto": r["texto"],
+                              "confianca": None, "origem": "texto", "parametros": None}
+                for r in source.pages(text_pages)
+            } if text_pages else {}
+            lang_hint = self.language_hint(pdf_path, source) if ocr_pages and self.adaptive \
+                else None
+
+        if ocr_pages:
+            records.update(self._ocr(pdf_path, sorted(ocr_pages), verbose, lang_hint))
+        return [records[p] for p in pages]
+
+    def language_hint(self, pdf_path, source, max_pages=30):
+        """Palpite de língua a partir da camada de texto do documento (ou None)"""
+        features = load_features(pdf_path)
+        text_pages = features.pages(features.caracteres >= self.text_threshold)[:max_pages]
+        return guess_language(" ".join(source.text(p) for p in text_pages))
+
+    def _ocr(self, pdf_path, pages, verbose, lang_hint=None):
+        pdf_hash = file_sha256(pdf_path)
+        cache = OCRCache(self.cache_path)
+        records = {}
+        try:
+            for page_num, (text, confidence, params) in cache.get_pages(
+                    pdf_hash, pages, self.render, self.engine).items():
+                records[page_num] = {"pagina": page_num, "texto": text, "confianca": confidence,
+                                     "origem": "cache", "parametros": params}
+
+            todo = [p for p in pages if p not in records]
+            if verbose:
+                mode = f"adaptativo, língua {lang_hint or 'a detetar'}" if self.adaptive \
+                    else f"{self.dpi} dpi, {self.lang}"
+                print(f"  🔤 OCR ({self.backend}, {mode}): {len(pages)} página(s) sem texto, "
+                      f"{len(pages) - len(todo)} em cache, {len(todo)} a processar "
+                      f"({min(self.workers, max(len(todo), 1))} worker(s))")
+            if not todo:
+                return records
+
+            if not tesseract_available(self.backend):
+                raise RuntimeError("Tesseract não encontrado (instale e/ou configure tesseract_cmd)")
+
+            options = (self.dpi, self.lang, self.config, self.backend, self.engine,
+                       self.cache_path, self.adaptive, lang_hint)
+            start = time.perf_counter()
+            if self.workers > 1 and len(todo) > 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    futures = [
+                        pool.submit(_ocr_range, pdf_path, chunk, *options)
+                        for chunk in _shard(todo, self.workers)
+                    ]
+                    results = {}
+                    for future in futures:
+                        results.update(future.result())
+            else:
+                results = _ocr_range(pdf_path, todo, *options)
+
+            for page_num, (image_hash, text, confidence, params, was_cached) in \
+                    sorted(results.items()):
+                cache.put(pdf_hash, page_num, self.render, self.engine, image_hash, text,
+                          confidence, params)
+                records[page_num] = {"pagina": page_num, "texto": text, "confianca": confidence,
+                                     "origem": "cache" if was_cached else "ocr",
+                                     "parametros": params}
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(f"  ✅ {len(todo)} página(s) em {elapsed:.1f}s "
+                      f"({len(todo) / elapsed if elapsed else 0:.2f} pág/s)")
+        finally:
+            cache.close()
+        return records
+
     def processar_seasava(self):
-        print("[STUB] Método processar_seasava chamado. Implemente a lógica de OCR aqui.")
+        """OCR dos dois manuais Seasava: texto bruto por página e resumo JSON"""
+        resultados = {}
+        for modelo, (pdf_path, raw_txt) in SEASAVA_PDFS.items():
+            print(f"\n📄 {modelo}: {pdf_path}")
+            if not pdf_path.exists():
+                print(f"  ❌ Arquivo não encontrado: {pdf_path}")
+                continue
+
+            paginas = self.process_pdf(pdf_path)
+            with open(raw_txt, "w", encoding="utf-8") as f:
+                for pagina in paginas:
+                    f.write(f"\n--- PÁGINA {pagina['pagina']} ---\n")
+                    f.write(pagina["texto"])
+            print(f"  📝 Texto salvo em: {raw_txt}")
+
+            confiancas = [p["confianca"] for p in paginas if p["confianca"] is not None]
+            resultados[modelo] = {
+                "arquivo": str(pdf_path),
+                "paginas": len(paginas),
+                "paginas_ocr": len(confiancas),
+                "confianca_media": round(sum(confiancas) / len(confiancas), 1) if confiancas else None,
+                "paginas_baixa_confianca": [
+                    p["pagina"] for p in paginas
+                    if p["confianca"] is not None and p["confianca"] < 60
+                ],
+            }
+            parametros = [p["parametros"] for p in paginas if p["parametros"]]
+            if parametros:
+                resultados[modelo]["dpi"] = dict(Counter(str(x["dpi"]) for x in parametros))
+                resultados[modelo]["linguas"] = dict(Counter(x["lingua"] for x in parametros))
+                resultados[modelo]["paginas_repetidas"] = sum(
+                    1 for x in parametros if x["tentativas"] > 1
+                )
+
+        with open("seasava-ocr-paginas.json", "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print("\n✅ Resumo salvo em: seasava-ocr-paginas.json")
+        return resultados
+
+
+def benchmark(pdf_path, pages, backends=("tesseract", "tesserocr"), dpi=OCR_DPI,
+              lang=OCR_LANG, config=""):
+    """
+    Páginas por segundo de cada motor disponível, num só worker e sem cache.
+
+    As páginas são renderizadas antes de medir, para que só o OCR conte; o
+    tempo inclui a criação do motor (no subprocesso isso acontece a cada
+    página).
+    """
+    images = [image for _, image in iter_pages(pdf_path, pages, dpi, gray=True, array=True)]
+    results = {}
+    for name in backends:
+        if not tesseract_available(name):
+            results[name] = None
+            continue
+        start = time.perf_counter()
+        ocr = BACKENDS[name](lang, config)
+        try:
+            for image in images:
+                ocr.recognize(image)
+        finally:
+            ocr.close()
+        elapsed = time.perf_counter() - start
+        results[name] = len(images) / elapsed if elapsed else 0.0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR das páginas escaneadas de um PDF")
+    parser.add_argument("pdf", nargs="?")
+    parser.add_argument("--pages", help="intervalo de páginas, ex: 1-20")
+    parser.add_argument("--workers", type=int, default=None, help="processos (omissão: núcleos)")
+    parser.add_argument("--dpi", type=int, default=OCR_DPI)
+    parser.add_argument("--lang", default=OCR_LANG)
+    parser.add_argument("--backend", choices=["auto", *BACKENDS], default="auto",
+                        help="tesserocr (instância persistente) ou tesseract (subprocesso)")
+    parser.add_argument("--fixo", action="store_true",
+                        help="DPI e língua fixos (sem pré-processamento adaptativo)")
+    parser.add_argument("--seasava", action="store_true", help="processa os dois manuais Seasava")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compara páginas/s dos motores nas páginas pedidas")
+    args = parser.parse_args()
+
+    if args.benchmark and args.pdf:
+        with PageSource(args.pdf) as source:
+            pages = parse_page_range(args.pages, len(source))
+        print(f"\n⏱️  {len(pages)} página(s) de {Path(args.pdf).name} a {args.dpi} dpi\n")
+        for name, rate in benchmark(args.pdf, pages, dpi=args.dpi, lang=args.lang).items():
+            print(f"  {name:<10} " + (f"{rate:6.2f} pág/s" if rate is not None else "indisponível"))
+        return
+
+    processor = ProcessadorOCR(workers=args.workers, dpi=args.dpi, lang=args.lang,
+                               backend=args.backend, adaptive=not args.fixo)
+    if args.seasava or not args.pdf:
+        processor.processar_seasava()
+        return
+
+    with PageSource(args.pdf) as source:
+        pages = parse_page_range(args.pages, len(source))
+    for r in processor.process_pdf(args.pdf, pages):
+        conf = f"{r['confianca']:5.1f}" if r["confianca"] is not None else "    -"
+        params = r["parametros"]
+        extra = f"  {params['dpi']} dpi {params['lingua']} {params['angulo']:+.1f}°" if params else ""
+        print(f"  pág. {r['pagina']:>3}  {r['origem']:<6} conf {conf}  {len(r['texto']):>6} chars"
+              f"{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+OCR restrito a regiões: só os blocos de texto/tabela de cada página
+
+Uma página escaneada é sobretudo margem branca, fotografias e desenhos;
+as tabelas de especificações (capacidades, cilindros de CO2, weak links)
+ocupam poucas regiões. A página é segmentada em NumPy, sem OCR:
+
+  1. binarização e grelha grosseira de ocupação (células de `cell` px);
+  2. corte XY recursivo nos vales dos perfis de projeção (linhas/colunas
+     sem tinta) -> blocos em ordem de leitura;
+  3. réguas horizontais/verticais em cada bloco (linhas com tinta em
+     quase toda a largura/altura) -> 'tabela'; blocos densos sem réguas
+     são 'imagem' e não vão ao OCR.
+
+Só os recortes passam ao motor de OCR (ocr_processor.get_backend). Recortes
+quase idênticos entre páginas (cabeçalhos, rodapés, tabelas repetidas) são
+reconhecidos pela assinatura perceptual (dHash, confirmada numa miniatura
+binarizada) e reaproveitados.
+
+Uso: python ocr_regions.py "MARCAS/Seasava Plus.pdf" [--pages 1-20] [--tables-only]
+     python ocr_regions.py "MARCAS/Seasava Plus.pdf" --pages 1-5 --compare
+  Mostra as regiões de cada página, a fração de pixéis enviada ao OCR e,
+  com --compare, o tempo poupado face ao OCR da página inteira.
+"""
+
+import argparse
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ocr_processor import OCR_DPI, OCR_LANG, get_backend
+
+# Pixéis mais escuros do que isto contam como tinta
+INK_THRESHOLD = 160
+# Lado (px) das células da grelha de ocupação e vale mínimo (em células) para cortar
+CELL = 8
+MIN_GAP = 3
+# Blocos com mais tinta do que isto e sem réguas são fotografias/desenhos
+MAX_TEXT_DENSITY = 0.35
+# Traços mais longos do que esta fração da página (molduras, margens de
+# digitalização) são ignorados na segmentação, para não colarem os blocos
+FRAME_FRACTION = 0.3
+# Fração da largura/altura do bloco coberta por um traço contínuo para uma
+# linha contar como régua, e espessura máxima (px) da régua
+RULING_FILL = 0.6
+RULING_MAX_THICKNESS = 6
+# Distância de Hamming máxima (em 256 bits) entre recortes candidatos a iguais,
+# e fração máxima de pixéis de tinta diferentes (miniatura a 1/2) para confirmar
+MAX_HASH_DISTANCE = 10
+MAX_PIXEL_DIFFERENCE = 0.02
+THUMBNAIL_SCALE = 2
+
+
+def _segments(profile, min_gap):
+    """Intervalos [início, fim) de valores não nulos separados por >= min_gap zeros"""
+    filled = np.flatnonzero(profile)
+    if filled.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(filled) > min_gap)
+    starts = np.concatenate(([filled[0]], filled[breaks + 1]))
+    ends = np.concatenate((filled[breaks], [filled[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _xy_cut(grid, top, bottom, left, right, min_gap, out):
+    """Corte XY recursivo da grelha; acrescenta (topo, fundo, esq, dir) a `out`"""
+    sub = grid[top:bottom, left:right]
+    rows = _segments(sub.any(axis=1), min_gap)
+    if len(rows) > 1:
+        for r0, r1 in rows:
+            _xy_cut(grid, top + r0, top + r1, left, right, min_gap, out)
+        return
+    cols = _segments(sub.any(axis=0), min_gap)
+    if len(cols) > 1:
+        for c0, c1 in cols:
+            _xy_cut(grid, top, bottom, left + c0, left + c1, min_gap, out)
+        return
+    if rows and cols:
+        out.append((top + rows[0][0], top + rows[0][1], left + cols[0][0], left + cols[0][1]))
+
+
+def _run_starts(ink, length):
+    """(linhas candidatas, inícios de traços com >= `length` px nessas linhas)"""
+    # Só linhas com tinta suficiente podem conter um traço desse comprimento
+    candidates = np.flatnonzero(np.count_nonzero(ink, axis=1) >= length)
+    rows = ink[candidates]
+    cumulative = np.zeros((len(candidates), ink.shape[1] + 1), dtype=np.int32)
+    np.cumsum(rows, axis=1, out=cumulative[:, 1:])
+    return candidates, (cumulative[:, length:] - cumulative[:, :-length]) == length
+
+
+def _long_runs(ink, length):
+    """Máscara dos pixéis que pertencem a traços horizontais com >= `length` px"""
+    mask = np.zeros_like(ink)
+    if length < 1 or length > ink.shape[1]:
+        return mask
+    candidates, starts = _run_starts(ink, length)
+    if not len(candidates):
+        return mask
+    # Estender cada início de traço pelos `length` pixéis seguintes
+    covered = np.zeros((len(candidates), ink.shape[1] + 1), dtype=np.int32)
+    covered[:, :starts.shape[1]] += starts
+    covered[:, length:length + starts.shape[1]] -= starts
+    mask[candidates] = np.cumsum(covered, axis=1)[:, :-1] > 0
+    return mask
+
+
+def _has_run(ink, length):
+    """Por linha: existe um traço contínuo de tinta com pelo menos `length` px?"""
+    found = np.zeros(ink.shape[0], dtype=bool)
+    if length < 1 or length > ink.shape[1]:
+        return found
+    candidates, starts = _run_starts(ink, length)
+    found[candidates] = starts.any(axis=1)
+    return found
+
+
+def count_rulings(ink, fill=RULING_FILL, max_thickness=RULING_MAX_THICKNESS):
+    """(réguas horizontais, réguas verticais) num bloco binarizado"""
+    def thin(rows):
+        return sum(1 for start, end in _segments(rows, 1) if end - start <= max_thickness)
+
+    return (thin(_has_run(ink, int(fill * ink.shape[1]))),
+            thin(_has_run(ink.T, int(fill * ink.shape[0]))))
+
+
+def find_regions(gray, ink_threshold=INK_THRESHOLD, cell=CELL, min_gap=MIN_GAP,
+                 max_density=MAX_TEXT_DENSITY, frame_fraction=FRAME_FRACTION):
+    """
+    Regiões candidatas de uma página em tons de cinzento (array uint8).
+
+    Devolve dicionários {'bbox': (x0, y0, x1, y1), 'tipo', 'densidade',
+    'reguas'} em ordem de leitura, com tipo 'tabela', 'texto' ou 'imagem'.
+    """
+    ink = np.asarray(gray) < ink_threshold
+    height, width = ink.shape
+    rows, cols = height // cell, width // cell
+    if not rows or not cols:
+        return []
+    frames = (_long_runs(ink, int(frame_fraction * width))
+              | _long_runs(ink.T, int(frame_fraction * height)).T)
+    content = ink & ~frames
+    grid = content[:rows * cell, :cols * cell].reshape(rows, cell, cols, cell).any(axis=(1, 3))
+
+    blocks = []
+    _xy_cut(grid, 0, rows, 0, cols, min_gap, blocks)
+
+    regions = []
+    for top, bottom, left, right in blocks:
+        # Blocos de uma só célula são pó/ruído do scanner
+        if bottom - top < 2 or right - left < 2:
+            continue
+        y0, y1 = max(0, (top - 1) * cell), min(height, (bottom + 1) * cell)
+        x0, x1 = max(0, (left - 1) * cell), min(width, (right + 1) * cell)
+        block = ink[y0:y1, x0:x1]
+        density = float(block.mean())
+        h_rules, v_rules = count_rulings(block)
+        if h_rules >= 2 or v_rules >= 2:
+            kind = "tabela"
+        elif density > max_density:
+            kind = "imagem"
+        else:
+            kind = "texto"
+        regions.append({"bbox": (x0, y0, x1, y1), "tipo": kind,
+                        "densidade": round(density, 3), "reguas": (h_rules, v_rules)})
+    return regions
+
+
+def trim(crop, ink_threshold=INK_THRESHOLD):
+    """Recorte reduzido à caixa da tinta (a grelha desloca as caixas até `cell` px)"""
+    ink = crop < ink_threshold
+    rows, cols = np.flatnonzero(ink.any(axis=1)), np.flatnonzero(ink.any(axis=0))
+    if not rows.size:
+        return crop
+    return np.ascontiguousarray(crop[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1])
+
+
+def crop_signature(crop):
+    """dHash de 256 bits de um recorte (filtro rápido de recortes quase idênticos)"""
+    from PIL import Image
+
+    small = np.asarray(
+        Image.fromarray(np.ascontiguousarray(crop)).convert("L").resize((17, 16), Image.BILINEAR),
+        dtype=np.int16,
+    )
+    return np.packbits(small[:, 1:] > small[:, :-1])
+
+
+def _thumbnail(crop, size, ink_threshold=INK_THRESHOLD):
+    """Miniatura binarizada (largura, altura) para confirmar a igualdade pixel a pixel"""
+    from PIL import Image
+
+    return np.asarray(Image.fromarray(crop).resize(size, Image.BILINEAR)) < ink_threshold
+
+
+def same_content(thumb_a, thumb_b, max_difference=MAX_PIXEL_DIFFERENCE):
+    """Miniaturas com menos de `max_difference` dos pixéis de tinta diferentes"""
+    ink = np.count_nonzero(thumb_a | thumb_b)
+    return ink == 0 or np.count_nonzero(thumb_a ^ thumb_b) <= max_difference * ink
+
+
+class RegionOCR:
+    """
+    OCR por regiões de uma página (callable para page_renderer.map_pages).
+
+    Partilhado entre threads: o índice de recortes já reconhecidos é comum
+    a todas as páginas processadas por esta instância.
+    """
+
+    def __init__(self, backend="auto", lang=OCR_LANG, config="", tables_only=False,
+                 max_distance=MAX_HASH_DISTANCE, compare=False):
+        self.backend = backend
+        self.lang = lang
+        self.config = config
+        self.kinds = ("tabela",) if tables_only else ("tabela", "texto")
+        self.max_distance = max_distance
+        self.compare = compare
+        self._seen = []
+        self._lock = threading.Lock()
+
+    def _lookup(self, crop, signature):
+        """Resultado de um recorte já reconhecido quase idêntico a `crop` (aparado), ou None"""
+        shape = crop.shape
+        with self._lock:
+            candidates = [
+                (seen_thumb, result) for seen_signature, seen_shape, seen_thumb, result in self._seen
+                if abs(seen_shape[0] - shape[0]) <= 0.05 * shape[0]
+                and abs(seen_shape[1] - shape[1]) <= 0.05 * shape[1]
+                and int(np.unpackbits(seen_signature ^ signature).sum()) <= self.max_distance
+            ]
+        # O dHash só filtra; a igualdade é confirmada nas miniaturas (dígitos diferentes
+        # numa coluna de tabela dão o mesmo dHash mas não os mesmos pixéis)
+        for seen_thumb, result in candidates:
+            size = (seen_thumb.shape[1], seen_thumb.shape[0])
+            if same_content(seen_thumb, _thumbnail(crop, size)):
+                return result
+        return None
+
+    def _remember(self, crop, signature, result):
+        size = (max(1, crop.shape[1] // THUMBNAIL_SCALE), max(1, crop.shape[0] // THUMBNAIL_SCALE))
+        with self._lock:
+            self._seen.append((signature, crop.shape, _thumbnail(crop, size), result))
+
+    def __call__(self, gray):
+        ocr = get_backend(self.backend, self.lang, self.config)
+        start = time.perf_counter()
+        regions = find_regions(gray)
+        texts, confidences, ocr_pixels, reused = [], [], 0, 0
+        for region in regions:
+            if region["tipo"] not in self.kinds:
+                region["origem"] = "ignorada"
+                continue
+            x0, y0, x1, y1 = region["bbox"]
+            crop = np.ascontiguousarray(gray[y0:y1, x0:x1])
+            content = trim(crop)
+            signature = crop_signature(content)
+            result = self._lookup(content, signature)
+            if result is None:
+                result = ocr.recognize(crop)
+                self._remember(content, signature, result)
+                ocr_pixels += crop.size
+                region["origem"] = "ocr"
+            else:
+                reused += 1
+                region["origem"] = "reaproveitada"
+            text, confidence = result
+            region["texto"] = text
+            if text.strip():
+                texts.append(text.strip())
+                confidences.append(confidence)
+
+        page = {
+            "texto": "\n\n".join(texts),
+            "confianca": round(sum(confidences) / len(confidences), 1) if confidences else 0.0,
+            "regioes": regions,
+            "pixeis_pagina": int(gray.shape[0] * gray.shape[1]),
+            "pixeis_ocr": int(ocr_pixels),
+            "reaproveitadas": reused,
+            "tempo": round(time.perf_counter() - start, 3),
+        }
+        page["fracao_pixeis"] = round(page["pixeis_ocr"] / page["pixeis_pagina"], 3)
+        if self.compare:
+            start = time.perf_counter()
+            ocr.recognize(gray)
+            page["tempo_pagina_inteira"] = round(time.perf_counter() - start, 3)
+            page["tempo_poupado"] = round(page["tempo_pagina_inteira"] - page["tempo"], 3)
+        return page
+
+
+def summarize(pages):
+    """Totais de pixéis e tempo de uma lista de resultados de RegionOCR"""
+    total = sum(p["pixeis_pagina"] for p in pages)
+    ocr = sum(p["pixeis_ocr"] for p in pages)
+    summary = {
+        "paginas": len(pages),
+        "pixeis_pagina": total,
+        "pixeis_ocr": ocr,
+        "pixeis_poupados": round(1 - ocr / total, 3) if total else 0.0,
+        "regioes_reaproveitadas": sum(p["reaproveitadas"] for p in pages),
+        "tempo": round(sum(p["tempo"] for p in pages), 2),
+    }
+    if pages and all("tempo_poupado" in p for p in pages):
+        summary["tempo_pagina_inteira"] = round(sum(p["tempo_pagina_inteira"] for p in pages), 2)
+        summary["tempo_poupado"] = round(sum(p["tempo_poupado"] for p in pages), 2)
+    return summary
+
+
+def format_page(page_num, page):
+    """Linha de relatório de uma página"""
+    kinds = [r["tipo"] for r in page["regioes"]]
+    line = (f"  pág. {page_num:>3}  {len(kinds):>2} regiões "
+            f"({kinds.count('tabela')} tabela, {kinds.count('texto')} texto, "
+            f"{kinds.count('imagem')} imagem; {page['reaproveitadas']} reaproveitada)  "
+            f"{page['fracao_pixeis'] * 100:5.1f}% dos pixéis  {page['tempo']:.2f}s")
+    if "tempo_poupado" in page:
+        line += f"  (página inteira {page['tempo_pagina_inteira']:.2f}s, poupados {page['tempo_poupado']:.2f}s)"
+    return line
+
+
+def main():
+    from page_renderer import map_pages
+    from page_source import PageSource, parse_page_range
+
+    parser = argparse.ArgumentParser(description="OCR restrito às regiões de texto/tabela")
+    parser.add_argument("pdf")
+    parser.add_argument("--pages", help="intervalo de páginas, ex: 1-20")
+    parser.add_argument("--dpi", type=int, default=OCR_DPI)
+    parser.add_argument("--lang", default=OCR_LANG)
+    parser.add_argument("--tables-only", action="store_true", help="só regiões com réguas")
+    parser.add_argument("--compare", action="store_true",
+                        help="faz também OCR da página inteira para medir o tempo poupado")
+    parser.add_argument("--detect-only", action="store_true",
+                        help="só deteta as regiões (sem OCR)")
+    args = parser.parse_args()
+
+    with PageSource(args.pdf) as source:
+        pages = parse_page_range(args.pages, len(source))
+
+    print(f"\n🔍 {Path(args.pdf).name}: {len(pages)} página(s)\n")
+    if args.detect_only:
+        for page_num, regions in sorted(map_pages(find_regions, args.pdf, pages, dpi=args.dpi,
+                                                  gray=True, array=True)):
+            print(f"  pág. {page_num:>3}")
+            for region in regions:
+                print(f"     {region['tipo']:<7} {region['bbox']}  densidade {region['densidade']:.2f}"
+                      f"  réguas {region['reguas']}")
+        return
+
+    region_ocr = RegionOCR(lang=args.lang, tables_only=args.tables_only, compare=args.compare)
+    results = []
+    for page_num, page in sorted(map_pages(region_ocr, args.pdf, pages, dpi=args.dpi,
+                                           gray=True, array=True)):
+        print(format_page(page_num, page))
+        results.append(page)
+
+    summary = summarize(results)
+    print(f"\n📊 {summary['pixeis_poupados'] * 100:.1f}% dos pixéis fora do OCR, "
+          f"{summary['regioes_reaproveitadas']} região(ões) reaproveitada(s), {summary['tempo']:.1f}s")
+    if "tempo_poupado" in summary:
+        print(f"   Página inteira: {summary['tempo_pagina_inteira']:.1f}s "
+              f"-> poupados {summary['tempo_poupado']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Reconstrução de tabelas a partir das caixas das palavras do OCR
+
+O texto corrido do OCR perde a estrutura das tabelas de especificações
+(capacidade por coluna, modelo por linha). As caixas das palavras
+(pytesseract.image_to_data ou o iterador do tesserocr, ver
+ocr_processor.get_backend(...).recognize(imagem, words=True)) permitem
+reconstruí-la, em NumPy:
+
+  1. linhas: os centros verticais das palavras, ordenados, separam-se onde
+     o salto excede `ROW_TOLERANCE` x a altura mediana das palavras;
+  2. células: palavras da mesma linha separadas por mais de `CELL_GAP` x a
+     altura mediana (bem mais do que um espaço) ficam em células distintas;
+  3. tabelas: sequências de linhas seguidas com pelo menos `MIN_COLUMNS`
+     células (uma linha isolada de uma só célula entre duas dessas também
+     conta, ex: descrição partida em duas linhas); células longas
+     (`MAX_CELL_WORDS`) indicam texto corrido paginado em colunas;
+  4. colunas: projeção horizontal das células das linhas com o número de
+     células mais frequente; cada intervalo ocupado é uma coluna e cada
+     célula vai para a coluna com que mais se sobrepõe.
+
+As grelhas usam a mesma forma JSON de extracted_manuals/*_tables.json
+(extract_all_manuals.py): {"página", "índice", "dados": [[célula, ...]]},
+com "" nas células vazias e None nas colunas ocupadas por uma célula que
+se estende da coluna anterior.
+
+Uso: python ocr_tables.py "MARCAS/Seasava Plus.pdf" [--pages 1-20] [--output tabelas.json]
+     python ocr_tables.py "MARCAS/LR97.pdf" --pages 30-40 --text-layer
+  --text-layer usa as palavras da camada de texto (PDFs digitais) em vez
+  do OCR, para comparar com as tabelas do pdfplumber.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from ocr_processor import OCR_DPI, OCR_LANG, get_backend
+
+# Palavras com confiança abaixo disto (-1 = bloco/linha, não palavra) são ignoradas
+MIN_CONFIDENCE = 0
+# Frações da altura mediana das palavras: mesma linha, nova célula, fim de tabela
+ROW_TOLERANCE = 0.5
+CELL_GAP = 1.2
+ROW_GAP = 2.5
+# Dimensão mínima de uma tabela
+MIN_ROWS = 2
+MIN_COLUMNS = 2
+# Células com mais palavras do que isto (mediana) são texto corrido em colunas
+MAX_CELL_WORDS = 6
+
+
+def word_boxes(data, min_confidence=MIN_CONFIDENCE):
+    """Saída de image_to_data (DICT) -> (textos, caixas (n, 4) x0 y0 x1 y1)"""
+    text = np.array([str(word).strip() for word in data["text"]], dtype=object)
+    confidence = np.asarray(data["conf"], dtype=float)
+    keep = (confidence >= min_confidence) & (text != "")
+    left, top, width, height = (np.asarray(data[key], dtype=float)[keep]
+                                for key in ("left", "top", "width", "height"))
+    return text[keep], np.column_stack([left, top, left + width, top + height])
+
+
+def cluster_rows(boxes, tolerance):
+    """Índice de linha (por ordem vertical) de cada palavra"""
+    centers = (boxes[:, 1] + boxes[:, 3]) / 2
+    order = np.argsort(centers, kind="stable")
+    rows = np.empty(len(boxes), dtype=int)
+    rows[order] = np.concatenate([[0], np.cumsum(np.diff(centers[order]) > tolerance)])
+    return rows
+
+
+def group_cells(text, boxes, rows, gap):
+    """
+    Junta as palavras de cada linha em células (separadas por mais de `gap` px).
+
+    Devolve (textos, caixas (m, 4), linha de cada célula), da esquerda para
+    a direita dentro de cada linha.
+    """
+    order = np.lexsort((boxes[:, 0], rows))
+    rows, boxes, text = rows[order], boxes[order], text[order]
+    new = np.ones(len(rows), dtype=bool)
+    new[1:] = (rows[1:] != rows[:-1]) | (boxes[1:, 0] - boxes[:-1, 2] > gap)
+    starts = np.flatnonzero(new)
+    cells = np.column_stack([
+        np.minimum.reduceat(boxes[:, 0], starts), np.minimum.reduceat(boxes[:, 1], starts),
+        np.maximum.reduceat(boxes[:, 2], starts), np.maximum.reduceat(boxes[:, 3], starts),
+    ])
+    texts = [" ".join(words) for words in np.split(text, starts[1:])]
+    return texts, cells, rows[starts]
+
+
+def table_rows(counts, tops, bottoms, max_gap, min_rows=MIN_ROWS, min_columns=MIN_COLUMNS):
+    """Grupos de linhas consecutivas que formam tabelas (listas de índices de linha)"""
+    wide = counts >= min_columns
+    close = tops[1:] - bottoms[:-1] <= max_gap
+    # Linha de uma só célula entre duas linhas de tabela próximas
+    bridge = np.zeros_like(wide)
+    bridge[1:-1] = (counts[1:-1] == 1) & wide[:-2] & wide[2:] & close[:-1] & close[1:]
+    member = wide | bridge
+    linked = member[:-1] & member[1:] & close
+    groups = np.split(np.arange(len(counts)), np.flatnonzero(~linked) + 1)
+    return [group for group in groups
+            if member[group].all() and wide[group].sum() >= min_rows]
+
+
+def column_bounds(cells, counts, min_columns=MIN_COLUMNS):
+    """Intervalos (esquerda, direita) das colunas, pelas linhas com o número de células mais comum"""
+    usual = np.bincount(counts[counts >= min_columns]).argmax()
+    x0, x1 = cells[counts == usual, 0], cells[counts == usual, 2]
+    left = int(np.floor(x0.min()))
+    coverage = np.zeros(int(np.ceil(x1.max())) - left + 2, dtype=int)
+    np.add.at(coverage, np.floor(x0).astype(int) - left, 1)
+    np.add.at(coverage, np.ceil(x1).astype(int) - left, -1)
+    covered = np.concatenate([[False], np.cumsum(coverage)[:-1] > 0, [False]])
+    edges = np.flatnonzero(np.diff(covered.astype(int)))
+    return np.column_stack([edges[0::2], edges[1::2]]) + left
+
+
+def build_grid(texts, cells, rows, columns):
+    """Células de uma tabela -> lista de linhas com uma entrada por coluna"""
+    overlap = (np.minimum(cells[:, 2, None], columns[None, :, 1])
+               - np.maximum(cells[:, 0, None], columns[None, :, 0]))
+    assigned = overlap.argmax(axis=1)
+    grid = [[""] * len(columns) for _ in range(rows.max() + 1)]
+    spans = []
+    for text, row, column, row_overlap in zip(texts, rows, assigned, overlap):
+        current = grid[row][column]
+        grid[row][column] = f"{current} {text}" if current else text
+        spans.extend((row, col) for col in np.flatnonzero(row_overlap > 0) if col > column)
+    for row, col in spans:
+        if grid[row][col] == "":
+            grid[row][col] = None
+    return grid
+
+
+def extract_tables(data, min_rows=MIN_ROWS, min_columns=MIN_COLUMNS,
+                   min_confidence=MIN_CONFIDENCE):
+    """
+    Caixas das palavras de uma página (image_to_data DICT) -> tabelas.
+
+    Cada tabela é {"bbox": [x0, y0, x1, y1], "dados": [[célula, ...], ...]},
+    de cima para baixo.
+    """
+    text, boxes = word_boxes(data, min_confidence)
+    if len(text) < min_rows * min_columns:
+        return []
+    height = float(np.median(boxes[:, 3] - boxes[:, 1]))
+    rows = cluster_rows(boxes, ROW_TOLERANCE * height)
+    texts, cells, cell_rows = group_cells(text, boxes, rows, CELL_GAP * height)
+
+    row_count = cell_rows.max() + 1
+    counts = np.bincount(cell_rows, minlength=row_count)
+    tops = np.full(row_count, np.inf)
+    bottoms = np.full(row_count, -np.inf)
+    np.minimum.at(tops, cell_rows, cells[:, 1])
+    np.maximum.at(bottoms, cell_rows, cells[:, 3])
+
+    tables = []
+    for group in table_rows(counts, tops, bottoms, ROW_GAP * height, min_rows, min_columns):
+        inside = np.flatnonzero(np.isin(cell_rows, group))
+        if np.median([texts[i].count(" ") + 1 for i in inside]) > MAX_CELL_WORDS:
+            continue
+        columns = column_bounds(cells[inside], counts[cell_rows[inside]], min_columns)
+        if len(columns) < min_columns:
+            continue
+        grid = build_grid([texts[i] for i in inside], cells[inside],
+                          cell_rows[inside] - group[0], columns)
+        bbox = np.concatenate([cells[inside, :2].min(axis=0), cells[inside, 2:].max(axis=0)])
+        tables.append({"bbox": [int(v) for v in bbox], "dados": grid})
+    return tables
+
+
+def tables_document(pdf_path, page_count, page_tables):
+    """
+    {pagina: [tabelas]} -> dicionário no formato de extracted_manuals/*_tables.json
+    """
+    data = [
+        {"página": page_num, "índice": index, "dados": table["dados"]}
+        for page_num in sorted(page_tables)
+        for index, table in enumerate(page_tables[page_num])
+    ]
+    return {
+        "arquivo": str(pdf_path),
+        "páginas": page_count,
+        "tabelas_total": len(data),
+        "data": data,
+    }
+
+
+def text_layer_words(page):
+    """Palavras da camada de texto de uma página PyMuPDF, nas colunas de image_to_data"""
+    words = page.get_text("words")
+    return {
+        "text": [w[4] for w in words],
+        "left": [w[0] for w in words],
+        "top": [w[1] for w in words],
+        "width": [w[2] - w[0] for w in words],
+        "height": [w[3] - w[1] for w in words],
+        "conf": [100] * len(words),
+    }
+
+
+def main():
+    import fitz  # PyMuPDF
+
+    from page_renderer import map_pages
+    from page_source import parse_page_range
+
+    parser = argparse.ArgumentParser(description="Tabelas a partir das caixas das palavras do OCR")
+    parser.add_argument("pdf")
+    parser.add_argument("--pages", help="intervalo de páginas, ex: 1-20")
+    parser.add_argument("--dpi", type=int, default=OCR_DPI)
+    parser.add_argument("--lang", default=OCR_LANG)
+    parser.add_argument("--text-layer", action="store_true",
+                        help="palavras da camada de texto em vez do OCR")
+    parser.add_argument("--output", help="grava as tabelas em JSON (formato *_tables.json)")
+    args = parser.parse_args()
+
+    with fitz.open(args.pdf) as doc:
+        page_count = doc.page_count
+        pages = parse_page_range(args.pages, page_count)
+        if args.text_layer:
+            page_tables = {page_num: extract_tables(text_layer_words(doc[page_num - 1]))
+                           for page_num in pages}
+
+    if not args.text_layer:
+        def ocr_tables(image):
+            _, _, data = get_backend(lang=args.lang).recognize(image, words=True)
+            return extract_tables(data)
+
+        page_tables = dict(map_pages(ocr_tables, args.pdf, pages, dpi=args.dpi,
+                                     gray=True, array=True))
+
+    print(f"\n📊 {Path(args.pdf).name}: {len(pages)} página(s)\n")
+    for page_num in sorted(page_tables):
+        for table in page_tables[page_num]:
+            grid = table["dados"]
+            print(f"  pág. {page_num:>3}  {len(grid)} x {len(grid[0])}  {table['bbox']}")
+            for row in grid:
+                print("     | " + " | ".join("" if cell is None else cell for cell in row))
+
+    document = tables_document(args.pdf, page_count, page_tables)
+    print(f"\n✅ {document['tabelas_total']} tabela(s)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+        print(f"   Tabelas → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
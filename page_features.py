@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Tabela de características por página (NumPy), calculada numa só passagem
+
+Para cada manual guarda um ficheiro .npz em .cache/caracteristicas/ (chave
+= SHA-256 do PDF) com uma coluna por característica: caracteres de texto,
+desenhos vetoriais, réguas, imagens, largura/altura/rotação e contagem de
+palavras-chave. Ferramentas de seleção de páginas (analyze-pdf-pages.py,
+check-pdf-type.py, check_page_orientations.py) passam a ser filtros
+vetorizados sobre estes arrays em vez de novas leituras do PDF.
+
+Uso:
+  python page_features.py build [--workers 4]   (todos os documentos de entrada)
+  python page_features.py show "MARCAS/LR05.pdf"
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from keyword_matcher import KeywordMatcher
+from manifest import scan_inputs
+from pdf_cache import count_rulings, file_sha256
+
+FEATURES_DIR = Path(".cache/caracteristicas")
+
+# Incrementar quando mudar o cálculo ou as colunas (invalida os .npz antigos)
+FEATURES_VERSION = 3
+
+# Vocabulário de palavras-chave contado em cada página (sem acentos nem maiúsculas)
+KEYWORDS = [
+    'CAPACITY', 'PERSON', 'CO2', 'CYLINDER',
+    'PRESSURE', 'PSI', 'VALVE', 'WEAK LINK',
+    'DAVIT', 'TORQUE', 'SPECIFICATION', 'WEIGHT',
+    'TABLE', 'PART NO', 'SPARE', 'EQUIPMENT',
+    'SOLAS', 'PACK', 'CONTAINER', 'INFLATION',
+]
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+
+
+def _compute(pdf_path):
+    """Uma passagem PyMuPDF pelo documento inteiro -> dicionário de colunas"""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(str(pdf_path))
+    n = doc.page_count
+    columns = {
+        "pagina": np.arange(1, n + 1, dtype=np.int32),
+        "caracteres": np.zeros(n, dtype=np.int32),
+        # Comprimento bruto de get_text() (com espaços e quebras de linha)
+        "caracteres_brutos": np.zeros(n, dtype=np.int32),
+        "desenhos": np.zeros(n, dtype=np.int32),
+        "reguas": np.zeros(n, dtype=np.int32),
+        "imagens": np.zeros(n, dtype=np.int16),
+        # float64: as dimensões gravadas nos relatórios são as do PDF (595.276, não 595.2760009765625)
+        "largura": np.zeros(n, dtype=np.float64),
+        "altura": np.zeros(n, dtype=np.float64),
+        "rotacao": np.zeros(n, dtype=np.int16),
+        "palavras_chave": np.zeros((n, len(KEYWORDS)), dtype=np.int16),
+    }
+    try:
+        for i, page in enumerate(doc):
+            text = page.get_text()
+            drawings = page.get_drawings()
+            columns["caracteres"][i] = len(text.strip())
+            columns["caracteres_brutos"][i] = len(text)
+            columns["desenhos"][i] = len(drawings)
+            columns["reguas"][i] = count_rulings(page, drawings=drawings)
+            columns["imagens"][i] = len(page.get_images())
+            columns["largura"][i] = page.rect.width
+            columns["altura"][i] = page.rect.height
+            columns["rotacao"][i] = page.rotation
+            columns["palavras_chave"][i] = KEYWORD_MATCHER.counts(text)
+    finally:
+        doc.close()
+    return columns
+
+
+class PageFeatures:
+    """Colunas NumPy de um manual, com filtros vetorizados de conveniência"""
+
+    def __init__(self, pdf_path, columns):
+        self.pdf_path = Path(pdf_path)
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns["pagina"])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __getattr__(self, column):
+        try:
+            return self.__dict__["columns"][column]
+        except KeyError:
+            raise AttributeError(column) from None
+
+    @property
+    def landscape(self):
+        return self.largura > self.altura
+
+    @property
+    def aspect(self):
+        return np.round(self.largura / np.maximum(self.altura, 1), 2)
+
+    def keyword_counts(self, keywords=None):
+        """Matriz (páginas x palavras) de ocorrências, restrita a `keywords`"""
+        if keywords is None:
+            return self.palavras_chave
+        return self.palavras_chave[:, [KEYWORDS.index(kw) for kw in keywords]]
+
+    def keyword_hits(self, keywords=None):
+        """Número de palavras-chave distintas presentes em cada página"""
+        return (self.keyword_counts(keywords) > 0).sum(axis=1)
+
+    def pages(self, mask):
+        """Números de página (1-based) onde a máscara booleana é verdadeira"""
+        return self.pagina[np.asarray(mask)].tolist()
+
+
+def _features_file(pdf_path):
+    return FEATURES_DIR / f"{file_sha256(pdf_path)}.npz"
+
+
+def load_features(pdf_path, rebuild=False):
+    """Lê a tabela do manual, calculando-a (e guardando-a) se ainda não existir"""
+    path = _features_file(pdf_path)
+    if path.exists() and not rebuild:
+        with np.load(path, allow_pickle=False) as data:
+            if (int(data["versao"]) == FEATURES_VERSION
+                    and data["vocabulario"].tolist() == KEYWORDS):
+                return PageFeatures(pdf_path, {
+                    k: data[k] for k in data.files if k not in ("versao", "vocabulario")
+                })
+
+    columns = _compute(pdf_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.stem + ".tmp.npz")
+    np.savez(tmp, versao=FEATURES_VERSION, vocabulario=np.array(KEYWORDS), **columns)
+    tmp.replace(path)
+    return PageFeatures(pdf_path, columns)
+
+
+def _build_one(pdf_path):
+    return pdf_path, len(load_features(pdf_path))
+
+
+def build_all(paths=None, workers=1):
+    """Calcula as tabelas em falta para todos os documentos de entrada"""
+    paths = scan_inputs() if paths is None else [Path(p) for p in paths]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(_build_one, paths)
+    else:
+        for pdf_path in paths:
+            yield _build_one(pdf_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tabela de características por página")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    build = sub.add_parser("build", help="calcula as tabelas de todos os documentos")
+    build.add_argument("--workers", type=int, default=1, help="documentos em paralelo")
+
+    show = sub.add_parser("show", help="mostra a tabela de um PDF")
+    show.add_argument("pdf")
+
+    args = parser.parse_args()
+
+    if args.comando == "build":
+        print(f"\n📊 Tabelas de características em {FEATURES_DIR}\n")
+        for pdf_path, total in build_all(workers=args.workers):
+            print(f"   ✅ {pdf_path} ({total} páginas)")
+        print()
+        return
+
+    features = load_features(args.pdf)
+    print(f"\n📄 {features.pdf_path.name}: {len(features)} páginas\n")
+    print(f"{'Pág':>4} {'chars':>6} {'desenhos':>9} {'réguas':>7} {'imagens':>8} "
+          f"{'larg x alt':>13} {'rot':>4} {'kw':>3}")
+    hits = features.keyword_hits()
+    for i in range(len(features)):
+        print(f"{features.pagina[i]:>4} {features.caracteres[i]:>6} {features.desenhos[i]:>9} "
+              f"{features.reguas[i]:>7} {features.imagens[i]:>8} "
+              f"{features.largura[i]:>6.0f} x {features.altura[i]:<4.0f} "
+              f"{features.rotacao[i]:>4} {hits[i]:>3}")
+
+
+if __name__ == "__main__":
+    main()
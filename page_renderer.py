@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Renderização de páginas PDF em streaming (PyMuPDF) para OCR
+
+Em vez de converter o documento inteiro para uma lista de imagens PIL
+(pdf2image.convert_from_path), as páginas pedidas são renderizadas uma a
+uma, por ordem, só essas. `map_pages` junta um produtor de renderização e
+N workers de OCR através de uma fila limitada: nunca existem em memória
+mais do que `queue_size + workers` imagens, seja qual for o número de
+páginas pedidas.
+
+Com `array=True` as páginas chegam como arrays NumPy que são vistas
+diretas sobre `fitz.Pixmap.samples` (sem cópia nem codificação PNG): o
+Tesseract, o cálculo de brilho e a binarização leem os mesmos bytes que o
+MuPDF escreveu.
+
+Uso: python page_renderer.py "MARCAS/LR05.pdf" [--pages 1-20] [--dpi 200]
+  Renderiza as páginas e mostra o tempo e o pico de memória.
+"""
+
+import argparse
+import threading
+import time
+from pathlib import Path
+from queue import Queue
+
+import numpy as np
+
+RENDER_DPI = 200
+
+# Fim da fila (um por worker)
+_END = object()
+
+
+class PixmapArray(np.ndarray):
+    """Array NumPy sobre os samples de um Pixmap, que o mantém vivo"""
+
+    def __array_finalize__(self, obj):
+        self.pixmap = getattr(obj, "pixmap", None)
+
+
+def pixmap_array(pix):
+    """
+    Vista (altura, largura) ou (altura, largura, canais) sobre pix.samples.
+
+    Não copia os pixels; o Pixmap fica referenciado pelo array (e pelas
+    vistas/recortes derivados) enquanto estes existirem.
+    """
+    shape = (pix.height, pix.width) if pix.n == 1 else (pix.height, pix.width, pix.n)
+    array = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(shape).view(PixmapArray)
+    array.pixmap = pix
+    return array
+
+
+def render_array(doc, page_num, dpi=RENDER_DPI, gray=True):
+    """Página (1-based) de um documento aberto -> array NumPy uint8 sem cópia"""
+    import fitz  # PyMuPDF
+
+    colorspace = fitz.csGRAY if gray else fitz.csRGB
+    return pixmap_array(doc[page_num - 1].get_pixmap(dpi=dpi, colorspace=colorspace, alpha=False))
+
+
+def render_page(doc, page_num, dpi=RENDER_DPI, gray=False):
+    """Página (1-based) de um documento aberto -> imagem PIL"""
+    import fitz  # PyMuPDF
+    from PIL import Image
+
+    colorspace = fitz.csGRAY if gray else fitz.csRGB
+    pix = doc[page_num - 1].get_pixmap(dpi=dpi, colorspace=colorspace, alpha=False)
+    return Image.frombytes("L" if gray else "RGB", (pix.width, pix.height), pix.samples)
+
+
+def iter_pages(pdf_path, pages=None, dpi=RENDER_DPI, gray=False, array=False):
+    """
+    Gera (pagina, imagem) só para as páginas pedidas, uma de cada vez.
+
+    Páginas fora do documento são ignoradas; sem `pages`, todas. Com
+    `array=True` a imagem é um array NumPy (render_array) em vez de PIL.
+    """
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(str(pdf_path))
+    try:
+        total = doc.page_count
+        if pages is None:
+            pages = range(1, total + 1)
+        for page_num in pages:
+            if 1 <= page_num <= total:
+                render = render_array if array else render_page
+                yield page_num, render(doc, page_num, dpi, gray)
+    finally:
+        doc.close()
+
+
+def map_pages(func, pdf_path, pages=None, workers=1, dpi=RENDER_DPI, gray=False,
+              queue_size=2, array=False, with_page=False):
+    """
+    Aplica func(imagem) a cada página renderizada, com `workers` threads
+    (func(pagina, imagem) com `with_page=True`).
+
+    A renderização corre numa thread própria e alimenta uma fila limitada
+    (`queue_size`); quando os workers estão ocupados o produtor espera, pelo
+    que a memória fica constante. Gera (pagina, resultado) pela ordem em que
+    terminam. Uma exceção no produtor ou num worker é repropagada aqui.
+    """
+    workers = max(1, workers)
+    tasks = Queue(maxsize=queue_size)
+    results = Queue()
+    errors = []
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in iter_pages(pdf_path, pages, dpi, gray, array):
+                if stop.is_set():
+                    break
+                tasks.put(item)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            for _ in range(workers):
+                tasks.put(_END)
+
+    def consume():
+        while True:
+            item = tasks.get()
+            if item is _END:
+                break
+            page_num, image = item
+            if stop.is_set():
+                continue
+            try:
+                result = func(page_num, image) if with_page else func(image)
+                results.put((page_num, result))
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                del image, item
+        results.put(_END)
+
+    threads = [threading.Thread(target=produce, daemon=True)]
+    threads += [threading.Thread(target=consume, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        finished = 0
+        while finished < workers:
+            item = results.get()
+            if item is _END:
+                finished += 1
+                continue
+            yield item
+    finally:
+        # Com stop ativo os workers só esvaziam a fila até ao fim do produtor
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+
+def main():
+    try:
+        import resource  # Só Unix; no Windows o pico de memória não é mostrado
+    except ImportError:
+        resource = None
+
+    from page_source import parse_page_range
+
+    parser = argparse.ArgumentParser(description="Renderização de páginas em streaming")
+    parser.add_argument("pdf")
+    parser.add_argument("--pages", help="intervalo de páginas, ex: 1-20")
+    parser.add_argument("--dpi", type=int, default=RENDER_DPI)
+    parser.add_argument("--gray", action="store_true", help="tons de cinzento")
+    args = parser.parse_args()
+
+    import fitz  # PyMuPDF
+
+    with fitz.open(args.pdf) as doc:
+        pages = parse_page_range(args.pages, doc.page_count)
+
+    start = time.perf_counter()
+    count = 0
+    for page_num, size in map_pages(lambda image: image.size, args.pdf, pages,
+                                    dpi=args.dpi, gray=args.gray):
+        count += 1
+        print(f"  pág. {page_num:>3}  {size[0]} x {size[1]}")
+    elapsed = time.perf_counter() - start
+    peak = ""
+    if resource is not None:
+        peak = f" (pico de memória {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB)"
+    print(f"\n✅ {count} página(s) de {Path(args.pdf).name} em {elapsed:.1f}s{peak}")
+
+
+if __name__ == "__main__":
+    main()
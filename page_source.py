@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Fonte única de páginas PDF: PyMuPDF para texto, pdfplumber só para tabelas
+
+O texto vem sempre do PyMuPDF (uma ordem de grandeza mais rápido). A
+extração de tabelas do pdfplumber só é chamada em páginas cuja densidade
+de desenho vetorial (segmentos horizontais/verticais) sugere uma tabela.
+Tudo passa pelo cache partilhado (pdf_cache.py).
+
+Uso: python page_source.py --compare "MARCAS/LR05.pdf" [--pages 1-40]
+  Compara os dois motores página a página: tempo, semelhança do texto e
+  tabelas encontradas vs. páginas escolhidas pela heurística.
+"""
+
+import argparse
+import difflib
+import re
+import time
+from pathlib import Path
+
+from pdf_cache import CachedPDF, count_rulings
+
+# Mínimo de segmentos de régua para considerar que a página tem tabela
+TABLE_RULINGS_THRESHOLD = 8
+
+
+class PageSource:
+    """Páginas de um PDF com escolha de motor por página"""
+
+    def __init__(self, pdf_path, table_threshold=TABLE_RULINGS_THRESHOLD, cache=None):
+        self.pdf_path = Path(pdf_path)
+        self.table_threshold = table_threshold
+        self.fast = CachedPDF(pdf_path, "pymupdf", cache=cache)
+        self.cache = self.fast.cache
+        self._plumber = None
+
+    @property
+    def plumber(self):
+        # pdfplumber só é aberto (e o seu cache consultado) se houver tabelas a extrair
+        if self._plumber is None:
+            self._plumber = CachedPDF(self.pdf_path, "pdfplumber", cache=self.cache)
+        return self._plumber
+
+    def __len__(self):
+        return len(self.fast)
+
+    def text(self, page_num):
+        return self.fast.text(page_num)
+
+    def normalized_text(self, page_num):
+        """Texto sem acentos e em minúsculas (keyword_matcher.normalize), em cache"""
+        return self.fast.normalized_text(page_num)
+
+    def words(self, page_num):
+        return self.fast.words(page_num)
+
+    def has_table(self, page_num):
+        return self.fast.page(page_num, ("reguas",))["reguas"] >= self.table_threshold
+
+    def tables(self, page_num):
+        return self.plumber.tables(page_num) if self.has_table(page_num) else []
+
+    def pages(self, pages=None, tables=False, workers=1, normalized=False, words=False):
+        """
+        Registos {'pagina', 'texto'[, 'texto_norm'][, 'palavras'][, 'tabelas']} por ordem de página.
+
+        Com tables=True as tabelas só são extraídas (pdfplumber) nas páginas
+        com réguas suficientes; as restantes recebem uma lista vazia.
+        Com normalized=True inclui o texto normalizado para KeywordMatcher;
+        com words=True as palavras [x0, y0, x1, y1, palavra] (get_text("words")).
+        """
+        fields = ("texto", "texto_norm") if normalized else ("texto",)
+        if words:
+            fields += ("palavras",)
+        if tables:
+            fields += ("reguas",)
+        records = self.fast.pages(pages, fields, workers)
+        if not tables:
+            return records
+
+        table_pages = [r["pagina"] for r in records if r["reguas"] >= self.table_threshold]
+        found = {}
+        if table_pages:
+            for r in self.plumber.pages(table_pages, ("tabelas",), workers):
+                found[r["pagina"]] = r["tabelas"]
+        for r in records:
+            del r["reguas"]
+            r["tabelas"] = found.get(r["pagina"], [])
+        return records
+
+    def close(self):
+        if self._plumber is not None:
+            self._plumber.close()
+        self.fast.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_page_range(spec, total):
+    """'1-5,10,20-22' -> [1, 2, 3, 4, 5, 10, 20, 21, 22]"""
+    if not spec:
+        return list(range(1, total + 1))
+    pages = set()
+    for part in spec.split(","):
+        if "-" in part:
+            start, end = part.split("-", 1)
+            pages.update(range(int(start), int(end) + 1))
+        elif part.strip():
+            pages.add(int(part))
+    return sorted(p for p in pages if 1 <= p <= total)
+
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def compare_engines(pdf_path, pages=None, table_threshold=TABLE_RULINGS_THRESHOLD):
+    """Extrai cada página com os dois motores (sem cache) e mede as diferenças"""
+    import fitz  # PyMuPDF
+    import pdfplumber
+
+    doc = fitz.open(str(pdf_path))
+    pdf = pdfplumber.open(str(pdf_path))
+    rows = []
+    try:
+        for page_num in parse_page_range(pages, doc.page_count):
+            t0 = time.perf_counter()
+            fitz_page = doc[page_num - 1]
+            fitz_text = fitz_page.get_text()
+            rulings = count_rulings(fitz_page)
+            t1 = time.perf_counter()
+            plumber_page = pdf.pages[page_num - 1]
+            plumber_text = plumber_page.extract_text() or ""
+            t2 = time.perf_counter()
+            plumber_tables = plumber_page.extract_tables()
+            t3 = time.perf_counter()
+
+            rows.append({
+                "pagina": page_num,
+                "pymupdf_ms": round((t1 - t0) * 1000, 1),
+                "pdfplumber_texto_ms": round((t2 - t1) * 1000, 1),
+                "pdfplumber_tabelas_ms": round((t3 - t2) * 1000, 1),
+                "semelhanca_texto": round(difflib.SequenceMatcher(
+                    None, _normalize(fitz_text), _normalize(plumber_text)).ratio(), 3),
+                "chars_pymupdf": len(fitz_text),
+                "chars_pdfplumber": len(plumber_text),
+                "reguas": rulings,
+                "tabela_prevista": rulings >= table_threshold,
+                "tabelas_pdfplumber": len(plumber_tables),
+            })
+    finally:
+        pdf.close()
+        doc.close()
+    return rows
+
+
+def print_comparison(pdf_path, rows):
+    print(f"\n{'='*100}")
+    print(f"COMPARAÇÃO DE MOTORES: {Path(pdf_path).name}")
+    print(f"{'='*100}\n")
+    print(f"{'Pág':>4} {'PyMuPDF':>9} {'plumb txt':>10} {'plumb tab':>10} "
+          f"{'semelh.':>8} {'réguas':>7} {'prevista':>9} {'tabelas':>8}")
+    for r in rows:
+        aviso = ""
+        if r["tabelas_pdfplumber"] and not r["tabela_prevista"]:
+            aviso = "  ⚠️ tabela perdida"
+        print(f"{r['pagina']:>4} {r['pymupdf_ms']:>7.1f}ms {r['pdfplumber_texto_ms']:>8.1f}ms "
+              f"{r['pdfplumber_tabelas_ms']:>8.1f}ms {r['semelhanca_texto']:>8.3f} {r['reguas']:>7} "
+              f"{'sim' if r['tabela_prevista'] else 'não':>9} {r['tabelas_pdfplumber']:>8}{aviso}")
+
+    if not rows:
+        return
+    fast = sum(r["pymupdf_ms"] for r in rows)
+    slow_text = sum(r["pdfplumber_texto_ms"] for r in rows)
+    slow_tables = sum(r["pdfplumber_tabelas_ms"] for r in rows)
+    hybrid = fast + sum(r["pdfplumber_tabelas_ms"] for r in rows if r["tabela_prevista"])
+    com_tabela = [r for r in rows if r["tabelas_pdfplumber"]]
+    apanhadas = [r for r in com_tabela if r["tabela_prevista"]]
+
+    print(f"\n{'─'*100}")
+    print(f"Páginas: {len(rows)}")
+    print(f"PyMuPDF (texto + réguas): {fast:.0f} ms")
+    print(f"pdfplumber (texto + tabelas em todas): {slow_text + slow_tables:.0f} ms")
+    print(f"Híbrido (PyMuPDF + tabelas só nas previstas): {hybrid:.0f} ms")
+    print(f"Semelhança média do texto: {sum(r['semelhanca_texto'] for r in rows) / len(rows):.3f}")
+    print(f"Páginas com tabelas (pdfplumber): {len(com_tabela)} | detetadas pela heurística: {len(apanhadas)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fonte de páginas PyMuPDF/pdfplumber")
+    parser.add_argument("--compare", metavar="PDF", required=True,
+                        help="compara os dois motores página a página")
+    parser.add_argument("--pages", help="intervalo de páginas, ex: 1-40,55")
+    parser.add_argument("--threshold", type=int, default=TABLE_RULINGS_THRESHOLD,
+                        help="réguas mínimas para escalar para pdfplumber")
+    args = parser.parse_args()
+
+    rows = compare_engines(args.compare, args.pages, args.threshold)
+    print_comparison(args.compare, rows)
+
+
+if __name__ == "__main__":
+    main()
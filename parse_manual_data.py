@@ -4,6 +4,8 @@ import re
 from pathlib import Path
 from collections import defaultdict
 
+from spec_rules import DEFAULT_RULES, select, split_pages
+
 # Mapear manuais para marcas/modelos
 manual_mapping = {
     "LR97": {"marca": "DSB", "modelo": "LR97"},
@@ -15,6 +17,9 @@ manual_mapping = {
     "Eurovinil": {"marca": "EUROVINIL", "modelo": "Leisure Syntesy"}
 }
 
+# Só as regras de especificações gerais do manual
+SPEC_RULES = DEFAULT_RULES.select('capacidade_faixa', 'temperatura', 'dimensao', 'peso')
+
 extracted_dir = Path("extracted_manuals")
 output_file = Path("manual_specifications.json")
 
@@ -51,30 +56,42 @@ for summary_file in sorted(extracted_dir.glob("*_summary.json")):
         with open(text_file, 'r', encoding='utf-8') as f:
             full_text = f.read()
         
-        # Procurar especificações
+        # Procurar especificações (regras partilhadas, uma passagem por página)
         specs = {}
+        findings = SPEC_RULES.scan_pages(split_pages(full_text))
         
         # Capacidade
-        capacity_match = re.search(r'(?:capacity|capacidade|persons?|pessoab|occupants?)[:\s]+(\d+)\s*(?:to|para|–|-)\s*(\d+)', full_text, re.IGNORECASE)
-        if capacity_match:
-            specs['capacidade_minima'] = int(capacity_match.group(1))
-            specs['capacidade_maxima'] = int(capacity_match.group(2))
+        capacity = select(findings, regra='capacidade_faixa', plausible=False)
+        if capacity:
+            specs['capacidade_minima'] = capacity[0]['minimo']
+            specs['capacidade_maxima'] = capacity[0]['maximo']
         
         # Peso
-        weight_match = re.search(r'(?:weight|peso)[:\s]+(?:approx\.|aprox\.)?[\s]*(\d+(?:[.,]\d+)?)\s*(?:kg|kilogram)', full_text, re.IGNORECASE)
-        if weight_match:
-            specs['peso_kg'] = float(weight_match.group(1).replace(',', '.'))
+        weight = select(findings, regra='peso', plausible=False)
+        if weight:
+            specs['peso_kg'] = float(weight[0]['valor'])
         
         # Temperatura
-        temp_match = re.search(r'temperature[:\s]+(?:from|de)?[\s]*(-?\d+)\s*(?:to|até|°|a)\s*(?:\+)?(\d+)\s*°?[CD]', full_text, re.IGNORECASE)
-        if temp_match:
-            specs['temperatura_min'] = int(temp_match.group(1))
-            specs['temperatura_max'] = int(temp_match.group(2))
+        temp = select(findings, regra='temperatura', plausible=False)
+        if temp:
+            specs['temperatura_min'] = temp[0]['minimo']
+            specs['temperatura_max'] = temp[0]['maximo']
         
         # Dimensões
-        dim_match = re.search(r'(?:dimension|length|comprimento)[:\s]+(\d+(?:[.,]\d+)?)\s*[xX×]\s*(\d+(?:[.,]\d+)?)\s*(?:[xX×]\s*(\d+(?:[.,]\d+)?))?', full_text, re.IGNORECASE)
-        if dim_match:
-            specs['dimensao'] = f"{dim_match.group(1)}x{dim_match.group(2)}" + (f"x{dim_match.group(3)}" if dim_match.group(3) else "")
+        dim = select(findings, regra='dimensao', plausible=False)
+        if dim:
+            parts = [dim[0].get(k) for k in ('comprimento', 'largura', 'altura')]
+            specs['dimensao'] = 'x'.join(f"{v:g}" for v in parts if v is not None)
+        
+        # Página de origem de cada especificação
+        paginas = {
+            key: found[0]['pagina']
+            for key, found in (('capacidade', capacity), ('peso_kg', weight),
+                               ('temperatura', temp), ('dimensao', dim))
+            if found
+        }
+        if paginas:
+            specs['paginas'] = paginas
         
         # SOLAS
         if 'SOLAS' in full_text:
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Índice de referências de fabricante de todos os manuais e boletins
+
+Cada referência é normalizada (maiúsculas, sem espaços nem separadores:
+'12-3456' e '123456' são a mesma) e guardada:
+
+  - numa árvore de prefixos (trie), para pesquisa por prefixo enquanto se
+    escreve ('DSB009' -> DSB00940350, DSB00940220, ...);
+  - num union-find de aliases: os boletins de consolidação de referências
+    (ex: "Spare parts — Consolidation of multiple branded part numbers")
+    têm tabelas "Historic part number" -> "Current part number" (e
+    "Current" -> "New"); cada referência antiga fica no conjunto da atual,
+    que é a canónica do conjunto;
+  - com todas as ocorrências (manual, página) no texto dos manuais.
+
+As tabelas dos boletins são lidas pelas células desenhadas do armazém de
+geometria (geometry_store.py): uma célula fundida com a referência atual
+abrange as linhas de todas as referências antigas que substitui.
+
+O índice é gravado em part_numbers_index.json e carregado por
+import_mk4_spares.py para gravar "refFabricante" já na forma canónica.
+
+Uso:
+  python part_index.py construir [pdf ...] [--workers 4]
+  python part_index.py procurar DSB0094 [--limite 20]
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from geometry_store import GeometryStore, _timed
+from manifest import scan_inputs
+from page_source import PageSource
+from part_numbers import MAX_REFERENCE_LENGTH, REFERENCE_PATTERN, is_part_number
+
+index_file = Path("part_numbers_index.json")
+
+# Referências com prefixo de marca (DSB00940350, Z64514) que REFERENCE_PATTERN não cobre
+BRANDED_PATTERN = re.compile(r'\b[A-Z]{1,3}\d{5,}\b')
+# Cabeçalhos das tabelas de substituição dos boletins (antiga à esquerda, nova à direita)
+ALIAS_HEADER = re.compile(r'^(?:historic|current|new|old|superseded)\s+part\s+number$', re.IGNORECASE)
+
+
+def is_alias_cell(text):
+    """Célula só com uma referência: código com algarismos, sem descrição ('BATTERY RL6')"""
+    compact = normalize_part_number(text)
+    return is_part_number(text) and sum(c.isdigit() for c in compact) * 2 >= len(compact)
+
+
+def normalize_part_number(text):
+    """'12-3456 ' -> '123456'; 'dsb 0094' -> 'DSB0094'"""
+    return re.sub(r'[^A-Z0-9]', '', text.upper())
+
+
+class PrefixTrie:
+    """Árvore de prefixos de referências normalizadas"""
+
+    END = ""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, key):
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[self.END] = True
+
+    def search(self, prefix, limit=20):
+        """Chaves que começam por `prefix`, por ordem, no máximo `limit`"""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        found = []
+        stack = [(node, prefix)]
+        while stack and len(found) < limit:
+            node, key = stack.pop()
+            if self.END in node:
+                found.append(key)
+            stack.extend((child, key + char) for char, child in
+                         sorted(node.items(), reverse=True) if char != self.END)
+        return found
+
+
+class AliasSets:
+    """Union-find de referências; cada conjunto tem uma referência canónica"""
+
+    def __init__(self):
+        self.parent = {}
+        self.label = {}
+        self.members = {}
+
+    def find(self, key):
+        if key not in self.parent:
+            self.parent[key] = key
+            self.label[key] = key
+            self.members[key] = [key]
+            return key
+        root = key
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Compressão de caminho
+        while self.parent[key] != root:
+            self.parent[key], key = root, self.parent[key]
+        return root
+
+    def union(self, alias, canonical):
+        """Junta os conjuntos; a canónica do conjunto de `canonical` passa a ser a de ambos"""
+        alias_root, root = self.find(alias), self.find(canonical)
+        if alias_root == root:
+            return
+        label = self.label[root]
+        # União por tamanho: a raiz do conjunto menor passa a apontar para a do maior
+        if len(self.members[alias_root]) > len(self.members[root]):
+            alias_root, root = root, alias_root
+        self.parent[alias_root] = root
+        self.members[root].extend(self.members.pop(alias_root))
+        self.label.pop(alias_root)
+        self.label[root] = label
+
+    def canonical(self, key):
+        return self.label[self.find(key)]
+
+    def group(self, key):
+        """Membros do conjunto de `key`"""
+        return self.members[self.find(key)]
+
+    def groups(self):
+        """{canónica: [membros]} dos conjuntos com mais de uma referência"""
+        return {self.label[root]: sorted(members)
+                for root, members in self.members.items() if len(members) > 1}
+
+
+class PartNumberIndex:
+    """Referências normalizadas: prefixos, aliases e ocorrências (manual, página)"""
+
+    def __init__(self):
+        self.trie = PrefixTrie()
+        self.aliases = AliasSets()
+        self.display = {}
+        self.occurrences = {}
+
+    def add(self, reference, manual=None, page_num=None):
+        """Regista uma referência (e a ocorrência, se indicada); devolve a chave normalizada"""
+        key = normalize_part_number(reference)
+        if not key:
+            return None
+        if key not in self.display:
+            self.display[key] = reference.strip()
+            self.occurrences[key] = []
+            self.trie.add(key)
+            self.aliases.find(key)
+        if manual is not None:
+            occurrence = [manual, page_num]
+            if occurrence not in self.occurrences[key]:
+                self.occurrences[key].append(occurrence)
+        return key
+
+    def add_alias(self, alias, canonical, source=None):
+        """`alias` é substituída por `canonical` (ex: referência histórica -> atual)"""
+        self.aliases.union(self.add(alias, *(source or ())), self.add(canonical, *(source or ())))
+
+    def __contains__(self, reference):
+        return normalize_part_number(reference) in self.display
+
+    def __len__(self):
+        return len(self.display)
+
+    def canonical(self, reference):
+        """Referência canónica (forma original) de uma referência conhecida, ou None"""
+        key = normalize_part_number(reference)
+        if key not in self.display:
+            return None
+        return self.display[self.aliases.canonical(key)]
+
+    def alias_group(self, reference):
+        """Todas as referências equivalentes (forma original), começando pela canónica"""
+        key = normalize_part_number(reference)
+        if key not in self.display:
+            return []
+        label = self.aliases.canonical(key)
+        return [self.display[label]] + sorted(self.display[m] for m in self.aliases.group(key)
+                                              if m != label)
+
+    def where(self, reference, aliases=True):
+        """Ocorrências [manual, página] da referência (e dos seus aliases)"""
+        keys = ([normalize_part_number(r) for r in self.alias_group(reference)] if aliases
+                else [normalize_part_number(reference)])
+        return [occ for key in keys for occ in self.occurrences.get(key, [])]
+
+    def prefix(self, prefix, limit=20):
+        """Referências (forma original) que começam pelo prefixo normalizado"""
+        return [self.display[key] for key in self.trie.search(normalize_part_number(prefix), limit)]
+
+    def save(self, path=index_file):
+        data = {
+            "referencias": {
+                key: {
+                    "referencia": self.display[key],
+                    "canonica": self.display[self.aliases.canonical(key)],
+                    "ocorrencias": self.occurrences[key],
+                }
+                for key in sorted(self.display)
+            },
+            "aliases": {self.display[label]: [self.display[m] for m in members]
+                        for label, members in sorted(self.aliases.groups().items())},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path=index_file):
+        """Índice gravado por `save` (vazio se o ficheiro não existir)"""
+        index = cls()
+        path = Path(path)
+        if not path.exists():
+            return index
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for key, entry in data["referencias"].items():
+            index.add(entry["referencia"])
+            index.occurrences[key] = entry["ocorrencias"]
+        for canonical, members in data["aliases"].items():
+            for member in members:
+                index.aliases.union(normalize_part_number(member), normalize_part_number(canonical))
+        return index
+
+
+def page_references(text):
+    """Referências de fabricante no texto de uma página"""
+    for match in REFERENCE_PATTERN.finditer(text):
+        value = match.group(match.lastgroup).rstrip(".-/")
+        if value and len(value) <= MAX_REFERENCE_LENGTH:
+            yield value
+    for match in BRANDED_PATTERN.finditer(text):
+        yield match.group(0)
+
+
+def alias_pairs(store, page_num):
+    """
+    (antiga, atual) das tabelas de substituição de uma página, pelas células desenhadas.
+
+    Cada par de cabeçalhos ("Historic part number" | "Current part number")
+    define a coluna antiga e a nova; uma referência nova corresponde às
+    antigas cujas células estão na mesma faixa vertical da sua (célula
+    fundida sobre várias linhas).
+    """
+    cells = []
+    for cell in store.ruled_cells(page_num):
+        box = (float(cell["x0"]), float(cell["y0"]), float(cell["x1"]), float(cell["y1"]))
+        cells.append((box, " ".join(store.texts(store.words_in_bbox(page_num, box, inside=True)))))
+    headers = sorted((box for box, text in cells if ALIAS_HEADER.match(text)), key=lambda b: (b[1], b[0]))
+    # Pares de cabeçalhos na mesma linha: (esquerda = antiga, direita = nova)
+    tables = [(left, right) for left, right in zip(headers, headers[1:])
+              if abs(left[1] - right[1]) < 2 and left[0] < right[0]]
+
+    pairs = []
+    for number, (left, right) in enumerate(tables):
+        bottom = tables[number + 1][0][1] if number + 1 < len(tables) else float("inf")
+        old, new = [], []
+        for box, text in cells:
+            if not (left[3] <= box[1] < bottom) or not is_alias_cell(text):
+                continue
+            center = (box[0] + box[2]) / 2
+            if left[0] <= center <= left[2]:
+                old.append((box, text))
+            elif right[0] <= center <= right[2]:
+                new.append((box, text))
+        for new_box, new_ref in new:
+            for old_box, old_ref in old:
+                center = (old_box[1] + old_box[3]) / 2
+                if new_box[1] <= center <= new_box[3]:
+                    pairs.append((old_ref, new_ref))
+    return pairs
+
+
+def build_index(pdf_files, workers=1):
+    """Índice a partir do texto de todos os documentos e das tabelas dos boletins"""
+    index = PartNumberIndex()
+    for pdf_path in pdf_files:
+        manual = Path(pdf_path).stem
+        with PageSource(pdf_path) as source:
+            records = source.pages(workers=workers)
+        alias_pages = []
+        for record in records:
+            for reference in page_references(record["texto"]):
+                index.add(reference, manual, record["pagina"])
+            if re.search(r'part\s+number', record["texto"], re.IGNORECASE):
+                alias_pages.append(record["pagina"])
+        if alias_pages:
+            store = GeometryStore.open(pdf_path, workers=workers)
+            for page_num in alias_pages:
+                for old, new in alias_pairs(store, page_num):
+                    index.add_alias(old, new, (manual, page_num))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice de referências de fabricante e aliases")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    build = sub.add_parser("construir", help="indexa manuais e boletins")
+    build.add_argument("pdfs", nargs="*", help="PDFs (omissão: todos os documentos de entrada)")
+    build.add_argument("--workers", type=int, default=1)
+    build.add_argument("--output", default=str(index_file))
+
+    search = sub.add_parser("procurar", help="prefixo e resolução de aliases")
+    search.add_argument("texto")
+    search.add_argument("--limite", type=int, default=20)
+    search.add_argument("--indice", default=str(index_file))
+
+    args = parser.parse_args()
+
+    if args.comando == "construir":
+        pdf_files = [Path(p) for p in args.pdfs] or scan_inputs()
+        print(f"\n🔖 Indexando referências de {len(pdf_files)} documento(s)...\n")
+        began = time.perf_counter()
+        index = build_index(pdf_files, args.workers)
+        index.save(args.output)
+        groups = index.aliases.groups()
+        print(f"  {len(index)} referências, {len(groups)} conjunto(s) de aliases "
+              f"({sum(map(len, groups.values()))} referências) em {time.perf_counter() - began:.2f}s")
+        for label, members in list(groups.items())[:10]:
+            print(f"   • {index.display[label]:<14} ← "
+                  f"{', '.join(index.display[m] for m in members if m != label)}")
+        print(f"\n✅ Índice → {args.output}\n")
+        return
+
+    began = time.perf_counter()
+    index = PartNumberIndex.load(args.indice)
+    print(f"\n🔖 {len(index)} referências carregadas em {(time.perf_counter() - began) * 1e3:.1f} ms\n")
+    matches, micros = _timed(lambda: index.prefix(args.texto, args.limite))
+    print(f"  Prefixo '{args.texto}': {len(matches)} ({micros:.1f} µs)")
+    for reference in matches:
+        canonical, micros = _timed(lambda: index.canonical(reference))
+        alias = f" → {canonical}" if canonical != reference else ""
+        places = ", ".join(f"{m} p.{p}" for m, p in index.where(reference, aliases=False)[:4])
+        print(f"   • {reference}{alias}  ({micros:.1f} µs)  {places}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Localização de cada referência de peça: página, caixa e recorte do desenho
+
+Para cada referência de MK_IV_spares_detailed.json procura a palavra (ou
+sequência de palavras) no armazém de geometria (geometry_store.py) das
+páginas onde foi encontrada, e liga-a à região de desenho mais próxima:
+
+  1. região: imagem embutida (maior do que `MIN_DIAGRAM_AREA` da página)
+     ou desenho vetorial (`MIN_DIAGRAM_SEGMENTS` segmentos oblíquos) na
+     própria página; sem nenhuma, a página anterior e depois a seguinte
+     (listas de peças ao lado da figura);
+  2. chamada: se a peça tem número de item, o número isolado dentro da
+     região ou a menos de `CALLOUT_DISTANCE` dela (balão da figura); o
+     recorte é a vizinhança da chamada (`CALLOUT_MARGIN`), limitada à
+     região e às chamadas;
+  3. sem chamada, o recorte é a região inteira; sem região, a faixa da
+     página com a linha da referência.
+
+O recorte é servido a pedido pelo serviço de renderização
+(render_service.py) através de /api/spares/mk4/page_NNN.png?bbox=...,
+que é o caminho gravado em "imagem".
+
+Uso: python part_locator.py [--spares MK_IV_spares_detailed.json] [--output MK_IV_part_locations.json]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from geometry_store import OBLIQUE, GeometryStore
+
+pdf_path = Path("MARCAS/SURVIVA MKIV/MK IV.pdf")
+spares_file = Path("MK_IV_spares_detailed.json")
+output_file = Path("MK_IV_part_locations.json")
+
+API_ROUTE = "/api/spares/mk4"
+# Imagens com área menor do que esta fração da página são logótipos/ícones
+MIN_DIAGRAM_AREA = 0.02
+# Segmentos oblíquos a partir dos quais a página tem um desenho vetorial
+MIN_DIAGRAM_SEGMENTS = 20
+# Margens (pt) à volta da chamada e da linha da referência
+CALLOUT_MARGIN = 60
+ROW_MARGIN = 6
+# Distância máxima (pt) de um número de chamada à região (balões fora das linhas)
+CALLOUT_DISTANCE = 24
+# Páginas vizinhas onde procurar a figura quando a página não tem nenhuma
+NEIGHBOUR_PAGES = (-1, 1)
+
+
+def normalize_token(text):
+    return text.strip(".,;:()[]*").upper()
+
+
+def rect_distance(a, b):
+    """Distância entre dois retângulos (0 se se sobrepõem)"""
+    dx = max(0.0, a[0] - b[2], b[0] - a[2])
+    dy = max(0.0, a[1] - b[3], b[1] - a[3])
+    return float(np.hypot(dx, dy))
+
+
+def union(boxes):
+    boxes = np.asarray(boxes, dtype=float)
+    return [float(boxes[:, 0].min()), float(boxes[:, 1].min()),
+            float(boxes[:, 2].max()), float(boxes[:, 3].max())]
+
+
+def image_url(page_num, bbox=None):
+    """Caminho da API para a página ou para um recorte (render_service.py)"""
+    url = f"{API_ROUTE}/page_{page_num:03d}.png"
+    if bbox:
+        url += "?bbox=" + ",".join(f"{v:.0f}" for v in bbox)
+    return url
+
+
+class PartLocator:
+    """Referências -> página, caixa, região de desenho e recorte (sobre um GeometryStore)"""
+
+    def __init__(self, store):
+        self.store = store
+        self._words = {}
+        self._diagrams = {}
+
+    def words(self, page_num):
+        """Palavras da página por ordem de leitura, com o texto normalizado"""
+        if page_num not in self._words:
+            self._words[page_num] = [(w[:4], normalize_token(w[4]))
+                                     for w in self.store.page_words(page_num)]
+        return self._words[page_num]
+
+    def find(self, page_num, reference):
+        """Caixas das ocorrências da referência na página (sequência de palavras)"""
+        tokens = [normalize_token(t) for t in reference.split()]
+        words = self.words(page_num)
+        found = []
+        for i in range(len(words) - len(tokens) + 1):
+            if all(words[i + k][1] == token for k, token in enumerate(tokens)):
+                found.append(union([words[i + k][0] for k in range(len(tokens))]))
+        return found
+
+    def diagrams(self, page_num):
+        """Regiões de desenho da página: [(tipo, bbox)], da maior para a menor"""
+        if page_num not in self._diagrams:
+            width, height = self.store.pages[page_num - 1].tolist()[:2]
+            min_area = MIN_DIAGRAM_AREA * width * height
+            regions = []
+            for image in self.store.images(page_num):
+                box = [float(image[k]) for k in ("x0", "y0", "x1", "y1")]
+                if (box[2] - box[0]) * (box[3] - box[1]) >= min_area:
+                    regions.append(("imagem", box))
+            oblique = self.store.segments(page_num, OBLIQUE)
+            if len(oblique) >= MIN_DIAGRAM_SEGMENTS:
+                boxes = np.column_stack([oblique[k] for k in ("x0", "y0", "x1", "y1")])
+                regions.append(("desenho", union(boxes)))
+            regions.sort(key=lambda r: -(r[1][2] - r[1][0]) * (r[1][3] - r[1][1]))
+            self._diagrams[page_num] = regions
+        return self._diagrams[page_num]
+
+    def callout(self, page_num, number, region):
+        """Caixa do número de item isolado mais perto da região (balão da figura), ou None"""
+        target = str(number)
+        near = [(rect_distance(box, region), list(box)) for box, text in self.words(page_num)
+                if text == target]
+        near = [item for item in near if item[0] <= CALLOUT_DISTANCE]
+        return min(near)[1] if near else None
+
+    def region(self, page_num, bbox):
+        """(página, tipo, bbox) da região de desenho ligada a uma caixa, ou None"""
+        regions = self.diagrams(page_num)
+        if regions:
+            kind, box = min(regions, key=lambda r: rect_distance(r[1], bbox))
+            return page_num, kind, box
+        for offset in NEIGHBOUR_PAGES:
+            neighbour = page_num + offset
+            if 1 <= neighbour <= len(self.store) and self.diagrams(neighbour):
+                kind, box = self.diagrams(neighbour)[0]
+                return neighbour, kind, box
+        return None
+
+    def locate(self, reference, pages=None, number=None):
+        """
+        Localização de uma referência nas páginas indicadas (None = todas):
+        {referencia, pagina, bbox, regiao, chamada, recorte, imagem}, ou None.
+        """
+        for page_num in pages or range(1, len(self.store) + 1):
+            if not 1 <= page_num <= len(self.store):
+                continue
+            hits = self.find(page_num, reference)
+            if hits:
+                break
+        else:
+            return None
+        bbox = hits[0]
+
+        found = self.region(page_num, bbox)
+        region = callout = None
+        if found:
+            region_page, kind, region_box = found
+            region = {"tipo": kind, "pagina": region_page, "bbox": region_box}
+            if number is not None:
+                callout = self.callout(region_page, number, region_box)
+            if callout:
+                crop_page = region_page
+                bounds = union([region_box, callout])
+                crop = [max(callout[0] - CALLOUT_MARGIN, bounds[0]),
+                        max(callout[1] - CALLOUT_MARGIN, bounds[1]),
+                        min(callout[2] + CALLOUT_MARGIN, bounds[2]),
+                        min(callout[3] + CALLOUT_MARGIN, bounds[3])]
+            else:
+                crop_page, crop = region_page, region_box
+        else:
+            # Sem figura: a faixa da página com a linha da referência
+            width = float(self.store.pages[page_num - 1]["largura"])
+            crop_page, crop = page_num, [0.0, max(bbox[1] - ROW_MARGIN, 0.0),
+                                         width, bbox[3] + ROW_MARGIN]
+
+        return {
+            "referencia": reference,
+            "pagina": page_num,
+            "bbox": [round(v, 1) for v in bbox],
+            "regiao": region,
+            "chamada": callout,
+            "recorte": {"pagina": crop_page, "bbox": [round(v, 1) for v in crop]},
+            "imagem": image_url(crop_page, crop),
+        }
+
+
+def load_locations(path=output_file):
+    """{referência: localização} gravado por este script ({} se não existir)"""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("pecas", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Localiza as referências de peças nas páginas e figuras")
+    parser.add_argument("--pdf", default=str(pdf_path))
+    parser.add_argument("--spares", default=str(spares_file), help="saída de extract_mk4_spares_advanced.py")
+    parser.add_argument("--output", default=str(output_file))
+    parser.add_argument("--workers", type=int, default=1, help="processos para construir a geometria")
+    args = parser.parse_args()
+
+    print(f"\n📍 Localização das peças de {Path(args.pdf).name}...\n")
+    for path in (args.pdf, args.spares):
+        if not Path(path).exists():
+            print(f"❌ {path} não encontrado")
+            exit(1)
+    with open(args.spares, encoding="utf-8") as f:
+        spares_data = json.load(f)
+
+    began = time.perf_counter()
+    store = GeometryStore.open(args.pdf, workers=args.workers)
+    locator = PartLocator(store)
+
+    # Spares primeiro (têm número de item para as chamadas), depois as restantes referências
+    wanted = {}
+    for spare in spares_data.get("spares", []):
+        reference = spare.get("refFabricante", "").strip()
+        if reference and reference not in wanted:
+            wanted[reference] = (spare.get("paginas") or [spare.get("pagina")], spare.get("numero"))
+    for entry in spares_data.get("referencias", []):
+        wanted.setdefault(entry["referencia"], (entry["paginas"], None))
+    for reference in spares_data.get("referencias_encontradas", []):
+        wanted.setdefault(reference, (None, None))
+
+    locations = {}
+    for reference, (pages, number) in wanted.items():
+        if len(reference) < 3:
+            continue
+        location = locator.locate(reference, [p for p in pages or [] if p] or None, number)
+        if location:
+            locations[reference] = location
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "manual": "MK IV",
+            "arquivo": args.pdf,
+            "referencias": len(wanted),
+            "localizadas": len(locations),
+            "pecas": locations,
+        }, f, indent=2, ensure_ascii=False)
+
+    with_region = sum(1 for loc in locations.values() if loc["regiao"])
+    with_callout = sum(1 for loc in locations.values() if loc["chamada"])
+    print(f"  {len(locations)} de {len(wanted)} referências localizadas "
+          f"({with_region} com figura, {with_callout} com chamada) em "
+          f"{time.perf_counter() - began:.2f}s")
+    for location in list(locations.values())[:10]:
+        region = location["regiao"]
+        print(f"   • {location['referencia']:<16} pág. {location['pagina']:>3} → "
+              f"{region['tipo'] + ' pág. ' + str(region['pagina']) if region else 'linha'}  "
+              f"{location['imagem']}")
+    print(f"\n✅ Localizações → {args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Padrões de referências de fabricante, partilhados pelos extratores e pelo índice
+
+Sem dependências além de `re`: extract_mk4_spares_advanced.py, parts_list.py
+e part_index.py usam as mesmas regras, e import_mk4_spares.py resolve os
+aliases sem carregar o PyMuPDF nem o OCR.
+"""
+
+import re
+
+# Referências de fabricante: rotuladas (P/N, Part No, Ref, Código), códigos tipo
+# BT17/LR07 e códigos numéricos longos -- uma só expressão por página
+REFERENCE_PATTERN = re.compile(
+    r'(?i:\b(?:P/NO?|PART\s*(?:NO|NUMBER)|REF(?:ERENCE)?|C[ÓO]DIGO)\b\.?\s*[:#]?\s*)'
+    r'(?P<rotulada>[A-Z0-9][A-Z0-9\-./]*\d[A-Z0-9\-./]*)'
+    r'|\b(?P<codigo>[A-Z]{2}\d{2,})\b'
+    r'|\b(?P<numerica>\d{8,})\b'
+)
+MAX_REFERENCE_LENGTH = 20
+
+# Célula de uma lista de peças só com um código (uma ou duas palavras)
+PART_NUMBER_PATTERN = re.compile(r'^[A-Z0-9][A-Z0-9\-./]*(?: [A-Z0-9\-./]+)?$')
+# Datas (12.03.2019, 1/4/21) e números de secção (3.2.1) não são referências
+NOT_PART_NUMBER = re.compile(r'^(?:\d{1,2}[./-]\d{1,2}[./-]\d{2,4}|\d{1,2}(?:\.\d{1,2})+\.?)$')
+# Letras e algarismos mínimos ('4.E.' é um número de secção, 'BT-1' uma referência)
+MIN_PART_NUMBER_ALNUM = 3
+
+
+def is_part_number(text):
+    """Código com algarismos: letras e algarismos, separadores, ou 5+ algarismos"""
+    if not PART_NUMBER_PATTERN.match(text) or not any(c.isdigit() for c in text):
+        return False
+    if NOT_PART_NUMBER.match(text) or sum(c.isalnum() for c in text) < MIN_PART_NUMBER_ALNUM:
+        return False
+    compact = text.replace(" ", "")
+    return len(compact) >= 4 and (not compact.isdigit() or len(compact) >= 5)
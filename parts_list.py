@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Listas de peças a partir da geometria das palavras (get_text("words"))
+
+O texto corrido do PyMuPDF raramente mantém os espaços ou tabulações entre
+colunas, pelo que as expressões por linha (extract_mk4_spares_advanced.py)
+perdem a maior parte das linhas de uma lista de peças. Aqui usam-se as
+caixas das palavras e as funções NumPy de ocr_tables.py:
+
+  1. linhas e células: mesmo agrupamento das tabelas do OCR (centros
+     verticais, intervalos horizontais maiores do que um espaço);
+  2. entradas: linhas com uma célula de descrição e uma referência (código
+     com algarismos, ex: BT17, 12-345, 0123456); blocos de pelo menos
+     `MIN_ROWS` entradas próximas, com até `MAX_WRAP_LINES` linhas soltas
+     entre elas (descrições partidas);
+  3. colunas: projeção horizontal das células das entradas; o papel de cada
+     coluna (item, descrição, referência, quantidade) vem do cabeçalho
+     (ITEM, DESCRIPTION, PART NO, QTY) quando existe, e do conteúdo caso
+     contrário;
+  4. linhas soltas entre duas entradas, só com texto dentro dos limites da
+     coluna da descrição e sem referências, são juntas à descrição da
+     entrada anterior; linhas depois da última entrada não entram no bloco.
+
+Cada linha é {"item", "descricao", "referencia", "qtd", "pagina"} (item e
+qtd podem ser None).
+
+Uso: python parts_list.py ["MARCAS/LR05.pdf" ...] [--pages 1-40] [--output pecas.json]
+  Sem argumentos percorre o MK IV, o LR05 e o LR97.
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ocr_tables import CELL_GAP, MIN_COLUMNS, MIN_ROWS, ROW_GAP, ROW_TOLERANCE, \
+    build_grid, cluster_rows, column_bounds, group_cells
+from page_source import PageSource, parse_page_range
+from part_numbers import is_part_number
+
+DEFAULT_MANUALS = [
+    Path("MARCAS/SURVIVA MKIV/MK IV.pdf"),
+    Path("MARCAS/LR05.pdf"),
+    Path("MARCAS/LR97.pdf"),
+]
+
+# Linhas soltas (descrição partida) aceites entre duas entradas
+MAX_WRAP_LINES = 3
+
+ITEM_PATTERN = re.compile(r'^\d{1,3}[A-Za-z]?[.)]?$')
+QTY_PATTERN = re.compile(r'^(?:\d{1,3}|A/?R)$', re.IGNORECASE)
+# Cabeçalhos por papel (por ordem: 'PART NO' é referência, não item)
+HEADER_PATTERNS = [
+    ("qtd", re.compile(r'\b(?:QTY|QUANTITY|QUANT|QTD|QTE)\b', re.IGNORECASE)),
+    ("referencia", re.compile(r'\b(?:PART|P/N|REF|CODE|C[ÓO]DIGO)', re.IGNORECASE)),
+    ("descricao", re.compile(r'\b(?:DESCRIPTION|DESCRI[ÇC][ÃA]O|DESIGNATION|NAME|NOME)\b', re.IGNORECASE)),
+    ("item", re.compile(r'^(?:ITEM|POS|FIG|N[º°O]\.?)\b', re.IGNORECASE)),
+]
+
+
+def is_description(text):
+    return sum(c.isalpha() for c in text) >= 3 and not is_part_number(text)
+
+
+def header_roles(cells):
+    """Textos do cabeçalho por coluna -> {papel: coluna}"""
+    roles = {}
+    for column, text in enumerate(cells):
+        for role, pattern in HEADER_PATTERNS:
+            if text and role not in roles and pattern.search(text):
+                roles[role] = column
+                break
+    return roles
+
+
+def content_roles(entries):
+    """Papéis das colunas pelo conteúdo das entradas (grelha de texto)"""
+    columns = list(zip(*entries))
+
+    def share(column, test):
+        filled = [text for text in columns[column] if text]
+        return sum(bool(test(text)) for text in filled) / len(filled) if filled else 0.0
+
+    roles = {}
+    parts = [share(c, is_part_number) for c in range(len(columns))]
+    if max(parts) < 0.5:
+        return roles
+    roles["referencia"] = int(np.argmax(parts))
+    letters = [np.mean([sum(ch.isalpha() for ch in text) for text in columns[c]])
+               if c != roles["referencia"] else -1 for c in range(len(columns))]
+    roles["descricao"] = int(np.argmax(letters))
+    for c in range(len(columns)):
+        if c in roles.values():
+            continue
+        # Números pequenos: à esquerda da descrição é o item, à direita a quantidade
+        if c < roles["descricao"] and "item" not in roles and share(c, ITEM_PATTERN.match) >= 0.8:
+            roles["item"] = c
+        elif c > roles["descricao"] and share(c, QTY_PATTERN.match) >= 0.8:
+            roles["qtd"] = c
+    return roles
+
+
+def find_blocks(is_entry, tops, bottoms, max_gap, min_rows=MIN_ROWS):
+    """Grupos de linhas (entradas próximas e linhas soltas entre elas, nunca depois da última)"""
+    blocks, current, loose = [], [], []
+    for row in range(len(is_entry)):
+        close = bool(current) and tops[row] - bottoms[row - 1] <= max_gap
+        if is_entry[row]:
+            if close:
+                current += loose + [row]
+            else:
+                blocks.append(current)
+                current = [row]
+            loose = []
+        elif close and len(loose) < MAX_WRAP_LINES:
+            loose.append(row)
+        else:
+            blocks.append(current)
+            current, loose = [], []
+    blocks.append(current)
+    return [block for block in blocks if is_entry[block].sum() >= min_rows] if blocks else []
+
+
+def parse_words(words, page_num=None, min_rows=MIN_ROWS):
+    """Palavras [x0, y0, x1, y1, palavra] de uma página -> linhas da lista de peças"""
+    if len(words) < min_rows * MIN_COLUMNS:
+        return []
+    text = np.array([str(w[4]) for w in words], dtype=object)
+    boxes = np.array([w[:4] for w in words], dtype=float)
+    height = float(np.median(boxes[:, 3] - boxes[:, 1]))
+    rows = cluster_rows(boxes, ROW_TOLERANCE * height)
+    texts, cells, cell_rows = group_cells(text, boxes, rows, CELL_GAP * height)
+
+    row_count = cell_rows.max() + 1
+    counts = np.bincount(cell_rows, minlength=row_count)
+    tops = np.full(row_count, np.inf)
+    bottoms = np.full(row_count, -np.inf)
+    np.minimum.at(tops, cell_rows, cells[:, 1])
+    np.maximum.at(bottoms, cell_rows, cells[:, 3])
+    # Entrada: pelo menos duas células, uma com referência e outra com texto
+    has_part = np.zeros(row_count, dtype=bool)
+    has_text = np.zeros(row_count, dtype=bool)
+    for cell_text, row in zip(texts, cell_rows):
+        if is_part_number(cell_text):
+            has_part[row] = True
+        elif is_description(cell_text):
+            has_text[row] = True
+    is_entry = (counts >= MIN_COLUMNS) & has_part & has_text
+
+    parsed = []
+    max_gap = ROW_GAP * height
+    for block in find_blocks(is_entry, tops, bottoms, max_gap, min_rows):
+        # Cabeçalho: linha imediatamente acima da primeira entrada
+        first = block[0]
+        header = first > 0 and tops[first] - bottoms[first - 1] <= max_gap
+        block = np.array(([first - 1] if header else []) + block)
+
+        entry_cells = np.flatnonzero(np.isin(cell_rows, block[is_entry[block]]))
+        columns = column_bounds(cells[entry_cells], counts[cell_rows[entry_cells]])
+        if len(columns) < MIN_COLUMNS:
+            continue
+        inside = np.flatnonzero(np.isin(cell_rows, block))
+        raw = build_grid([texts[i] for i in inside], cells[inside],
+                         np.searchsorted(block, cell_rows[inside]), columns)
+        grid = [["" if cell is None else cell for cell in row] for row in raw]
+        entry_rows = [grid[i] for i, row in enumerate(block) if is_entry[row]]
+
+        roles = header_roles(grid[0]) if header else {}
+        if "referencia" not in roles or "descricao" not in roles:
+            roles = content_roles(entry_rows)
+        if "referencia" not in roles:
+            continue
+        description = roles["descricao"]
+        left, right = columns[description] + np.array([-height, height])
+
+        def continues(row, raw_row):
+            """Linha solta só com texto dentro da coluna da descrição (sem células fundidas)"""
+            row_cells = np.flatnonzero(cell_rows == row)
+            return (raw_row[description] and None not in raw_row
+                    and not any(cell for c, cell in enumerate(raw_row) if c != description)
+                    and cells[row_cells, 0].min() >= left and cells[row_cells, 2].max() <= right
+                    and not any(is_part_number(texts[i]) for i in row_cells))
+
+        current = None
+        for row, cells_text, raw_row in zip(block, grid, raw):
+            values = {role: cells_text[column] or None for role, column in roles.items()}
+            if is_entry[row] and values["referencia"]:
+                current = {
+                    "item": values.get("item"),
+                    "descricao": cells_text[description],
+                    "referencia": values["referencia"],
+                    "qtd": values.get("qtd"),
+                    "pagina": page_num,
+                }
+                parsed.append(current)
+            elif current is not None and not is_entry[row] and continues(row, raw_row):
+                # Descrição partida: continua a da entrada anterior
+                current["descricao"] = f"{current['descricao']} {cells_text[description]}".strip()
+    return [row for row in parsed if row["descricao"]]
+
+
+def parse_manual(pdf_path, pages=None, workers=1):
+    """Linhas da lista de peças de todas as páginas de um manual (palavras em cache)"""
+    with PageSource(pdf_path) as source:
+        pages = parse_page_range(pages, len(source)) if isinstance(pages, str) else pages
+        rows = []
+        for record in source.pages(pages, workers=workers, words=True):
+            rows.extend(parse_words(record["palavras"], record["pagina"]))
+        return rows, len(source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listas de peças pela geometria das palavras")
+    parser.add_argument("pdfs", nargs="*", help="manuais (omissão: MK IV, LR05, LR97)")
+    parser.add_argument("--pages", help="intervalo de páginas, ex: 1-40")
+    parser.add_argument("--workers", type=int, default=1, help="processos para ler páginas fora da cache")
+    parser.add_argument("--output", help="grava as linhas em JSON")
+    args = parser.parse_args()
+
+    pdf_files = [Path(p) for p in args.pdfs] or DEFAULT_MANUALS
+    print(f"\n📋 Listas de peças por geometria ({len(pdf_files)} manual(is))\n")
+
+    result = {}
+    start = time.perf_counter()
+    for pdf_path in pdf_files:
+        if not pdf_path.exists():
+            print(f"  ⚠️  {pdf_path} não encontrado")
+            continue
+        began = time.perf_counter()
+        rows, page_count = parse_manual(pdf_path, args.pages, args.workers)
+        pages_with_rows = len({row["pagina"] for row in rows})
+        print(f"  📄 {pdf_path.name}: {len(rows)} linha(s) em {pages_with_rows} de "
+              f"{page_count} páginas ({time.perf_counter() - began:.2f}s)")
+        for row in rows[:5]:
+            print(f"     {row['item'] or '-':>4}  {row['descricao'][:40]:<40}  "
+                  f"{row['referencia']:<16} {row['qtd'] or ''}")
+        result[str(pdf_path)] = rows
+
+    print(f"\n✅ {sum(map(len, result.values()))} linha(s) em {time.perf_counter() - start:.2f}s")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"   Linhas → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Cache persistente de extração de páginas PDF (endereçado por conteúdo)
+
+Chave: (SHA-256 do PDF, número da página, extrator + opções)
+Guarda texto (e a sua forma normalizada), palavras e tabelas de cada página numa base SQLite local,
+partilhada por todos os scripts que leem os manuais em MARCAS/.
+Uma segunda execução sobre um manual inalterado é apenas uma consulta.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from keyword_matcher import normalize
+
+CACHE_PATH = Path(os.environ.get("PDF_CACHE_PATH", ".cache/paginas.sqlite"))
+
+_hash_memo = {}
+
+
+def file_sha256(path):
+    """SHA-256 do ficheiro, memorizado por (caminho, tamanho, mtime)"""
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if key not in _hash_memo:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _hash_memo[key] = digest.hexdigest()
+    return _hash_memo[key]
+
+
+def extractor_key(extractor, options=None):
+    """Identificador estável do extrator + opções (ex: 'pdfplumber:{"layout": true}')"""
+    return f"{extractor}:{json.dumps(options or {}, sort_keys=True)}"
+
+
+class PageCache:
+    """Armazenamento SQLite de registos de página já extraídos"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documentos (
+                sha256 TEXT PRIMARY KEY,
+                paginas INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS paginas (
+                sha256 TEXT NOT NULL,
+                pagina INTEGER NOT NULL,
+                extrator TEXT NOT NULL,
+                dados TEXT NOT NULL,
+                PRIMARY KEY (sha256, pagina, extrator)
+            ) WITHOUT ROWID;
+        """)
+
+    def page_count(self, pdf_hash):
+        row = self.conn.execute(
+            "SELECT paginas FROM documentos WHERE sha256 = ?", (pdf_hash,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_page_count(self, pdf_hash, total):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documentos (sha256, paginas) VALUES (?, ?)",
+            (pdf_hash, total),
+        )
+        self.conn.commit()
+
+    def get(self, pdf_hash, page_num, extractor):
+        row = self.conn.execute(
+            "SELECT dados FROM paginas WHERE sha256 = ? AND pagina = ? AND extrator = ?",
+            (pdf_hash, page_num, extractor),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, pdf_hash, extractor):
+        """Todos os registos de um documento para um extrator: {pagina: dados}"""
+        rows = self.conn.execute(
+            "SELECT pagina, dados FROM paginas WHERE sha256 = ? AND extrator = ?",
+            (pdf_hash, extractor),
+        )
+        return {pagina: json.loads(dados) for pagina, dados in rows}
+
+    def put_many(self, pdf_hash, extractor, records):
+        """Grava {pagina: dados} numa única transação"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO paginas (sha256, pagina, extrator, dados) VALUES (?, ?, ?, ?)",
+            [
+                (pdf_hash, page_num, extractor, json.dumps(data, ensure_ascii=False))
+                for page_num, data in records.items()
+            ],
+        )
+        self.conn.commit()
+
+    def put(self, pdf_hash, page_num, extractor, data):
+        self.put_many(pdf_hash, extractor, {page_num: data})
+
+    def close(self):
+        self.conn.close()
+
+
+def _extract_pdfplumber(pdf, page_num, fields, options):
+    page = pdf.pages[page_num - 1]
+    record = {}
+    if "texto" in fields:
+        record["texto"] = page.extract_text(**options) or ""
+    if "texto_norm" in fields:
+        record["texto_norm"] = normalize(record.get("texto") or page.extract_text(**options) or "")
+    if "palavras" in fields:
+        record["palavras"] = [
+            [w["x0"], w["top"], w["x1"], w["bottom"], w["text"]]
+            for w in page.extract_words()
+        ]
+    if "tabelas" in fields:
+        record["tabelas"] = page.extract_tables()
+    return record
+
+
+def _extract_pymupdf(doc, page_num, fields, options):
+    page = doc[page_num - 1]
+    record = {}
+    if "texto" in fields:
+        record["texto"] = page.get_text(**options)
+    if "texto_norm" in fields:
+        record["texto_norm"] = normalize(record.get("texto") or page.get_text(**options))
+    if "palavras" in fields:
+        record["palavras"] = [list(w[:5]) for w in page.get_text("words")]
+    if "tabelas" in fields:
+        # PyMuPDF sem deteção de tabelas: o extrator pdfplumber é o indicado
+        record["tabelas"] = []
+    if "reguas" in fields:
+        record["reguas"] = count_rulings(page)
+    return record
+
+
+def count_rulings(page, tolerance=1.0, drawings=None):
+    """Conta segmentos horizontais/verticais desenhados (retângulos contam 4)"""
+    total = 0
+    for path in page.get_drawings() if drawings is None else drawings:
+        for item in path["items"]:
+            if item[0] == "l":
+                p1, p2 = item[1], item[2]
+                if abs(p1.x - p2.x) <= tolerance or abs(p1.y - p2.y) <= tolerance:
+                    total += 1
+            elif item[0] in ("re", "qu"):
+                total += 4
+    return total
+
+
+def _open_pdf(pdf_path, extractor):
+    if extractor == "pdfplumber":
+        import pdfplumber
+        pdf = pdfplumber.open(str(pdf_path))
+        return pdf, len(pdf.pages), _extract_pdfplumber
+    if extractor == "pymupdf":
+        import fitz  # PyMuPDF
+        doc = fitz.open(str(pdf_path))
+        return doc, doc.page_count, _extract_pymupdf
+    raise ValueError(f"Extrator desconhecido: {extractor}")
+
+
+def _extract_range(pdf_path, extractor, options, todo):
+    """Worker: abre o PDF uma vez e extrai {pagina: campos em falta} de um bloco"""
+    handle, _, extract_fn = _open_pdf(pdf_path, extractor)
+    try:
+        return {
+            page_num: extract_fn(handle, page_num, lacking, options)
+            for page_num, lacking in todo
+        }
+    finally:
+        handle.close()
+
+
+def _shard(items, workers):
+    """Divide em blocos contíguos (~4 por worker para equilibrar a carga)"""
+    size = max(1, -(-len(items) // (workers * 4)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class CachedPDF:
+    """
+    Acesso página a página a um PDF através do cache.
+
+    O PDF só é aberto no primeiro cache miss; páginas (base 1) e campos já
+    extraídos por qualquer script são servidos diretamente do SQLite.
+    """
+
+    def __init__(self, pdf_path, extractor="pdfplumber", options=None, cache=None):
+        self.pdf_path = Path(pdf_path)
+        self.extractor = extractor
+        self.options = options or {}
+        self.key = extractor_key(extractor, self.options)
+        self.pdf_hash = file_sha256(self.pdf_path)
+        self._own_cache = cache is None
+        self.cache = cache or PageCache()
+        self._handle = None
+        self._extract_fn = None
+        self.total = self.cache.page_count(self.pdf_hash)
+        if self.total is None:
+            self._open()
+            self.cache.set_page_count(self.pdf_hash, self.total)
+
+    def _open(self):
+        if self._handle is None:
+            self._handle, self.total, self._extract_fn = _open_pdf(self.pdf_path, self.extractor)
+
+    def __len__(self):
+        return self.total
+
+    def pages(self, pages=None, fields=("texto",), workers=1):
+        """
+        Registos {'pagina', <campos>} das páginas pedidas (None = todas).
+
+        Com workers > 1 as páginas em falta são repartidas em blocos
+        contíguos por um pool de processos; cada página é visitada uma só
+        vez para todos os campos e o resultado é reunido por ordem.
+        """
+        fields = tuple(fields)
+        wanted = [p for p in (range(1, self.total + 1) if pages is None else pages)
+                  if 1 <= p <= self.total]
+        if len(wanted) > 8:
+            stored = self.cache.get_many(self.pdf_hash, self.key)
+        else:
+            stored = {}
+            for page_num in wanted:
+                record = self.cache.get(self.pdf_hash, page_num, self.key)
+                if record is not None:
+                    stored[page_num] = record
+
+        todo = []
+        for page_num in wanted:
+            lacking = [f for f in fields if f not in stored.get(page_num, {})]
+            if lacking:
+                todo.append((page_num, lacking))
+
+        if todo:
+            if workers > 1 and len(todo) > 1:
+                extracted = {}
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    jobs = [
+                        pool.submit(_extract_range, str(self.pdf_path), self.extractor, self.options, chunk)
+                        for chunk in _shard(todo, workers)
+                    ]
+                    for job in jobs:
+                        extracted.update(job.result())
+            else:
+                self._open()
+                extracted = {
+                    page_num: self._extract_fn(self._handle, page_num, lacking, self.options)
+                    for page_num, lacking in todo
+                }
+            updates = {
+                page_num: {**stored.get(page_num, {}), **extracted[page_num]}
+                for page_num, _ in todo
+            }
+            self.cache.put_many(self.pdf_hash, self.key, updates)
+            stored.update(updates)
+
+        return [
+            {"pagina": page_num, **{f: stored[page_num][f] for f in fields}}
+            for page_num in wanted
+        ]
+
+    def page(self, page_num, fields=("texto",)):
+        return self.pages([page_num], fields)[0]
+
+    def text(self, page_num):
+        return self.page(page_num, ("texto",))["texto"]
+
+    def normalized_text(self, page_num):
+        return self.page(page_num, ("texto_norm",))["texto_norm"]
+
+    def words(self, page_num):
+        return self.page(page_num, ("palavras",))["palavras"]
+
+    def tables(self, page_num):
+        return self.page(page_num, ("tabelas",))["tabelas"]
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self._own_cache:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def extract_pages(pdf_path, extractor="pdfplumber", fields=("texto",), pages=None,
+                  options=None, cache=None, workers=1):
+    """
+    Devolve registos {'pagina', 'texto', 'palavras', 'tabelas'} por página.
+
+    Lê primeiro do cache; o PDF só é aberto se faltar alguma página ou
+    campo pedido, e apenas essas páginas/campos são extraídos e gravados.
+    `pages` é uma lista de números de página (base 1); None = todas.
+    `workers` > 1 reparte as páginas em falta por um pool de processos.
+    """
+    with CachedPDF(pdf_path, extractor, options, cache) as pdf:
+        return pdf.pages(pages, fields, workers)
+
+
+def page_count(pdf_path, cache=None):
+    """Número de páginas do PDF, sem o abrir se já estiver no cache"""
+    with CachedPDF(pdf_path, "pymupdf", cache=cache) as pdf:
+        return len(pdf)
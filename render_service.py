@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Serviço HTTP local de renderização de páginas e recortes, a pedido
+
+Em vez de pré-renderizar todas as páginas de todos os manuais, cada imagem
+é renderizada (PyMuPDF) no primeiro pedido e guardada numa cache em disco
+(.cache/render/) com orçamento de tamanho: quando o total passa
+`--cache-mb`, saem os ficheiros usados há mais tempo (LRU). A chave da
+cache é o SHA-256 de (SHA-256 do PDF, página, DPI, recorte), pelo que um
+PDF alterado não serve imagens antigas; a mesma chave é o ETag, e um
+pedido com If-None-Match recebe 304 sem renderizar nem ler a cache.
+
+Rotas (GET):
+  /api/spares/<manual>/page_NNN.png    caminhos gravados por import_mk4_spares.py
+  /render/<manual>/<página>.png        mesma imagem
+      ?dpi=150                         resolução (36-600)
+      &bbox=x0,y0,x1,y1                recorte em pontos PDF (renderiza só essa área)
+  /manuais                             manuais disponíveis (JSON)
+
+<manual> é um alias (ex: 'mk4') ou o nome do PDF em minúsculas com '-'
+(ex: 'lr97', 'seasava-plus').
+
+Uso: python render_service.py [--host 127.0.0.1] [--port 8765] [--cache-mb 512]
+  A API Next.js (/api/spares/mk4) reencaminha para aqui as páginas que não
+  estão no armazém de imagens quando RENDER_SERVICE_URL está definido.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from manifest import scan_inputs
+from pdf_cache import file_sha256
+
+RENDER_CACHE_DIR = Path(os.environ.get("RENDER_CACHE_DIR", ".cache/render"))
+CACHE_MB = 512
+
+DEFAULT_DPI = 150
+MIN_DPI, MAX_DPI = 36, 600
+
+# Nomes curtos usados pela API e pelos scripts de importação
+MANUAL_ALIASES = {
+    "mk4": Path("MARCAS/SURVIVA MKIV/MK IV.pdf"),
+}
+
+SPARES_ROUTE = re.compile(r"^/api/spares/(?P<manual>[^/]+)/page_(?P<page>\d+)\.png$")
+RENDER_ROUTE = re.compile(r"^/render/(?P<manual>[^/]+)/(?P<page>\d+)(?:\.png)?$")
+
+
+def manual_slug(pdf_path):
+    """'MARCAS/Seasava Plus.pdf' -> 'seasava-plus'"""
+    return re.sub(r"[^a-z0-9]+", "-", Path(pdf_path).stem.lower()).strip("-")
+
+
+def find_manuals():
+    """{slug: caminho} dos documentos de entrada, mais os aliases existentes"""
+    manuals = {manual_slug(path): path for path in scan_inputs()}
+    manuals.update({alias: path for alias, path in MANUAL_ALIASES.items() if path.exists()})
+    return manuals
+
+
+def parse_bbox(value):
+    """'x0,y0,x1,y1' (pontos PDF) -> tupla de floats, ou None"""
+    if not value:
+        return None
+    coords = tuple(float(v) for v in value.split(","))
+    if not all(math.isfinite(v) for v in coords):
+        raise ValueError("bbox com valores não finitos")
+    if len(coords) != 4 or coords[2] <= coords[0] or coords[3] <= coords[1]:
+        raise ValueError("bbox deve ser x0,y0,x1,y1 com x1 > x0 e y1 > y0")
+    return coords
+
+
+def render_key(pdf_path, page_num, dpi, bbox=None):
+    """Chave da cache (e ETag): muda com o conteúdo do PDF e os parâmetros"""
+    clip = ",".join(f"{v:.2f}" for v in bbox) if bbox else "pagina"
+    raw = f"{file_sha256(pdf_path)}:{page_num}:{dpi}:{clip}:png"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class DiskLRU:
+    """Ficheiros em disco com orçamento de bytes; sai o usado há mais tempo"""
+
+    def __init__(self, root=RENDER_CACHE_DIR, budget=CACHE_MB * 1024 * 1024):
+        self.root = Path(root)
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.total = 0
+        # A ordem de uso sobrevive a reinícios através do mtime (tocado em cada acerto)
+        files = sorted(self.root.glob("*/*.png"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            self.entries[path.stem] = path.stat().st_size
+            self.total += self.entries[path.stem]
+
+    def _path(self, key):
+        return self.root / key[:2] / f"{key}.png"
+
+    def get(self, key):
+        """Bytes da entrada (marcada como usada agora), ou None"""
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            os.utime(path)
+            return path.read_bytes()
+        except FileNotFoundError:
+            with self.lock:
+                self.total -= self.entries.pop(key, 0)
+            return None
+
+    def put(self, key, data):
+        """Grava a entrada e remove as mais antigas até caber no orçamento"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        with self.lock:
+            self.total += len(data) - self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            evicted = []
+            while self.total > self.budget and len(self.entries) > 1:
+                old_key, size = self.entries.popitem(last=False)
+                self.total -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._path(old_key).unlink(missing_ok=True)
+
+    def stats(self):
+        with self.lock:
+            return {"ficheiros": len(self.entries), "bytes": self.total, "orcamento": self.budget}
+
+
+class PageRenderer:
+    """
+    Documentos PyMuPDF abertos uma vez. O PyMuPDF não suporta várias threads,
+    nem com documentos diferentes: todas as chamadas passam por um só lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.docs = {}
+
+    def _document(self, pdf_path):
+        """Documento aberto (chamar com o lock)"""
+        import fitz  # PyMuPDF
+
+        key = str(pdf_path)
+        if key not in self.docs:
+            self.docs[key] = fitz.open(key)
+        return self.docs[key]
+
+    def page_count(self, pdf_path):
+        with self.lock:
+            return self._document(pdf_path).page_count
+
+    def render(self, pdf_path, page_num, dpi=DEFAULT_DPI, bbox=None):
+        """
+        PNG da página (1-based) ou só do recorte `bbox` (clip: não renderiza o resto).
+
+        ValueError se o recorte não intersetar a página.
+        """
+        import fitz  # PyMuPDF
+
+        with self.lock:
+            page = self._document(pdf_path)[page_num - 1]
+            clip = None
+            if bbox:
+                clip = fitz.Rect(bbox) & page.rect
+                if clip.is_empty:
+                    size = f"{page.rect.width:.0f} x {page.rect.height:.0f} pt"
+                    raise ValueError(f"bbox fora da página ({size})")
+            pix = page.get_pixmap(dpi=dpi, clip=clip, alpha=False)
+            return pix.tobytes("png")
+
+    def close(self):
+        with self.lock:
+            for doc in self.docs.values():
+                doc.close()
+            self.docs.clear()
+
+
+class RenderService:
+    """Resolve manual/página/recorte, com cache LRU e um só render por chave em curso"""
+
+    def __init__(self, manuals=None, cache=None):
+        self.manuals = find_manuals() if manuals is None else manuals
+        self.cache = cache or DiskLRU()
+        self.renderer = PageRenderer()
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def image(self, manual, page_num, dpi=DEFAULT_DPI, bbox=None):
+        """
+        (chave, bytes PNG, acerto na cache?) de uma página ou recorte.
+
+        LookupError se o manual ou a página não existirem; ValueError se o
+        recorte ficar fora da página.
+        """
+        pdf_path = self.manuals.get(manual)
+        if pdf_path is None:
+            raise LookupError(f"manual desconhecido: {manual}")
+        if not 1 <= page_num <= self.renderer.page_count(pdf_path):
+            raise LookupError(f"página {page_num} fora de {Path(pdf_path).name}")
+
+        key = render_key(pdf_path, page_num, dpi, bbox)
+        data = self.cache.get(key)
+        if data is not None:
+            return key, data, True
+        # Pedidos simultâneos da mesma imagem esperam pelo primeiro render
+        with self.lock:
+            key_lock = self.pending.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                data = self.cache.get(key)
+                if data is None:
+                    data = self.renderer.render(pdf_path, page_num, dpi, bbox)
+                    self.cache.put(key, data)
+                    hit = False
+                else:
+                    hit = True
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+        return key, data, hit
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "RenderService/1.0"
+
+        def _json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == "/manuais":
+                return self._json(HTTPStatus.OK, {
+                    "manuais": {slug: str(path) for slug, path in sorted(service.manuals.items())},
+                    "cache": service.cache.stats(),
+                })
+
+            match = SPARES_ROUTE.match(url.path) or RENDER_ROUTE.match(url.path)
+            if not match:
+                return self._json(HTTPStatus.NOT_FOUND, {"error": "Rota não encontrada"})
+
+            query = parse_qs(url.query)
+            try:
+                dpi = int(query.get("dpi", [DEFAULT_DPI])[0])
+                bbox = parse_bbox(query.get("bbox", [None])[0])
+            except ValueError as e:
+                return self._json(HTTPStatus.BAD_REQUEST, {"error": f"Parâmetros inválidos: {e}"})
+            if not MIN_DPI <= dpi <= MAX_DPI:
+                return self._json(HTTPStatus.BAD_REQUEST,
+                                  {"error": f"DPI deve estar entre {MIN_DPI} e {MAX_DPI}"})
+
+            manual, page_num = match.group("manual"), int(match.group("page"))
+            pdf_path = service.manuals.get(manual)
+            if pdf_path is not None:
+                # O ETag depende só das entradas: revalidação sem render nem leitura
+                etag = f'"{render_key(pdf_path, page_num, dpi, bbox)}"'
+                if etag in self.headers.get("If-None-Match", ""):
+                    self.send_response(HTTPStatus.NOT_MODIFIED)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+            try:
+                key, data, hit = service.image(manual, page_num, dpi, bbox)
+            except LookupError as e:
+                return self._json(HTTPStatus.NOT_FOUND, {"error": str(e)})
+            except ValueError as e:
+                return self._json(HTTPStatus.BAD_REQUEST, {"error": f"Parâmetros inválidos: {e}"})
+
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("ETag", f'"{key}"')
+            self.send_header("Cache-Control", "public, max-age=86400")
+            self.send_header("X-Cache", "HIT" if hit else "MISS")
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renderização de páginas a pedido, com cache LRU")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-mb", type=int, default=CACHE_MB, help="orçamento da cache em disco")
+    args = parser.parse_args()
+
+    service = RenderService(cache=DiskLRU(budget=args.cache_mb * 1024 * 1024))
+    stats = service.cache.stats()
+    print(f"\n🖼️  Serviço de renderização em http://{args.host}:{args.port}")
+    print(f"   {len(service.manuals)} manual(is); cache {RENDER_CACHE_DIR}: "
+          f"{stats['ficheiros']} ficheiro(s), {stats['bytes'] / 1e6:.1f} / {args.cache_mb} MB\n")
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 A terminar")
+    finally:
+        server.server_close()
+        service.renderer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,46 @@
 import fitz  # PyMuPDF
 import os
+import sys
 import json
 
-boletins_dir = os.path.join(os.path.dirname(__file__), '../marcas/boletins')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from manifest import Manifest
+
+boletins_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../marcas/boletins')
 output_file = os.path.join(boletins_dir, 'boletins-extract.json')
 
+# Extrações anteriores, reaproveitadas para boletins que não mudaram
+anteriores = {}
+if os.path.exists(output_file):
+    with open(output_file, encoding='utf-8') as f:
+        anteriores = {b['file']: b for b in json.load(f)}
+
+pdfs = sorted(os.path.join(boletins_dir, f) for f in os.listdir(boletins_dir) if f.endswith('.pdf'))
+manifest = Manifest('extract_boletins')
+changes = manifest.changes(pdfs)
+inalterados = {os.path.basename(p) for p in changes['inalterados']}
+
 boletins = []
+reprocessados = 0
+
+for file_path in pdfs:
+    file = os.path.basename(file_path)
+    if file in inalterados and file in anteriores:
+        boletins.append(anteriores[file])
+        continue
+    doc = fitz.open(file_path)
+    text = ''
+    for page in doc:
+        text += page.get_text() + '\n'
+    boletins.append({'file': file, 'text': text})
+    manifest.mark(file_path)
+    reprocessados += 1
 
-for file in os.listdir(boletins_dir):
-    if file.endswith('.pdf'):
-        file_path = os.path.join(boletins_dir, file)
-        doc = fitz.open(file_path)
-        text = ''
-        for page in doc:
-            text += page.get_text() + '\n'
-        boletins.append({'file': file, 'text': text})
+for removed in changes['removidos']:
+    manifest.forget(removed)
+manifest.save()
 
 with open(output_file, 'w', encoding='utf-8') as f:
     json.dump(boletins, f, ensure_ascii=False, indent=2)
 
-print(f'Boletins extraídos: {len(boletins)}')
+print(f'Boletins extraídos: {len(boletins)} ({reprocessados} reprocessados, {len(changes["removidos"])} removidos)')
@@ -1,16 +1,33 @@
 import fitz  # PyMuPDF
 import os
+import sys
 import json
 
-LEGISLACAO_DIR = os.path.join(os.path.dirname(__file__), '..', 'legislaçao')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from manifest import Manifest
+
+LEGISLACAO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'legislaçao')
 OUTPUT_FILE = os.path.join(LEGISLACAO_DIR, 'legislacao_extraida.json')
 
+# Extrações anteriores, reaproveitadas para diplomas que não mudaram
+anteriores = {}
+if os.path.exists(OUTPUT_FILE):
+    with open(OUTPUT_FILE, encoding='utf-8') as f:
+        anteriores = {item['arquivo']: item for item in json.load(f)}
+
+pdfs = sorted(os.path.join(LEGISLACAO_DIR, f) for f in os.listdir(LEGISLACAO_DIR) if f.lower().endswith('.pdf'))
+manifest = Manifest('extract_legislacao')
+changes = manifest.changes(pdfs)
+inalterados = {os.path.basename(p) for p in changes['inalterados']}
+
 result = []
+reprocessados = 0
 
-for fname in os.listdir(LEGISLACAO_DIR):
-    if not fname.lower().endswith('.pdf'):
+for path in pdfs:
+    fname = os.path.basename(path)
+    if fname in inalterados and fname in anteriores:
+        result.append(anteriores[fname])
         continue
-    path = os.path.join(LEGISLACAO_DIR, fname)
     doc = fitz.open(path)
     texto = ""
     for page in doc:
@@ -19,8 +36,14 @@ for fname in os.listdir(LEGISLACAO_DIR):
         'arquivo': fname,
         'texto': texto.strip()
     })
+    manifest.mark(path)
+    reprocessados += 1
+
+for removed in changes['removidos']:
+    manifest.forget(removed)
+manifest.save()
 
 with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
     json.dump(result, f, ensure_ascii=False, indent=2)
 
-print(f'Extração concluída. {len(result)} arquivos processados. Saída: {OUTPUT_FILE}')
+print(f'Extração concluída. {len(result)} arquivos processados ({reprocessados} reextraídos). Saída: {OUTPUT_FILE}')
@@ -45,6 +45,23 @@ async function main() {
     const sparesData = JSON.parse(fs.readFileSync(sparesFile, 'utf-8'))
     const categoria = 'SPARE_PARTS_MK_IV'
 
+    // Página e recorte de cada referência (part_locator.py); sem localização,
+    // a primeira página onde a referência aparece
+    const locationsFile = path.join(__dirname, '..', 'MK_IV_part_locations.json')
+    const locations: Record<string, { imagem: string }> = fs.existsSync(locationsFile)
+      ? JSON.parse(fs.readFileSync(locationsFile, 'utf-8')).pecas ?? {}
+      : {}
+    const referencePages: Record<string, number[]> = Object.fromEntries(
+      (sparesData.referencias || [])
+        .filter((r: unknown) => typeof r === 'object' && r !== null)
+        .map((r: { referencia: string; paginas: number[] }) => [r.referencia, r.paginas])
+    )
+    const imageFor = (ref: string, pagina?: number) => {
+      if (locations[ref]) return locations[ref].imagem
+      const page = pagina ?? referencePages[ref]?.[0]
+      return page ? `/api/spares/mk4/page_${page.toString().padStart(3, '0')}.png` : null
+    }
+
     // Estratégia 1: Importar referências encontradas (Part Numbers)
     const referencias = sparesData.referencias_encontradas || []
     let refAdicionadas = 0
@@ -72,12 +89,7 @@ async function main() {
       // Gerar nome a partir da referência
       const nome = `MK IV Spare Part - ${ref.toUpperCase()}`
       
-      // Tentar mapear para uma página de imagem
-      const imagemPages = sparesData.imagens_por_pagina || {}
-      const paginas = Object.keys(imagemPages)
-      const imagemPath = paginas.length > 0 
-        ? `/api/spares/mk4/${paginas[Math.floor(Math.random() * paginas.length)]}`
-        : null
+      const imagemPath = imageFor(ref.trim())
 
       // Criar item no stock
       await client.query(
@@ -127,9 +139,7 @@ async function main() {
         continue
       }
 
-      const imagemPath = spare.pagina 
-        ? `/api/spares/mk4/page_${spare.pagina.toString().padStart(3, '0')}.png`
-        : null
+      const imagemPath = imageFor(spare.refFabricante, spare.pagina)
 
       await client.query(
         `INSERT INTO stock (nome, descricao, categoria, quantidade, "quantidadeMinima", "refFabricante", imagem, lote, status, "createdAt", "updatedAt")
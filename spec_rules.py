@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Motor declarativo de regras de especificações técnicas
+
+Cada regra é um padrão pré-compilado com a grandeza que mede (pressão,
+força, binário, massa, capacidade...), a unidade (fixa ou capturada),
+intervalos plausíveis por unidade e papéis de captura nomeados
+((?P<valor>...), (?P<quantidade>...), (?P<minimo>...)). Todas as regras
+de um RuleSet são unidas numa só expressão e avaliadas numa única
+passagem pelo texto de cada página; cada achado guarda página, linha e
+posição (início/fim) no texto.
+
+Regras mais específicas vêm primeiro: "WEAK LINK 2.2 kN" é uma força da
+regra weak_link, não uma força genérica. Regras que precisam de contexto
+usam lookahead para não consumir o texto seguinte.
+
+Adicionar um manual novo = acrescentar regras (RULES ou RuleSet(RULES + [...])).
+
+Uso: python spec_rules.py "MARCAS/LR05.pdf" [--pages 1-50] [--regra pressao]
+"""
+
+import argparse
+import bisect
+import re
+from collections import defaultdict
+
+from units import canonical_unit
+
+# Número com decimal opcional (ponto ou vírgula)
+NUM = r"\d+(?:[.,]\d+)?"
+
+def parse_number(raw):
+    """'6' -> 6; '2.5' / '2,5' -> 2.5; '1,500' (separador de milhares) -> 1500"""
+    if raw.lstrip("-").isdigit():
+        return int(raw)
+    if re.fullmatch(r"\d{1,3},\d{3}", raw):
+        return int(raw.replace(",", ""))
+    return float(raw.replace(",", "."))
+
+
+class Rule:
+    """Padrão com grandeza, unidade e intervalo plausível"""
+
+    def __init__(self, name, pattern, quantity, unit=None, ranges=None):
+        self.name = name
+        self.pattern = pattern
+        self.quantity = quantity
+        # unit=None -> unidade lida do grupo (?P<unidade>...)
+        self.unit = unit
+        # (min, max) ou {unidade: (min, max)}, aplicado ao papel "valor"
+        self.ranges = ranges
+        self.roles = [r for r in re.compile(pattern).groupindex if r != "unidade"]
+
+    def plausible(self, value, unit):
+        if self.ranges is None or not isinstance(value, (int, float)):
+            return True
+        bounds = self.ranges.get(unit) if isinstance(self.ranges, dict) else self.ranges
+        return bounds is None or bounds[0] <= value <= bounds[1]
+
+    def __repr__(self):
+        return f"Rule({self.name!r}, {self.quantity!r})"
+
+
+# Registo de regras partilhado pelos scripts de especificações (ordem = prioridade)
+RULES = [
+    # Forças de davit launch com palavra-chave antes do valor
+    Rule("weak_link",
+         rf"(?:weak\s*link|safety\s*chain|breaking\s*strength)[\s:=]*(?P<valor>{NUM})\s*"
+         r"(?P<unidade>kN|lbf|kgf|N)\b",
+         "forca", ranges={"kN": (1, 15), "lbf": (200, 3500), "kgf": (100, 1600)}),
+    Rule("bridle_peso",
+         rf"bridle(?:[^\n]*?(?:weight|max))?[\s:=]*(?P<valor>{NUM})\s*(?P<unidade>kg|lbs?)\b",
+         "massa"),
+
+    # Cilindros: "2 x 160g", "1 X 350 G", "3.4 kg CO2"
+    Rule("cilindro_co2",
+         rf"\b(?P<quantidade>\d+)\s*[x×]\s*(?P<valor>{NUM})\s*(?P<unidade>g|gr|grams?|kg)\b",
+         "massa_co2", ranges={"g": (50, 5000), "kg": (0.05, 50)}),
+    Rule("massa_co2", rf"(?P<valor>{NUM})\s*(?P<unidade>kg|g)\s*co2",
+         "massa_co2", ranges={"g": (50, 50000), "kg": (0.05, 50)}),
+    # O valor faz parte do achado (início/fim e texto cobrem "N2 ... 30 g")
+    Rule("cilindro_n2", rf"\bN2\b[^\n]*?(?P<valor>{NUM})\s*(?P<unidade>g)\b",
+         "massa_n2"),
+    Rule("referencia", r"\bREF[:\s]+(?P<valor>[A-Z0-9\-]+)", "referencia", unit=""),
+
+    # Intervalos e dimensões (parse_manual_data.py)
+    Rule("capacidade_faixa",
+         r"(?:capacity|capacidade|persons?|pessoas?|occupants?)[:\s]+(?P<minimo>\d+)\s*"
+         r"(?:to|para|–|-)\s*(?P<maximo>\d+)",
+         "capacidade", unit="pessoas", ranges=(1, 150)),
+    Rule("temperatura",
+         r"temperature[:\s]+(?:from|de)?\s*(?P<minimo>-?\d+)\s*(?:to|até|°|a)\s*\+?"
+         r"(?P<maximo>\d+)\s*°?[CD]",
+         "temperatura", unit="°C"),
+    Rule("dimensao",
+         rf"(?:dimension|length|comprimento)[:\s]+(?P<comprimento>{NUM})\s*[x×]\s*"
+         rf"(?P<largura>{NUM})(?:\s*[x×]\s*(?P<altura>{NUM}))?",
+         "dimensao", unit=""),
+    Rule("peso",
+         rf"(?:weight|peso)[:\s]+(?:approx\.|aprox\.)?\s*(?P<valor>{NUM})\s*(?:kg|kilograms?)\b",
+         "massa", unit="kg"),
+
+    # Capacidade com lançamento por davit na mesma linha
+    Rule("capacidade_davit", r"\b(?P<valor>\d+)\s*(?:persons?|man)\b(?=[^\n]*?davit)",
+         "capacidade", unit="pessoas", ranges=(4, 100)),
+    Rule("capacidade",
+         r"\b(?P<valor>\d{1,3})\s*(?:persons?|people|pessoas?|pers|man|p)\b",
+         "capacidade", unit="pessoas", ranges=(4, 100)),
+
+    # Válvulas: OTS-65, VALVE A10, A-10 / B10
+    Rule("valvula_ots", r"\bOTS\s*-?\s*(?P<valor>\d+)\b", "valvula", unit=""),
+    Rule("valvula", r"\bVALVE\s+(?P<valor>(?=[A-Z\-]*\d)[A-Z0-9\-]+)\b", "valvula", unit=""),
+    # Só maiúsculas: o conjunto é compilado com IGNORECASE e 'd2', 'a1' não são válvulas
+    Rule("valvula_letra", r"(?-i:\b(?P<letra>[ABCD])-?(?P<numero>\d+)\b)", "valvula", unit=""),
+
+    # Grandezas genéricas por unidade
+    Rule("pressao",
+         rf"(?P<valor>{NUM})\s*(?P<unidade>psi|mm\s*W\.?\s*G|mm\s*H2O|"
+         r"in(?:ches|\.)?\s*H2O|mbar|mb|hPa|bar)\b",
+         "pressao", ranges={"psi": (0.5, 10), "mmWG": (300, 7000), "inH2O": (10, 280),
+                            "mbar": (30, 700), "hPa": (30, 700), "bar": (0.03, 0.7)}),
+    Rule("binario",
+         rf"(?P<valor>{NUM})\s*(?P<unidade>N\.?\s?m|in\.?\s*-?\s*lbs?)\b",
+         "binario", ranges={"Nm": (0.5, 200), "in-lb": (4, 1800)}),
+    Rule("forca", rf"(?P<valor>{NUM})\s*(?P<unidade>kN|lbf|kgf)\b",
+         "forca", ranges={"kN": (1, 15), "lbf": (200, 3500), "kgf": (100, 1600)}),
+    Rule("massa", rf"(?P<valor>{NUM})\s*(?P<unidade>kg|kilograms?|lbs?)\b",
+         "massa", ranges={"kg": (0.01, 2000), "lb": (0.02, 4400)}),
+]
+
+
+class RuleSet:
+    """Conjunto de regras compilado numa única expressão (uma passagem por página)"""
+
+    def __init__(self, rules=None):
+        self.rules = list(RULES if rules is None else rules)
+        parts = []
+        for index, rule in enumerate(self.rules):
+            # Prefixar os grupos com o índice da regra para serem únicos na união
+            body = re.sub(r"\(\?P<(\w+)>", rf"(?P<r{index}_\1>", rule.pattern)
+            parts.append(f"(?P<r{index}>{body})")
+        self.regex = re.compile("|".join(parts), re.IGNORECASE)
+
+    def select(self, *names):
+        """Novo RuleSet só com as regras indicadas (mantendo a prioridade)"""
+        return RuleSet([r for r in self.rules if r.name in names])
+
+    def scan(self, text, page=None):
+        """Todos os achados do texto, por ordem de posição"""
+        text = text or ""
+        newlines = [m.start() for m in re.finditer("\n", text)]
+        findings = []
+        for match in self.regex.finditer(text):
+            index = int(match.lastgroup[1:])
+            rule = self.rules[index]
+            groups = {
+                role: match.group(f"r{index}_{role}") for role in rule.roles
+            }
+            if rule.unit is not None:
+                unit = rule.unit
+            else:
+                unit = canonical_unit(match.group(f"r{index}_unidade"))
+
+            finding = {
+                "regra": rule.name,
+                "grandeza": rule.quantity,
+                "valor": None,
+                "unidade": unit,
+                "pagina": page,
+                "linha": bisect.bisect_left(newlines, match.start()),
+                "inicio": match.start(),
+                "fim": match.end(),
+                "texto": match.group(0).strip(),
+            }
+            for role, raw in groups.items():
+                if raw is None:
+                    continue
+                try:
+                    finding[role] = parse_number(raw)
+                except ValueError:
+                    finding[role] = raw.upper()
+            finding["plausivel"] = all(
+                rule.plausible(finding[role], unit)
+                for role in ("valor", "minimo", "maximo") if role in finding
+            )
+            findings.append(finding)
+        return findings
+
+    def scan_pages(self, pages):
+        """Achados de registos {'pagina', 'texto'} (PageSource.pages())"""
+        findings = []
+        for record in pages:
+            findings.extend(self.scan(record["texto"], record["pagina"]))
+        return findings
+
+
+DEFAULT_RULES = RuleSet()
+
+# Marcadores de página dos .txt gerados pelos extratores ("--- PÁGINA 3 ---",
+# "=== PÁGINA 3 ===" ou "PÁGINA 3" entre linhas de "=")
+PAGE_MARKER = re.compile(r"^[-=]*\s*P[ÁA]GINA (\d+)\s*[-=]*$\n(?:=+$\n)?", re.MULTILINE)
+
+
+def split_pages(text):
+    """Texto com marcadores de página -> registos {'pagina', 'texto'}"""
+    markers = list(PAGE_MARKER.finditer(text))
+    if not markers:
+        return [{"pagina": None, "texto": text}]
+    return [
+        {"pagina": int(m.group(1)),
+         "texto": text[m.end():markers[i + 1].start() if i + 1 < len(markers) else len(text)]}
+        for i, m in enumerate(markers)
+    ]
+
+
+def scan(text, page=None):
+    """Atalho: regras por omissão sobre um texto"""
+    return DEFAULT_RULES.scan(text, page)
+
+
+def select(findings, regra=None, grandeza=None, unidade=None, plausible=True):
+    """Filtra achados por regra(s), grandeza e unidade"""
+    if isinstance(regra, str):
+        regra = (regra,)
+    return [
+        f for f in findings
+        if (regra is None or f["regra"] in regra)
+        and (grandeza is None or f["grandeza"] == grandeza)
+        and (unidade is None or f["unidade"] == unidade)
+        and (f["plausivel"] or not plausible)
+    ]
+
+
+def values(findings, role="valor", **filters):
+    """Valores (únicos, por ordem de aparição) de um papel nos achados filtrados"""
+    seen = []
+    for f in select(findings, **filters):
+        if f.get(role) is not None and f[role] not in seen:
+            seen.append(f[role])
+    return seen
+
+
+def by_unit(findings, **filters):
+    """{unidade: [valores]} dos achados filtrados"""
+    grouped = defaultdict(list)
+    for f in select(findings, **filters):
+        if f["valor"] is not None and f["valor"] not in grouped[f["unidade"]]:
+            grouped[f["unidade"]].append(f["valor"])
+    return dict(grouped)
+
+
+def main():
+    from page_source import PageSource, parse_page_range
+
+    parser = argparse.ArgumentParser(description="Aplica as regras de especificações a um PDF")
+    parser.add_argument("pdf")
+    parser.add_argument("--pages", help="intervalo de páginas, ex: 1-50")
+    parser.add_argument("--regra", action="append", help="só estas regras (repetível)")
+    parser.add_argument("--todos", action="store_true", help="inclui valores fora do intervalo")
+    args = parser.parse_args()
+
+    rules = DEFAULT_RULES.select(*args.regra) if args.regra else DEFAULT_RULES
+    with PageSource(args.pdf) as source:
+        pages = source.pages(parse_page_range(args.pages, len(source)))
+    findings = select(rules.scan_pages(pages), plausible=not args.todos)
+
+    print(f"\n🔎 {len(findings)} achado(s) em {args.pdf}\n")
+    for f in findings:
+        extra = {k: v for k, v in f.items() if k not in (
+            "regra", "grandeza", "valor", "unidade", "pagina", "linha",
+            "inicio", "fim", "texto", "plausivel")}
+        valor = f["valor"] if f["valor"] is not None else extra
+        print(f"  pág. {f['pagina']:>3} l.{f['linha']:<3} {f['regra']:<18} "
+              f"{valor} {f['unidade'] or ''}   «{' '.join(f['texto'].split())}»")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,49 @@ import path from 'path'
 
 export const dynamic = 'force-dynamic'
 
+// Renderiza a pedido (render_service.py) uma página ou um recorte (?bbox=x0,y0,x1,y1);
+// null se o serviço não estiver configurado, não responder ou recusar o pedido
+async function renderFromService(request: NextRequest, fileName: string, crop: boolean) {
+  const renderService = process.env.RENDER_SERVICE_URL
+  if (!renderService) {
+    return null
+  }
+  const query = new URLSearchParams()
+  for (const key of crop ? ['bbox', 'dpi'] : ['dpi']) {
+    const value = request.nextUrl.searchParams.get(key)
+    if (value) query.set(key, value)
+  }
+  const search = query.toString() ? `?${query}` : ''
+  let rendered: Response
+  try {
+    rendered = await fetch(`${renderService}/api/spares/mk4/${fileName}${search}`, {
+      headers: { 'If-None-Match': request.headers.get('if-none-match') ?? '' },
+    })
+  } catch (error) {
+    console.warn('Serviço de renderização indisponível:', error)
+    return null
+  }
+  if (rendered.status !== 304 && !rendered.ok) {
+    return null
+  }
+  const headers: Record<string, string> = { 'Cache-Control': 'public, max-age=86400' }
+  const etag = rendered.headers.get('etag')
+  if (etag) headers['ETag'] = etag
+  if (rendered.status === 304) {
+    return new NextResponse(null, { status: 304, headers })
+  }
+  headers['Content-Type'] = 'image/png'
+  return new NextResponse(Buffer.from(await rendered.arrayBuffer()), { headers })
+}
+
 export async function GET(
   request: NextRequest,
   { params }: { params: Promise<{ pageNumber: string }> }
 ) {
   try {
     const { pageNumber: pageNumberStr } = await params;
-    const pageNumber = parseInt(pageNumberStr)
+    // Aceita '12' e 'page_012.png' (caminhos gravados por import_mk4_spares.py)
+    const pageNumber = parseInt(pageNumberStr.replace(/^page_/, ''))
     
     if (isNaN(pageNumber) || pageNumber < 1 || pageNumber > 680) {
       return NextResponse.json(
@@ -19,16 +55,38 @@ export async function GET(
       )
     }
 
-    // Caminho para a imagem
-    const imagePath = path.join(
-      process.cwd(),
-      'spare_parts_images',
-      'MK_IV',
-      `page_${pageNumber.toString().padStart(3, '0')}.png`
-    )
+    const fileName = `page_${pageNumber.toString().padStart(3, '0')}.png`
+
+    // Recortes (imagem de uma peça, ver part_locator.py) só existem a pedido;
+    // sem serviço de renderização serve-se a página inteira
+    const crop = request.nextUrl.searchParams.has('bbox')
+    if (crop) {
+      const cropped = await renderFromService(request, fileName, true)
+      if (cropped) {
+        return cropped
+      }
+    }
+
+    // Caminho para a imagem: blob do armazém de imagens (MK_IV_index.json,
+    // ver image_store.py) ou, sem índice, o PNG antigo em MK_IV/
+    const imagesDir = path.join(process.cwd(), 'spare_parts_images')
+    let imagePath = path.join(imagesDir, 'MK_IV', fileName)
+    const indexPath = path.join(imagesDir, 'MK_IV_index.json')
+    if (fs.existsSync(indexPath)) {
+      const index = JSON.parse(fs.readFileSync(indexPath, 'utf-8'))
+      const blob = index.blobs?.[fileName]
+      if (blob) {
+        imagePath = path.join(imagesDir, blob)
+      }
+    }
 
     // Verificar se arquivo existe
     if (!fs.existsSync(imagePath)) {
+      // Página não pré-renderizada: renderizar a pedido (render_service.py)
+      const rendered = await renderFromService(request, fileName, false)
+      if (rendered) {
+        return rendered
+      }
       return NextResponse.json(
         { error: 'Imagem não encontrada' },
         { status: 404 }
@@ -41,8 +99,9 @@ export async function GET(
     // Retornar imagem
     return new NextResponse(imageBuffer, {
       headers: {
-        'Content-Type': 'image/png',
-        'Cache-Control': 'public, max-age=31536000, immutable',
+        'Content-Type': imagePath.endsWith('.webp') ? 'image/webp' : 'image/png',
+        // Página inteira no lugar de um recorte: o recorte pode ficar disponível depois
+        'Cache-Control': crop ? 'public, max-age=300' : 'public, max-age=31536000, immutable',
       },
     })
   } catch (error) {
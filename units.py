@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Conversão de unidades (NumPy, vetorizada) para valores técnicos extraídos
+
+Pressão (psi, mmWG, inH2O, mbar, hPa, bar), força (N, kN, lbf, kgf),
+binário (Nm, in-lb) e massa (g, kg, lb). Cada unidade tem um fator para a
+unidade base SI da sua grandeza; converter um array inteiro é uma
+multiplicação, e cada elemento pode vir numa unidade diferente (ex: os
+achados de spec_rules.py de várias páginas).
+
+Uso:
+  python units.py 2.5 psi            (todas as unidades de pressão)
+  python units.py 2.2 kN lbf
+"""
+
+import re
+import sys
+
+import numpy as np
+
+# Unidade -> (grandeza, fator para a unidade base: Pa, N, Nm, kg)
+UNITS = {
+    "psi": ("pressao", 6894.757293168),
+    "mmWG": ("pressao", 9.80665),
+    "inH2O": ("pressao", 249.08891),
+    "mbar": ("pressao", 100.0),
+    "hPa": ("pressao", 100.0),
+    "bar": ("pressao", 100000.0),
+    "N": ("forca", 1.0),
+    "kN": ("forca", 1000.0),
+    "lbf": ("forca", 4.4482216152605),
+    "kgf": ("forca", 9.80665),
+    "Nm": ("binario", 1.0),
+    "in-lb": ("binario", 0.112984829),
+    "g": ("massa", 0.001),
+    "kg": ("massa", 1.0),
+    "lb": ("massa", 0.45359237),
+}
+
+# Grafias encontradas nos manuais e nos JSON -> unidade canónica
+UNIT_ALIASES = {
+    "psi": "psi",
+    "mmwg": "mmWG", "mmh2o": "mmWG",
+    "inh2o": "inH2O", "inchesh2o": "inH2O",
+    "mb": "mbar", "mbar": "mbar", "milibares": "mbar",
+    "hpa": "hPa",
+    "bar": "bar",
+    "kn": "kN", "lbf": "lbf", "kgf": "kgf", "n": "N",
+    "nm": "Nm",
+    "inlb": "in-lb", "inlbs": "in-lb",
+    "kg": "kg", "kilogram": "kg", "kilograms": "kg",
+    "g": "g", "gr": "g", "gram": "g", "grams": "g",
+    "lb": "lb", "lbs": "lb",
+}
+
+# Unidades apresentadas nos relatórios de pressão de trabalho
+PRESSURE_REPORT_UNITS = ("psi", "mmWG", "inH2O", "mbar")
+
+
+def canonical_unit(raw):
+    """'mm W.G' -> 'mmWG', 'KN' -> 'kN', 'milibares' -> 'mbar' (None se desconhecida)"""
+    if raw in UNITS:
+        return raw
+    return UNIT_ALIASES.get(re.sub(r"[\s.\-]+", "", raw or "").lower())
+
+
+def quantity(unit):
+    """Grandeza de uma unidade ('psi' -> 'pressao')"""
+    canonical = canonical_unit(unit)
+    if canonical is None:
+        raise ValueError(f"Unidade desconhecida: {unit!r}")
+    return UNITS[canonical][0]
+
+
+def _factors(units, expected=None):
+    """Fator(es) para a unidade base; aceita uma unidade ou uma sequência"""
+    if isinstance(units, str):
+        units = [units]
+        scalar = True
+    else:
+        scalar = False
+    factors = np.empty(len(units))
+    for i, unit in enumerate(units):
+        canonical = canonical_unit(unit)
+        if canonical is None:
+            raise ValueError(f"Unidade desconhecida: {unit!r}")
+        kind, factor = UNITS[canonical]
+        if expected is not None and kind != expected:
+            raise ValueError(f"Unidades incompatíveis: {unit!r} ({kind}) -> {expected}")
+        factors[i] = factor
+    return factors[0] if scalar else factors
+
+
+def convert(values, from_unit, to_unit):
+    """
+    Converte valor(es) de from_unit para to_unit.
+
+    `values` pode ser um escalar ou um array; `from_unit` uma unidade ou uma
+    sequência com uma unidade por valor (todas da mesma grandeza de to_unit).
+    Devolve float para escalares e np.ndarray para arrays.
+    """
+    target = quantity(to_unit)
+    result = np.asarray(values, dtype=float) * _factors(from_unit, target) / _factors(to_unit)
+    return float(result) if result.ndim == 0 else result
+
+
+def to_all(values, from_unit, units=None, decimals=None):
+    """
+    {unidade: valor(es)} para todas as unidades da grandeza (ou só `units`).
+
+    `decimals` arredonda: um inteiro para todas ou {unidade: casas}.
+    """
+    kind = quantity(from_unit if isinstance(from_unit, str) else from_unit[0])
+    if units is None:
+        units = [u for u, (k, _) in UNITS.items() if k == kind]
+    result = {}
+    for unit in units:
+        converted = convert(values, from_unit, unit)
+        places = decimals.get(unit) if isinstance(decimals, dict) else decimals
+        if places is not None:
+            converted = round(converted, places) if isinstance(converted, float) \
+                else np.round(converted, places)
+        result[unit] = converted
+    return result
+
+
+def convert_findings(findings, to_unit, role="valor"):
+    """
+    Converte os achados de spec_rules.py da mesma grandeza de to_unit num só
+    passo. Devolve um array alinhado com `findings` (NaN nos restantes).
+    """
+    target = quantity(to_unit)
+    out = np.full(len(findings), np.nan)
+    idx = [
+        i for i, f in enumerate(findings)
+        if isinstance(f.get(role), (int, float)) and canonical_unit(f.get("unidade"))
+        and UNITS[canonical_unit(f["unidade"])][0] == target
+    ]
+    if idx:
+        values = np.array([findings[i][role] for i in idx], dtype=float)
+        out[idx] = convert(values, [findings[i]["unidade"] for i in idx], to_unit)
+    return out
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Uso: python units.py VALOR UNIDADE [UNIDADE_DESTINO]")
+        sys.exit(1)
+    value, unit = float(sys.argv[1]), sys.argv[2]
+    if len(sys.argv) > 3:
+        print(f"{value} {unit} = {convert(value, unit, sys.argv[3]):.4g} {sys.argv[3]}")
+    else:
+        for target, converted in to_all(value, unit).items():
+            print(f"  {converted:>12.4g} {target}")